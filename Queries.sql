@@ -37,6 +37,18 @@ CREATE TABLE Booking (
   Status VARCHAR(20)
 );
 
+-- Route/date search and foreign key lookups
+CREATE INDEX IF NOT EXISTS ix_flight_route_departure ON Flight (Source_Airport, Destination_Airport, Departure_Time);
+CREATE INDEX IF NOT EXISTS ix_flight_airline_id ON Flight (Airline_ID);
+CREATE INDEX IF NOT EXISTS ix_flight_destination_airport ON Flight (Destination_Airport);
+CREATE INDEX IF NOT EXISTS ix_booking_flight_id ON Booking (Flight_ID);
+CREATE INDEX IF NOT EXISTS ix_booking_passenger_id ON Booking (Passenger_ID);
+
+-- Keyset pagination: seek to (sort key, id) of the last row on the previous page
+CREATE INDEX IF NOT EXISTS ix_flight_price_id ON Flight (Price, Flight_ID);
+CREATE INDEX IF NOT EXISTS ix_flight_departure_id ON Flight (Departure_Time, Flight_ID);
+CREATE INDEX IF NOT EXISTS ix_booking_date_id ON Booking (Booking_Date, Booking_ID);
+
 INSERT INTO Airline (Name, Country) VALUES ('Air India', 'India'), ('Emirates', 'UAE');
 
 INSERT INTO Airport (Name, City, Country) VALUES ('Indira Gandhi International', 'Delhi', 'India'),
@@ -0,0 +1,202 @@
+"""
+Booking confirmation PDFs
+
+Every ticket shares the same page chrome (header band, section boxes, field
+labels, footer) and only the booking values differ. The chrome is drawn once
+into a cached list of PDF content operators that is replayed onto each new
+page, pages are rendered into memory rather than temp files, and batches can
+be spread across a process pool.
+
+Replaying relies on canvas internals (the operator list and font mapping),
+so ReportLab is pinned in requirements.txt and tests check that cached
+renders are byte-identical to drawing the chrome directly. If a ReportLab
+version lacks those internals, the chrome is drawn on every page instead.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+WIDTH, HEIGHT = letter
+
+# (label, highlight, value) rows per section; None adds a 10pt gap
+BOOKING_ROWS = [
+    ("Booking ID:", False, lambda b: b['booking_id']),
+    ("Confirmation Code:", True, lambda b: b['confirmation_code']),
+    ("Booking Date:", False, lambda b: b['booking_date']),
+    None,
+    ("Passenger:", False, lambda b: f"{b['passenger']['first_name']} {b['passenger']['last_name']}"),
+    ("Email:", False, lambda b: b['passenger']['email']),
+    ("Phone:", False, lambda b: b['passenger']['phone']),
+]
+FLIGHT_ROWS = [
+    ("Flight ID:", False, lambda b: b['flight_id']),
+    ("Airline:", False, lambda b: b.get('airline', 'N/A')),
+    ("Route:", False, lambda b: f"{b['origin']} → {b['destination']}"),
+    ("Departure:", False, lambda b: b['departure_time']),
+    ("Arrival:", False, lambda b: b['arrival_time']),
+    ("Duration:", False, lambda b: b['duration']),
+    ("Class:", True, lambda b: b['tier'].upper()),
+]
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def _layout():
+    """Compute fixed positions for section headers, rows and the payment box"""
+    y = HEIGHT - 180
+    headers, rows = [], []
+    for title, section in (("Booking Information", BOOKING_ROWS), ("Flight Information", FLIGHT_ROWS)):
+        headers.append((title, y))
+        y -= 45
+        for row in section:
+            if row is None:
+                y -= 10
+                continue
+            rows.append((*row, y))
+            y -= 20
+        y -= 20
+    headers.append(("Payment Information", y))
+    return headers, rows, y - 45
+
+
+HEADERS, ROWS, PAYMENT_Y = _layout()
+
+
+def _draw_chrome(c: canvas.Canvas) -> None:
+    """Draw everything on the page that does not depend on the booking"""
+    c.setFillColor(colors.navy)
+    c.rect(0, HEIGHT - 150, WIDTH, 150, fill=True)
+
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 36)
+    c.drawString(52, HEIGHT - 52, "✈")
+    c.drawString(50, HEIGHT - 50, "✈ SkyBook Airlines")
+
+    c.setFont("Helvetica-Bold", 24)
+    c.drawString(50, HEIGHT - 90, "Booking Confirmation")
+
+    c.setStrokeColor(colors.white)
+    c.setLineWidth(2)
+    c.line(50, HEIGHT - 110, WIDTH - 50, HEIGHT - 110)
+
+    for title, y in HEADERS:
+        c.setFillColor(colors.navy)
+        c.rect(45, y - 5, WIDTH - 90, 30, fill=True)
+        c.setFillColor(colors.lightblue)
+        c.rect(45, y - 5, 5, 30, fill=True)
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(60, y + 5, title)
+
+    for label, highlight, _, y in ROWS + [("Payment Status:", True, None, PAYMENT_Y - 60)]:
+        c.setFillColor(colors.navy if highlight else colors.black)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(60, y, label)
+    c.setFont("Helvetica", 12)
+    c.drawString(200, PAYMENT_Y - 60, "Confirmed")
+
+    c.setFillColor(colors.navy)
+    c.rect(60, PAYMENT_Y - 40, 200, 30, fill=True)
+
+    c.rect(0, 50, WIDTH, 2, fill=True)
+    c.setFont("Helvetica", 10)
+    c.drawString(50, 30, "Thank you for choosing SkyBook Airlines!")
+
+
+@lru_cache(maxsize=1)
+def _chrome() -> tuple:
+    """
+    Render the chrome once and keep its content operators
+
+    Returns:
+        Tuple of (operators, fonts in the order they were registered) so a
+        new canvas can map the same internal font names before replaying
+    """
+    scratch = canvas.Canvas(io.BytesIO(), pagesize=letter)
+    start = len(scratch._code)
+    _draw_chrome(scratch)
+    fonts = sorted(scratch._doc.fontMapping, key=lambda name: int(scratch._doc.fontMapping[name][2:]))
+    return tuple(scratch._code[start:]), tuple(fonts)
+
+
+def _replay_chrome(c: canvas.Canvas) -> None:
+    """Put the cached chrome on a fresh canvas, drawing it if the internals are missing"""
+    try:
+        operators, fonts = _chrome()
+        for name in fonts:
+            c._doc.getInternalFontName(name)
+        c._code.extend(operators)
+    except AttributeError:
+        _draw_chrome(c)
+
+
+def render_booking_pdf(booking: dict, cached_chrome: bool = True) -> bytes:
+    """
+    Render a booking confirmation PDF in memory
+
+    Args:
+        booking: Booking record
+        cached_chrome: Replay the cached chrome (False draws it, same output)
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+
+    if cached_chrome:
+        _replay_chrome(c)
+    else:
+        _draw_chrome(c)
+
+    c.setFont("Helvetica", 12)
+    for _, highlight, value, y in ROWS:
+        c.setFillColor(colors.navy if highlight else colors.black)
+        c.drawString(200, y, value(booking))
+
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(70, PAYMENT_Y - 20, f"Total Amount: ${booking['total_amount']:.2f}")
+
+    c.setFillColor(colors.navy)
+    c.setFont("Helvetica", 10)
+    c.drawString(50, 15, f"Booking Reference: {booking['confirmation_code']}")
+
+    c.save()
+    return buffer.getvalue()
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def render_booking_pdfs(bookings: List[dict]) -> List[bytes]:
+    """Render several PDFs, spreading them across the render process pool"""
+    if PDF_RENDER_WORKERS <= 1 or len(bookings) < 2:
+        return [render_booking_pdf(booking) for booking in bookings]
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers avoid forking a process that is running threads
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    chunksize = max(1, len(bookings) // (PDF_RENDER_WORKERS * 4))
+    return list(_executor.map(render_booking_pdf, bookings, chunksize=chunksize))
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render process pool if it was started"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -1,15 +1,20 @@
 
-from typing import List
+import os
+from typing import Iterable, List
 from collections import defaultdict
-from sqlalchemy import create_engine
+import numpy as np
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 
+from app.db_engine import SAMPLE_DATABASE_PRAGMAS, create_db_engine
 from app.models import Base, User
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
+from app.demand import DEMAND_LEVELS, DEMAND_UNSET, classify_flights
+from app.fare_log import FareHistoryLog
+
 
 class Flight(BaseModel):
     """Pydantic model for flights"""
@@ -39,7 +44,8 @@ class DemandLevel(str, Enum):
 
 # SQLite database configuration
 SQLALCHEMY_DATABASE_URL = "sqlite:///./flight_booking.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Committed sample file: pragmas without the WAL switch (see app/db_engine.py)
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, pragmas=SAMPLE_DATABASE_PRAGMAS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create tables
@@ -56,16 +62,43 @@ def get_db():
 
 
 class FlightDatabase:
-    """In-memory flight database"""
+    """In-memory flight database, optionally persisting fare history to disk"""
     
-    def __init__(self):
+    def __init__(self, fare_log: FareHistoryLog | None = None):
         self.flights: List[Flight] = []
         self.fare_history: defaultdict = defaultdict(list)
-        self.demand_levels: dict = {}
+        self.fare_log = fare_log
+        self._row_index: dict = {}
+        # Demand codes (indexes into DEMAND_LEVELS), row-aligned with self.flights
+        self._demand = np.full(0, DEMAND_UNSET, dtype=np.uint8)
+        self._restored_histories: set = set()
     
     def add_flight(self, flight: Flight) -> None:
         """Add a flight to the database"""
-        self.flights.append(flight)
+        self.add_flights([flight])
+    
+    def add_flights(self, flights: Iterable[Flight], demand_codes: np.ndarray | None = None) -> None:
+        """
+        Add many flights to the database and classify their demand in bulk
+        
+        Args:
+            flights: Flights to append
+            demand_codes: Precomputed demand codes, classified here if omitted
+        """
+        flights = list(flights)
+        start = len(self.flights)
+        self.flights.extend(flights)
+        for row, flight in enumerate(flights, start):
+            self._row_index.setdefault(flight.flight_id, row)
+        
+        if len(self.flights) > len(self._demand):
+            grown = np.full(max(len(self.flights), 2 * len(self._demand)), DEMAND_UNSET, dtype=np.uint8)
+            grown[:start] = self._demand[:start]
+            self._demand = grown
+        if flights:
+            self._demand[start:len(self.flights)] = (
+                demand_codes if demand_codes is not None else classify_flights(flights)
+            )
     
     def get_all_flights(self) -> List[Flight]:
         """Get all flights"""
@@ -73,29 +106,75 @@ class FlightDatabase:
     
     def get_flight_by_id(self, flight_id: str) -> Flight | None:
         """Get flight by ID"""
-        return next((f for f in self.flights if f.flight_id == flight_id), None)
+        row = self._row_index.get(flight_id)
+        return self.flights[row] if row is not None else None
     
     def add_fare_history(self, flight_id: str, entry: dict) -> None:
         """Add fare history entry"""
+        if self.fare_log is not None:
+            self._restore_fare_history(flight_id)
+            self.fare_log.append(flight_id, entry)
         self.fare_history[flight_id].append(entry)
     
     def get_fare_history(self, flight_id: str) -> list:
         """Get fare history for a flight"""
+        if self.fare_log is not None:
+            self._restore_fare_history(flight_id)
         return self.fare_history.get(flight_id, [])
     
+    def _restore_fare_history(self, flight_id: str) -> None:
+        """Reload a flight's history from the on-disk log on first access"""
+        if flight_id not in self._restored_histories:
+            self._restored_histories.add(flight_id)
+            history = self.fare_log.load(flight_id)
+            if history:
+                self.fare_history[flight_id] = history
+    
     def set_demand_level(self, flight_id: str, demand: DemandLevel) -> None:
         """Set demand level for a flight"""
-        self.demand_levels[flight_id] = demand
+        self._demand[self._row_index[flight_id]] = DEMAND_LEVELS.index(demand)
     
     def get_demand_level(self, flight_id: str) -> DemandLevel | None:
         """Get demand level for a flight"""
-        return self.demand_levels.get(flight_id)
+        row = self._row_index.get(flight_id)
+        if row is None or self._demand[row] == DEMAND_UNSET:
+            return None
+        return DEMAND_LEVELS[self._demand[row]]
+    
+    def recompute_demand(self, flight_ids: Iterable[str] | None = None) -> None:
+        """Reclassify demand in bulk for the given flights, or all flights"""
+        if flight_ids is None:
+            rows = np.arange(len(self.flights))
+        else:
+            rows = np.fromiter((self._row_index[fid] for fid in flight_ids), dtype=np.int64)
+        if len(rows):
+            self._demand[rows] = classify_flights([self.flights[row] for row in rows])
+    
+    @property
+    def demand_codes(self) -> np.ndarray:
+        """uint8 demand column, row-aligned with get_all_flights()"""
+        return self._demand[:len(self.flights)]
+    
+    def load_state(self, flights: List[Flight], demand_codes: np.ndarray, fare_history: dict) -> None:
+        """Replace all data with restored flights, demand codes and fare history"""
+        self.clear()
+        self.add_flights(flights, demand_codes=demand_codes)
+        self.fare_history.update(fare_history)
     
     def clear(self) -> None:
         """Clear all data"""
         self.flights.clear()
         self.fare_history.clear()
-        self.demand_levels.clear()
+        self._row_index.clear()
+        self._demand = np.full(0, DEMAND_UNSET, dtype=np.uint8)
+        self._restored_histories.clear()
 
 
-db = FlightDatabase()
+# Set FARE_HISTORY_DIR to persist fare history across restarts
+FARE_HISTORY_DIR = os.getenv("FARE_HISTORY_DIR")
+db = FlightDatabase(
+    fare_log=FareHistoryLog(
+        FARE_HISTORY_DIR,
+        flush_interval=float(os.getenv("FARE_HISTORY_FLUSH_INTERVAL", 1.0))
+    ) if FARE_HISTORY_DIR else None
+)
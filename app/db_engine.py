@@ -0,0 +1,93 @@
+"""
+Engine factory for the SQL databases
+
+SQLite files (skybook.db, flight_booking.db, flight_database.db) get a
+production profile on every new connection:
+
+    journal_mode=WAL     readers no longer block behind a writer
+    synchronous=NORMAL   fsync at checkpoints instead of every commit (safe with WAL)
+    cache_size           page cache per connection, in KiB
+    mmap_size            memory-mapped reads
+    busy_timeout         how long a writer waits for the lock before failing
+
+Every setting can be overridden from the environment (SQLITE_*). Other
+databases only get the pool sizing.
+
+skybook.db and flight_booking.db are sample databases committed to the
+repository. WAL is recorded in the file header, so they use
+SAMPLE_DATABASE_PRAGMAS and keep their rollback journal (with SQLite's
+default synchronous=FULL) unless SQLITE_JOURNAL_MODE is set explicitly.
+Otherwise every run would modify tracked files.
+"""
+
+import os
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024)),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE_MB", 256)) * 1024 * 1024,
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+}
+
+SAMPLE_DATABASE_PRAGMAS = SQLITE_PRAGMAS if "SQLITE_JOURNAL_MODE" in os.environ else {
+    name: value for name, value in SQLITE_PRAGMAS.items() if name not in ("journal_mode", "synchronous")
+}
+
+# Sync routes run on FastAPI's 40-thread pool and close their sessions from it,
+# so the connection pool must cover every thread or requests deadlock waiting
+# for connections held by sessions that cannot get a thread to close
+POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 10))
+MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 30))
+
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[dict] = None) -> None:
+    """Run the PRAGMAs on every connection the engine opens"""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_db_engine(
+    url: str,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = MAX_OVERFLOW,
+    pragmas: Optional[dict] = None,
+    **kwargs
+) -> Engine:
+    """
+    Create an engine with pooling sized for the threadpool
+
+    Args:
+        url: Database URL
+        pool_size: Connections kept open
+        max_overflow: Extra connections opened under load
+        pragmas: SQLite PRAGMAs to apply (defaults to SQLITE_PRAGMAS, {} for none)
+        **kwargs: Passed on to create_engine
+    """
+    if not is_sqlite(url):
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+
+    connect_args = {"check_same_thread": False, **kwargs.pop("connect_args", {})}
+    if make_url(url).database in (None, "", ":memory:"):
+        # In-memory databases use a single shared connection, not a sized pool
+        engine = create_engine(url, connect_args=connect_args, **kwargs)
+    else:
+        engine = create_engine(
+            url, pool_size=pool_size, max_overflow=max_overflow, connect_args=connect_args, **kwargs
+        )
+    apply_sqlite_pragmas(engine, pragmas)
+    return engine
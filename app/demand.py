@@ -0,0 +1,47 @@
+"""
+Vectorized demand classification
+
+Demand is derived from seat occupancy plus a peak-hour bonus and stored as
+compact uint8 codes indexing DEMAND_LEVELS.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from app.models import DemandLevel
+
+
+DEMAND_LEVELS = list(DemandLevel)
+
+# Code for rows that have not been classified
+DEMAND_UNSET = 255
+
+# Score thresholds separating LOW | MEDIUM | HIGH | VERY_HIGH
+DEMAND_THRESHOLDS = [0.4, 0.6, 0.8]
+
+
+def classify_demand(occupancy: np.ndarray, departure_hours: np.ndarray) -> np.ndarray:
+    """
+    Classify demand for many flights at once
+
+    Args:
+        occupancy: Fraction of seats sold per flight
+        departure_hours: Local departure hour (0-23) per flight
+
+    Returns:
+        uint8 array of indexes into DEMAND_LEVELS
+    """
+    is_peak = ((departure_hours >= 6) & (departure_hours <= 9)) | \
+        ((departure_hours >= 17) & (departure_hours <= 20))
+    score = occupancy + np.where(is_peak, 0.3, 0.0)
+    return np.digitize(score, DEMAND_THRESHOLDS).astype(np.uint8)
+
+
+def classify_flights(flights: Sequence) -> np.ndarray:
+    """Classify demand for a sequence of Flight models"""
+    count = len(flights)
+    available = np.fromiter((f.available_seats for f in flights), dtype=np.float64, count=count)
+    total = np.fromiter((f.total_seats for f in flights), dtype=np.float64, count=count)
+    hours = np.fromiter((f.departure_time.hour for f in flights), dtype=np.int64, count=count)
+    return classify_demand(1 - available / total, hours)
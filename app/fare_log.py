@@ -0,0 +1,371 @@
+"""
+Append-only columnar fare history log
+
+Fare history entries are buffered in memory and group-flushed into small
+columnar segment files. Background compaction merges segments into a single
+file sorted by flight, so one flight's history can be read back by
+memory-mapping just its slice of each column.
+
+File layout (little endian):
+    b"FHL1" | uint32 header length | JSON header | 8-byte aligned columns
+"""
+
+import atexit
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models import DemandLevel
+
+
+MAGIC = b"FHL1"
+
+# Column order and dtypes shared by segment and compacted files
+COLUMNS = [
+    ("flight", "<u4"),     # index into the file's flight ID list
+    ("timestamp", "<i8"),  # microseconds since epoch, delta encoded
+    ("price", "<i8"),      # cents, delta encoded
+    ("seats", "<i4"),
+    ("demand", "u1"),      # index into DEMAND_LEVELS
+]
+
+DEMAND_LEVELS = [level.value for level in DemandLevel]
+DEMAND_INDEX = {value: i for i, value in enumerate(DEMAND_LEVELS)}
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _encode_timestamp(value) -> int:
+    """Convert an ISO string or datetime to microseconds since epoch"""
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(tz=None).replace(tzinfo=None)
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _decode_timestamp(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _delta(values: np.ndarray, starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """Delta-encode, restarting with an absolute value at every run start"""
+    deltas = np.diff(values, prepend=0)
+    if starts is not None and len(values):
+        deltas[starts] = values[starts]
+    return deltas
+
+
+def _undelta(deltas: np.ndarray, starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """Inverse of `_delta`"""
+    totals = np.cumsum(deltas)
+    if starts is None or not len(deltas):
+        return totals
+    counts = np.diff(np.append(starts, len(deltas)))
+    return totals - np.repeat(totals[starts] - deltas[starts], counts)
+
+
+def _write_file(path: str, header: dict, columns: Dict[str, np.ndarray]) -> None:
+    """Write a log file atomically via a temporary file"""
+    header = {**header, "count": int(len(columns["flight"]))}
+    raw_header = json.dumps(header).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(raw_header)) + raw_header)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        for name, dtype in COLUMNS:
+            data = np.ascontiguousarray(columns[name], dtype=dtype).tobytes()
+            f.write(data + b"\0" * (_align(len(data)) - len(data)))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def _read_header(path: str) -> Tuple[dict, Dict[str, int]]:
+    """Read a file header and compute each column's byte offset"""
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"Not a fare history log file: {path}")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length))
+
+    offset = _align(8 + length)
+    offsets = {}
+    for name, dtype in COLUMNS:
+        offsets[name] = offset
+        offset += _align(header["count"] * np.dtype(dtype).itemsize)
+    return header, offsets
+
+
+class _LogFile:
+    """A segment or compacted file, read through short-lived memory maps"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header, self.offsets = _read_header(path)
+        self.count = self.header["count"]
+        self.flights: List[str] = self.header["flights"]
+        self.flight_index = {fid: i for i, fid in enumerate(self.flights)}
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Copy rows [start, stop) of every column out of a memory map"""
+        stop = self.count if stop is None else stop
+        if not self.count or start >= stop:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {name: self._column(mm, name, dtype, start, stop) for name, dtype in COLUMNS}
+
+    def _column(self, mm: mmap.mmap, name: str, dtype: str, start: int, stop: int) -> np.ndarray:
+        itemsize = np.dtype(dtype).itemsize
+        view = np.frombuffer(mm, dtype=dtype, count=stop - start, offset=self.offsets[name] + start * itemsize)
+        return view.copy()
+
+
+class FareHistoryLog:
+    """
+    Durable fare history store backing `FlightDatabase.add_fare_history`
+
+    Args:
+        directory: Directory holding segment and compacted files
+        flush_interval: Seconds between group flushes of buffered entries
+        max_buffer: Buffered entries that force an early flush
+        compact_threshold: Segment count that triggers background compaction
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval: float = 1.0,
+        max_buffer: int = 10_000,
+        compact_threshold: int = 8
+    ):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.compact_threshold = compact_threshold
+
+        self._buffer: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._files_lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._segments: List[Tuple[int, _LogFile]] = []
+        self._compacted: Optional[Tuple[int, _LogFile]] = None
+        self._next_seq = 1
+        self._compactor: Optional[threading.Thread] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_existing()
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="fare-log-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _open_existing(self) -> None:
+        """Discover files on disk and drop anything superseded by compaction"""
+        segments, compacted = [], []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+            elif name.startswith("segment-") and name.endswith(".fhl"):
+                segments.append((int(name[8:-4]), path))
+            elif name.startswith("compacted-") and name.endswith(".fhl"):
+                compacted.append((int(name[10:-4]), path))
+
+        compacted.sort()
+        for _, path in compacted[:-1]:
+            os.remove(path)
+        merged_up_to = 0
+        if compacted:
+            merged_up_to, path = compacted[-1]
+            self._compacted = (merged_up_to, _LogFile(path))
+
+        for seq, path in sorted(segments):
+            if seq <= merged_up_to:
+                os.remove(path)
+            else:
+                self._segments.append((seq, _LogFile(path)))
+
+        self._next_seq = max([merged_up_to] + [seq for seq, _ in segments]) + 1
+
+    def append(self, flight_id: str, entry: dict) -> None:
+        """Buffer one fare history entry for the next group flush"""
+        demand = entry["demand_level"]
+        record = (
+            flight_id,
+            _encode_timestamp(entry["timestamp"]),
+            int(round(entry["price"] * 100)),
+            int(entry["available_seats"]),
+            DEMAND_INDEX[getattr(demand, "value", demand)],
+        )
+        with self._buffer_lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.max_buffer
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered entries as one new segment"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                records, self._buffer = self._buffer, []
+            if not records:
+                return
+
+            flight_ids, timestamps, prices, seats, demand = zip(*records)
+            flights, codes = np.unique(np.array(flight_ids), return_inverse=True)
+            seq = self._next_seq
+            path = os.path.join(self.directory, f"segment-{seq:08d}.fhl")
+            _write_file(path, {"flights": flights.tolist()}, {
+                "flight": codes,
+                "timestamp": _delta(np.array(timestamps, dtype=np.int64)),
+                "price": _delta(np.array(prices, dtype=np.int64)),
+                "seats": np.array(seats),
+                "demand": np.array(demand),
+            })
+
+            with self._files_lock:
+                self._segments.append((seq, _LogFile(path)))
+                self._next_seq = seq + 1
+                pending = len(self._segments)
+
+        if pending >= self.compact_threshold:
+            self.compact(background=True)
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Error flushing fare history log: {e}")
+
+    def compact(self, background: bool = False) -> None:
+        """
+        Merge all current segments and the previous compacted file into a
+        new file sorted by flight and time, then delete the merged inputs
+        """
+        if background:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self.compact, name="fare-log-compactor", daemon=True)
+                self._compactor.start()
+            return
+
+        with self._compact_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        with self._files_lock:
+            segments = list(self._segments)
+            previous = self._compacted
+        if not segments:
+            return
+
+        sources = ([previous[1]] if previous else []) + [log_file for _, log_file in segments]
+        parts = [self._decode(log_file) for log_file in sources]
+        flight_ids = np.concatenate([ids for ids, _ in parts])
+        columns = {name: np.concatenate([cols[name] for _, cols in parts]) for name, _ in COLUMNS[1:]}
+
+        flights, codes = np.unique(flight_ids, return_inverse=True)
+        # Stable sort keeps arrival order for identical timestamps
+        order = np.lexsort((columns["timestamp"], codes))
+        codes = codes[order]
+        columns = {name: values[order] for name, values in columns.items()}
+        _, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+
+        merged_up_to = segments[-1][0]
+        path = os.path.join(self.directory, f"compacted-{merged_up_to:08d}.fhl")
+        index = {fid: [int(s), int(c)] for fid, s, c in zip(flights.tolist(), starts, counts)}
+        _write_file(path, {"flights": flights.tolist(), "index": index}, {
+            "flight": codes,
+            "timestamp": _delta(columns["timestamp"], starts),
+            "price": _delta(columns["price"], starts),
+            "seats": columns["seats"],
+            "demand": columns["demand"],
+        })
+
+        with self._files_lock:
+            self._compacted = (merged_up_to, _LogFile(path))
+            self._segments = [(seq, f) for seq, f in self._segments if seq > merged_up_to]
+            for log_file in sources:
+                os.remove(log_file.path)
+
+    def _decode(self, log_file: _LogFile) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Read a whole file back into absolute flight IDs, times and prices"""
+        cols = log_file.read()
+        starts = None
+        if "index" in log_file.header:
+            starts = np.array(sorted(s for s, _ in log_file.header["index"].values()), dtype=np.int64)
+        flight_ids = np.array(log_file.flights)[cols["flight"]] if log_file.count else np.empty(0, dtype=str)
+        return flight_ids, {
+            "timestamp": _undelta(cols["timestamp"], starts),
+            "price": _undelta(cols["price"], starts),
+            "seats": cols["seats"],
+            "demand": cols["demand"],
+        }
+
+    def load(self, flight_id: str) -> List[dict]:
+        """Reload the full fare history for one flight, oldest first"""
+        entries = []
+        with self._files_lock:
+            if self._compacted:
+                compacted = self._compacted[1]
+                span = compacted.header["index"].get(flight_id)
+                if span:
+                    start, count = span
+                    cols = compacted.read(start, start + count)
+                    entries.extend(self._entries(
+                        np.cumsum(cols["timestamp"]), np.cumsum(cols["price"]), cols["seats"], cols["demand"]
+                    ))
+
+            for _, segment in self._segments:
+                code = segment.flight_index.get(flight_id)
+                if code is None:
+                    continue
+                cols = segment.read()
+                mask = cols["flight"] == code
+                entries.extend(self._entries(
+                    np.cumsum(cols["timestamp"])[mask], np.cumsum(cols["price"])[mask],
+                    cols["seats"][mask], cols["demand"][mask]
+                ))
+
+        with self._buffer_lock:
+            pending = [r for r in self._buffer if r[0] == flight_id]
+        entries.extend(self._entries(*zip(*[r[1:] for r in pending])) if pending else [])
+        return entries
+
+    @staticmethod
+    def _entries(timestamps, prices, seats, demand) -> List[dict]:
+        return [
+            {
+                "timestamp": _decode_timestamp(int(ts)),
+                "price": int(price) / 100,
+                "available_seats": int(available),
+                "demand_level": DEMAND_LEVELS[int(level)]
+            }
+            for ts, price, available, level in zip(timestamps, prices, seats, demand)
+        ]
+
+    def close(self) -> None:
+        """Stop the flusher and write any remaining buffered entries"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        with self._compact_lock:
+            pass
+        atexit.unregister(self.close)
@@ -0,0 +1,248 @@
+"""SQL database for flights and bookings (used by database_config.py)"""
+
+import glob
+import os
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Index, Integer, String, select, text
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db_engine import MAX_OVERFLOW, POOL_SIZE, apply_sqlite_pragmas, create_db_engine, is_sqlite
+
+# Database configuration, PostgreSQL in production
+DATABASE_URL = os.getenv("FLIGHT_DATABASE_URL", "sqlite:///./flight_database.db")
+# Serve requests through an async engine (asyncpg / aiosqlite) instead of the
+# threadpool. Experimental: slower than the threadpool on SQLite, see database_config.py
+DATABASE_ASYNC = os.getenv("FLIGHT_DATABASE_ASYNC", "false").lower() == "true"
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+Base = declarative_base()
+
+
+class Airline(Base):
+    __tablename__ = "airlines"
+    airline_id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    code = Column(String(3), unique=True)
+    country = Column(String(50))
+
+
+class Airport(Base):
+    __tablename__ = "airports"
+    code = Column(String(3), primary_key=True)
+    name = Column(String(100), nullable=False)
+    city = Column(String(50))
+    country = Column(String(50))
+
+
+class Flight(Base):
+    __tablename__ = "flights"
+    __table_args__ = (
+        # Serves the route + day range in search_flights without a table scan;
+        # its leading column also covers the source_airport foreign key
+        Index("ix_flights_route_departure", "source_airport", "destination_airport", "departure_time"),
+        # Keyset pagination of GET /flights in each sort order (see app/pagination.py)
+        Index("ix_flights_price_id", "current_price", "flight_id"),
+        Index("ix_flights_departure_id", "departure_time", "flight_id"),
+    )
+    flight_id = Column(String, primary_key=True)
+    airline_id = Column(Integer, ForeignKey("airlines.airline_id"), nullable=False, index=True)
+    source_airport = Column(String(3), ForeignKey("airports.code"), nullable=False)
+    destination_airport = Column(String(3), ForeignKey("airports.code"), nullable=False, index=True)
+    departure_time = Column(DateTime, nullable=False)
+    arrival_time = Column(DateTime, nullable=False)
+    duration = Column(String(10))
+    base_fare = Column(Float, nullable=False)
+    current_price = Column(Float, nullable=False)
+    total_seats = Column(Integer, nullable=False)
+    available_seats = Column(Integer, nullable=False)
+    tier = Column(String(20), nullable=False)
+    demand_level = Column(String(20))
+
+
+class Passenger(Base):
+    __tablename__ = "passengers"
+    passenger_id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    email = Column(String(100), unique=True, nullable=False)
+    phone = Column(String(20))
+
+
+class Booking(Base):
+    __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_date_id", "booking_date", "booking_id"),
+        # One live booking per seat, a backstop for the seat maps
+        Index(
+            "ux_bookings_flight_seat", "flight_id", "seat_no", unique=True,
+            sqlite_where=text("status != 'Cancelled'"), postgresql_where=text("status != 'Cancelled'")
+        ),
+    )
+    booking_id = Column(String, primary_key=True)
+    flight_id = Column(String, ForeignKey("flights.flight_id"), nullable=False, index=True)
+    passenger_id = Column(Integer, ForeignKey("passengers.passenger_id"), nullable=False, index=True)
+    booking_date = Column(DateTime, default=datetime.now)
+    seat_no = Column(String(4))
+    status = Column(String(20))
+    total_price = Column(Float)
+
+
+class FlightSeatMap(Base):
+    """Free-seat bitmap of one flight in hex, taken and saved per booking (see app/seat_map.py)"""
+    __tablename__ = "flight_seat_maps"
+    flight_id = Column(String, ForeignKey("flights.flight_id"), primary_key=True)
+    free_seats = Column(String, nullable=False)
+
+
+class IdBlock(Base):
+    """Next unreserved value of a block-allocated id sequence (see app/id_blocks.py)"""
+    __tablename__ = "id_blocks"
+    name = Column(String(50), primary_key=True)
+    next_value = Column(Integer, nullable=False)
+
+
+class FlightStats(Base):
+    """Single-row running totals behind /stats (see app/flight_stats.py)"""
+    __tablename__ = "flight_stats"
+    id = Column(Integer, primary_key=True)
+    total_flights = Column(Integer, nullable=False, default=0)
+    total_seats = Column(Integer, nullable=False, default=0)
+    available_seats = Column(Integer, nullable=False, default=0)
+    total_bookings = Column(Integer, nullable=False, default=0)
+    airports = Column(Integer, nullable=False, default=0)
+    airlines = Column(Integer, nullable=False, default=0)
+
+
+# Pool sized for the threadpool and, on SQLite, WAL and pragmas (see app/db_engine.py)
+FLIGHT_POOL_SIZE = int(os.getenv("FLIGHT_DATABASE_POOL_SIZE", POOL_SIZE))
+FLIGHT_MAX_OVERFLOW = int(os.getenv("FLIGHT_DATABASE_MAX_OVERFLOW", MAX_OVERFLOW))
+
+engine = create_db_engine(DATABASE_URL, pool_size=FLIGHT_POOL_SIZE, max_overflow=FLIGHT_MAX_OVERFLOW)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def async_database_url(url: str) -> str:
+    """Swap a sync driver URL for its async driver"""
+    scheme, rest = url.split("://", 1)
+    backend = scheme.split("+")[0]
+    drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    if backend not in drivers:
+        raise ValueError(f"No async driver configured for {backend}")
+    return f"{drivers[backend]}://{rest}"
+
+
+# The sync engine is still used for startup, seeding and id block reservation
+# (aiosqlite opens a connection per session, so it takes no pool settings)
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **({} if is_sqlite(DATABASE_URL) else {"pool_size": FLIGHT_POOL_SIZE, "max_overflow": FLIGHT_MAX_OVERFLOW})
+) if DATABASE_ASYNC else None
+if async_engine is not None and is_sqlite(DATABASE_URL):
+    apply_sqlite_pragmas(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False) if DATABASE_ASYNC else None
+
+
+def apply_migrations(bind) -> None:
+    """
+    Run the SQL files in app/migrations in order
+
+    Migrations only use IF NOT EXISTS statements, so they are safe to run on
+    every start and bring databases created by older versions up to date.
+    """
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+        with open(path) as f:
+            statements = [s.strip() for s in f.read().split(";")]
+        with bind.begin() as conn:
+            for statement in statements:
+                lines = [line for line in statement.splitlines() if not line.strip().startswith("--")]
+                if "".join(lines).strip():
+                    conn.execute(text("\n".join(lines)))
+
+
+def _route_day_filter(origin: str, destination: str, day: date) -> list:
+    flights = Flight.__table__.c
+    start = datetime.combine(day, datetime.min.time())
+    return [
+        flights.source_airport == origin,
+        flights.destination_airport == destination,
+        flights.departure_time >= start,
+        flights.departure_time < start + timedelta(days=1)
+    ]
+
+
+def search_flights_query(db: Session, origin: str, destination: str, day: date):
+    """Flights with their airline name on a route, departing on the given day"""
+    return db.query(
+        Flight, Airline.name
+    ).join(
+        Airline, Flight.airline_id == Airline.airline_id
+    ).filter(*_route_day_filter(origin, destination, day))
+
+
+def flight_rows_statement():
+    """
+    Core select() of the columns in a flight response, airline name second
+
+    Built on the tables rather than the mapped classes, so results are plain
+    row tuples: no Flight objects, identity map or ORM compile step.
+    """
+    flights, airlines = Flight.__table__, Airline.__table__
+    return select(
+        flights.c.flight_id, airlines.c.name, flights.c.source_airport, flights.c.destination_airport,
+        flights.c.departure_time, flights.c.arrival_time, flights.c.duration, flights.c.current_price,
+        flights.c.base_fare, flights.c.available_seats, flights.c.total_seats, flights.c.tier,
+        flights.c.demand_level
+    ).join_from(flights, airlines, flights.c.airline_id == airlines.c.airline_id)
+
+
+def flight_response(row) -> dict:
+    """Response dict for a flight_rows_statement() row (what the query cache stores)"""
+    (flight_id, airline_name, origin, destination, departure_time, arrival_time, duration,
+     current_price, base_fare, available_seats, total_seats, tier, demand_level) = row
+    return {
+        "flight_id": flight_id,
+        "airline": airline_name,
+        "origin": origin,
+        "destination": destination,
+        "departure_time": departure_time.isoformat(" ", "minutes"),
+        "arrival_time": arrival_time.isoformat(" ", "minutes"),
+        "duration": duration,
+        "current_price": current_price,
+        "base_fare": base_fare,
+        "available_seats": available_seats,
+        "total_seats": total_seats,
+        "tier": tier,
+        "demand_level": demand_level
+    }
+
+
+def search_flights_statement(origin: str, destination: str, day: date):
+    """The same search as flight_rows_statement() rows, for sync or async sessions"""
+    return flight_rows_statement().where(*_route_day_filter(origin, destination, day))
+
+
+def booking_rows_statement():
+    """Core select() of the columns in a booking response, with the passenger name"""
+    bookings, passengers = Booking.__table__, Passenger.__table__
+    return select(
+        bookings.c.booking_id, bookings.c.flight_id, passengers.c.name, bookings.c.seat_no,
+        bookings.c.status, bookings.c.booking_date, bookings.c.total_price
+    ).join_from(bookings, passengers, bookings.c.passenger_id == passengers.c.passenger_id)
+
+
+# Database dependencies
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,79 @@
+"""
+Running totals for the SQL /stats endpoint
+
+The flight_stats table holds one row of counters. Transactions that add
+flights or bookings adjust it with relative UPDATEs in the same transaction,
+so /stats is a single primary key read however large the tables get. When
+the row is missing (new or restored database) it is rebuilt from one
+aggregate query. Changes made outside the app (for example airports
+added by the SQL setup script) are picked up by calling refresh_stats().
+
+The rows being counted must be changed with relative UPDATEs too (as
+insert_booking does for flights.available_seats). An absolute write from a
+stale read loses a concurrent transaction's change there while its delta
+here survives, and the two totals drift apart.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.flight_database import Airline, Airport, Booking, Flight, FlightStats
+
+STATS_ROW_ID = 1
+COUNTERS = ["total_flights", "total_seats", "available_seats", "total_bookings", "airports", "airlines"]
+
+
+def aggregate_stats(conn) -> dict:
+    """Compute every counter with one aggregate query"""
+    row = conn.execute(
+        select(
+            func.count(Flight.flight_id),
+            func.coalesce(func.sum(Flight.total_seats), 0),
+            func.coalesce(func.sum(Flight.available_seats), 0),
+            select(func.count()).select_from(Booking).scalar_subquery(),
+            select(func.count()).select_from(Airport).scalar_subquery(),
+            select(func.count()).select_from(Airline).scalar_subquery()
+        )
+    ).one()
+    return dict(zip(COUNTERS, (int(value) for value in row)))
+
+
+def refresh_stats(conn) -> dict:
+    """Rewrite the summary row from the tables"""
+    stats = aggregate_stats(conn)
+    table = FlightStats.__table__
+    updated = conn.execute(update(table).where(table.c.id == STATS_ROW_ID).values(**stats))
+    if not updated.rowcount:
+        try:
+            with conn.begin_nested():
+                conn.execute(table.insert().values(id=STATS_ROW_ID, **stats))
+        except IntegrityError:
+            pass  # created concurrently; its values are just as fresh
+    return stats
+
+
+def adjust_stats(conn, **deltas: int) -> None:
+    """
+    Add deltas to the summary counters, e.g. adjust_stats(db, total_bookings=1, available_seats=-1)
+
+    Accepts a Connection or Session and runs in the caller's transaction. A
+    missing row is left alone; the next read rebuilds it.
+    """
+    values = {name: delta for name, delta in deltas.items() if delta}
+    if not values:
+        return
+    table = FlightStats.__table__
+    conn.execute(
+        update(table)
+        .where(table.c.id == STATS_ROW_ID)
+        .values({name: table.c[name] + delta for name, delta in values.items()})
+    )
+
+
+def read_stats(conn) -> dict:
+    """Current counters, from the summary row"""
+    table = FlightStats.__table__
+    row = conn.execute(select(*[table.c[name] for name in COUNTERS]).where(table.c.id == STATS_ROW_ID)).first()
+    if row is None:
+        return refresh_stats(conn)
+    return dict(zip(COUNTERS, row))
@@ -0,0 +1,114 @@
+"""
+Block-allocated ids (hi/lo)
+
+Each process reserves a block of ids from the id_blocks table in one short
+transaction and then hands them out from memory, so generating an id is a
+counter increment with no database round trip. Blocks never overlap, so ids
+are unique across workers; ids left in a block when a process exits are
+simply skipped.
+"""
+
+import asyncio
+import os
+import re
+import threading
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.flight_database import Booking, IdBlock, engine
+
+
+class BlockIdAllocator:
+    """
+    Hands out `prefix` + zero-padded number ids from reserved blocks
+
+    Args:
+        engine: SQLAlchemy engine holding the id_blocks table
+        name: Sequence name (one row in id_blocks)
+        prefix: Text before the number
+        width: Minimum number of digits
+        block_size: Ids reserved per database round trip
+        seed_column: String id column scanned once to continue after
+            existing ids when the sequence row does not exist yet
+    """
+
+    def __init__(self, engine, name: str, prefix: str = "", width: int = 4, block_size: int = 100, seed_column=None):
+        self.engine = engine
+        self.name = name
+        self.prefix = prefix
+        self.width = width
+        self.block_size = block_size
+        self.seed_column = seed_column
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+        self.blocks_reserved = 0
+
+    def _initial_value(self, conn) -> int:
+        """First id for a new sequence: one past the highest existing id"""
+        if self.seed_column is None:
+            return 1
+        pattern = re.compile(rf"^{re.escape(self.prefix)}(\d+)$")
+        highest = 0
+        for value in conn.execute(select(self.seed_column)).scalars():
+            match = pattern.match(value or "")
+            if match:
+                highest = max(highest, int(match.group(1)))
+        return highest + 1
+
+    def _reserve_block(self) -> None:
+        """Claim the next block in its own transaction (lock held)"""
+        table = IdBlock.__table__
+        for _ in range(2):
+            with self.engine.begin() as conn:
+                claimed = conn.execute(
+                    update(table)
+                    .where(table.c.name == self.name)
+                    .values(next_value=table.c.next_value + self.block_size)
+                )
+                if claimed.rowcount:
+                    end = conn.execute(select(table.c.next_value).where(table.c.name == self.name)).scalar()
+                    self._next, self._limit = end - self.block_size, end
+                    self.blocks_reserved += 1
+                    return
+            # First use of this sequence: create its row, then claim again
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(table.insert().values(name=self.name, next_value=self._initial_value(conn)))
+            except IntegrityError:
+                pass  # another worker created it first
+        raise RuntimeError(f"Could not reserve ids for sequence {self.name}")
+
+    def next_value(self) -> int:
+        with self._lock:
+            if self._next >= self._limit:
+                self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    def next_id(self) -> str:
+        return f"{self.prefix}{self.next_value():0{self.width}d}"
+
+    async def next_id_async(self) -> str:
+        """
+        next_id for async routes
+
+        Ids still in the current block are served without leaving the event
+        loop; reserving a new block runs on a worker thread, so the blocking
+        UPDATE cannot stall async sessions that hold the database's write lock.
+        """
+        with self._lock:
+            if self._next < self._limit:
+                value = self._next
+                self._next += 1
+                return f"{self.prefix}{value:0{self.width}d}"
+        return await asyncio.to_thread(self.next_id)
+
+
+booking_ids = BlockIdAllocator(
+    engine, "booking", prefix="BK",
+    block_size=int(os.getenv("BOOKING_ID_BLOCK_SIZE", 100)),
+    seed_column=Booking.booking_id
+)
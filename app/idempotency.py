@@ -0,0 +1,129 @@
+"""
+Idempotency keys for mutating endpoints
+
+Clients send an Idempotency-Key header with a booking or cancellation. The
+first request with a key runs normally and its outcome is stored; retries with
+the same key get the stored outcome back without touching inventory or
+notifications. A retry that arrives while the first request is still running
+waits for it instead of running again.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[HTTPException] = None
+
+
+def fingerprint(*parts: str) -> str:
+    """Hash the parts of a request that must match on retry"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Bounded TTL map of idempotency keys to stored outcomes
+
+    Every entry shares the same TTL, so insertion order is also expiry order
+    and expired entries can be trimmed from the front in O(1) each.
+
+    Args:
+        ttl_seconds: How long an outcome is replayed for
+        max_size: Maximum number of keys kept
+    """
+
+    def __init__(self, ttl_seconds: float = 86_400, max_size: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+
+    def execute(self, scope: str, key: str, request_fingerprint: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` once per (scope, key) and replay its outcome afterwards
+
+        Successful results and client errors (4xx) are stored. Server errors
+        are not, so a retry can run again.
+
+        Raises:
+            HTTPException: 422 if the key was used for a different request,
+                or the stored client error of the original request
+        """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get((scope, key))
+            if entry is None or entry.expires_at < now:
+                entry = _Entry(fingerprint=request_fingerprint, expires_at=now + self.ttl_seconds)
+                self._entries[(scope, key)] = entry
+                owner = True
+            else:
+                owner = False
+
+        if entry.fingerprint != request_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+        if not owner:
+            entry.done.wait()
+            with self._lock:
+                self.replays += 1
+            if entry.error is not None:
+                raise entry.error
+            return entry.result
+
+        try:
+            entry.result = fn()
+            return entry.result
+        except HTTPException as e:
+            if e.status_code < 500:
+                entry.error = e
+            else:
+                self._forget(scope, key, entry)
+            raise
+        except Exception:
+            self._forget(scope, key, entry)
+            raise
+        finally:
+            entry.done.set()
+
+    def _forget(self, scope: str, key: str, entry: _Entry) -> None:
+        """Drop a failed entry so the key can be retried; waiters see a 409"""
+        entry.error = HTTPException(status_code=409, detail="Original request failed, please retry")
+        with self._lock:
+            if self._entries.get((scope, key)) is entry:
+                del self._entries[(scope, key)]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired keys and enforce the size bound (lock held)"""
+        while self._entries:
+            key, oldest = next(iter(self._entries.items()))
+            if oldest.expires_at >= now and len(self._entries) < self.max_size:
+                break
+            del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86_400)),
+    max_size=int(os.getenv("IDEMPOTENCY_MAX_KEYS", 100_000))
+)
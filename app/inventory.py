@@ -0,0 +1,244 @@
+"""
+Concurrent seat inventory
+
+Every seat change on a flight goes through SeatInventory, which serializes
+changes per flight with striped locks so bookings on different flights never
+wait on each other. Each change bumps the flight's inventory version, which
+price quotes use to detect that availability moved since they were issued.
+Flights that hand out seat numbers also keep a bitmap seat map here, updated
+under the same lock as the seat count. reserve() takes unnumbered seats
+(simulated bookings) out of an existing map too, so the two stay in step.
+
+Works with both flight stores: flights_data dicts and Flight models. Both
+use FLxxxx ids for different flights, so versions and seat maps are keyed
+by (store, flight_id).
+"""
+
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.models import Flight
+from app.seat_map import SeatMap
+from app.state import bookings_data
+
+FlightRecord = Union[dict, Flight]
+
+# Key namespaces of the two flight stores
+FLIGHTS_DATA = "flights_data"
+FLIGHT_DB = "flight_db"
+
+
+class InventoryError(ValueError):
+    """Raised when seats cannot be reserved"""
+
+
+class SoldOutError(InventoryError):
+    """Raised when a flight has fewer seats left than requested"""
+
+
+class StaleInventoryError(InventoryError):
+    """Raised when a flight's inventory changed since the expected version"""
+
+
+def _get(flight: FlightRecord, field: str):
+    return flight[field] if isinstance(flight, dict) else getattr(flight, field)
+
+
+def _set(flight: FlightRecord, field: str, value) -> None:
+    if isinstance(flight, dict):
+        flight[field] = value
+    else:
+        setattr(flight, field, value)
+
+
+def _key(flight: FlightRecord) -> Tuple[str, str]:
+    return (FLIGHTS_DATA if isinstance(flight, dict) else FLIGHT_DB, _get(flight, "flight_id"))
+
+
+class SeatInventory:
+    """
+    Per-flight atomic seat reservation
+
+    Args:
+        stripes: Number of locks flights are hashed onto
+        taken_seats: Returns the seat numbers already held on a flights_data
+            flight, marked taken when its seat map is first built (e.g.
+            restored bookings)
+    """
+
+    def __init__(self, stripes: int = 256, taken_seats: Optional[Callable[[str], Iterable[str]]] = None):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._seat_maps: Dict[Tuple[str, str], SeatMap] = {}
+        self.taken_seats = taken_seats
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _bump(self, key: Tuple[str, str]) -> int:
+        """Advance a flight's version (stripe lock held)"""
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+        return version
+
+    def version(self, flight_id: str, store: str = FLIGHTS_DATA) -> int:
+        """Current inventory version of a flight in `store` (flights_data by default)"""
+        return self._versions.get((store, flight_id), 0)
+
+    def reserve(self, flight: FlightRecord, seats: int = 1, expected_version: Optional[int] = None) -> int:
+        """
+        Take seats from a flight without assigning seat numbers
+
+        If the flight has a seat map, the seats are taken from it as well.
+
+        Args:
+            flight: Flight record to update
+            seats: Number of seats to take
+            expected_version: Only reserve if the flight is still at this
+                version (compare-and-swap for quoted prices)
+
+        Returns:
+            The flight's new inventory version
+
+        Raises:
+            SoldOutError: If fewer than `seats` seats are left
+            StaleInventoryError: If the version no longer matches
+        """
+        key = _key(flight)
+        with self._lock(key):
+            if expected_version is not None and self._versions.get(key, 0) != expected_version:
+                raise StaleInventoryError("Seat availability changed since this price was quoted, please search again")
+            available = _get(flight, "available_seats")
+            if available < seats:
+                raise SoldOutError("No seats available")
+            _set(flight, "available_seats", available - seats)
+            seat_map = self._seat_maps.get(key)
+            if seat_map is not None and seat_map.allocate_group(seats) is None:
+                # Map and count had drifted; rebuild the map from the count
+                del self._seat_maps[key]
+            return self._bump(key)
+
+    def _seat_map(self, flight: FlightRecord) -> SeatMap:
+        """Seat map of a flight, built from its availability on first use (stripe lock held)"""
+        key = _key(flight)
+        seat_map = self._seat_maps.get(key)
+        if seat_map is None:
+            store, flight_id = key
+            seat_map = SeatMap.for_flight(
+                flight_id,
+                _get(flight, "tier"),
+                _get(flight, "total_seats"),
+                _get(flight, "available_seats"),
+                taken=self.taken_seats(flight_id) if self.taken_seats and store == FLIGHTS_DATA else ()
+            )
+            self._seat_maps[key] = seat_map
+        return seat_map
+
+    def reserve_seats(
+        self,
+        flight: FlightRecord,
+        count: int = 1,
+        preference: Optional[str] = None,
+        expected_version: Optional[int] = None
+    ) -> List[str]:
+        """
+        Take seats from a flight and assign seat numbers
+
+        A single seat follows `preference` (window, aisle or middle) where
+        one is free; several seats are placed side by side where possible.
+
+        Returns:
+            The assigned seat numbers
+
+        Raises:
+            SoldOutError: If fewer than `count` seats are left
+            StaleInventoryError: If the version no longer matches
+        """
+        key = _key(flight)
+        with self._lock(key):
+            if expected_version is not None and self._versions.get(key, 0) != expected_version:
+                raise StaleInventoryError("Seat availability changed since this price was quoted, please search again")
+            available = _get(flight, "available_seats")
+            seats = self._seat_map(flight).allocate_group(count, preference) if available >= count else None
+            if seats is None:
+                raise SoldOutError("No seats available")
+            _set(flight, "available_seats", available - count)
+            self._bump(key)
+            return seats
+
+    def release(self, flight: FlightRecord, seats: int = 1, seat_numbers: Iterable[str] = ()) -> int:
+        """
+        Return seats to a flight, never exceeding its capacity
+
+        Args:
+            flight: Flight record to update
+            seats: Number of seats to return
+            seat_numbers: Assigned seats to free in the flight's seat map;
+                if fewer than `seats`, the map is rebuilt on next use
+
+        Returns:
+            The flight's new inventory version
+        """
+        key = _key(flight)
+        with self._lock(key):
+            available = _get(flight, "available_seats") + seats
+            _set(flight, "available_seats", min(available, _get(flight, "total_seats")))
+            seat_map = self._seat_maps.get(key)
+            if seat_map is not None:
+                seat_numbers = list(seat_numbers)
+                for seat_no in seat_numbers:
+                    seat_map.release(seat_no)
+                if seats > len(seat_numbers):
+                    # Which seats came back is unknown; rebuild the map from the count
+                    del self._seat_maps[key]
+            return self._bump(key)
+
+    def apply_bookings(
+        self,
+        flights: Iterable[FlightRecord],
+        bookings: Iterable[dict],
+        counted: Iterable[dict] = ()
+    ) -> None:
+        """
+        Take the seats of bookings restored at startup (journal replay)
+
+        Flights loaded after a restart know nothing of bookings made before
+        it, so each flight's availability drops by its confirmed restored
+        bookings, within zero and the flight's capacity.
+
+        Args:
+            flights: Flight records to update
+            bookings: Bookings that hold seats now
+            counted: Bookings the flights' availability already reflects
+                (those in the snapshot the flights were restored from);
+                ones no longer in `bookings` give their seats back
+        """
+        def confirmed(records: Iterable[dict]) -> Counter:
+            return Counter(b["flight_id"] for b in records if b.get("booking_status") == "confirmed")
+
+        held = confirmed(bookings)
+        held.subtract(confirmed(counted))
+        for flight in flights:
+            key = _key(flight)
+            if held[key[1]]:
+                with self._lock(key):
+                    available = _get(flight, "available_seats") - held[key[1]]
+                    _set(flight, "available_seats", min(max(0, available), _get(flight, "total_seats")))
+                    self._seat_maps.pop(key, None)
+                    self._bump(key)
+
+    def seat_map(self, flight: FlightRecord) -> SeatMap:
+        """Current seat map of a flight"""
+        with self._lock(_key(flight)):
+            return self._seat_map(flight)
+
+    def clear(self) -> None:
+        """Forget all versions and seat maps"""
+        self._versions.clear()
+        self._seat_maps.clear()
+
+
+inventory = SeatInventory(
+    taken_seats=lambda flight_id: [b["seat_no"] for b in bookings_data.for_flight(flight_id) if b.get("seat_no")]
+)
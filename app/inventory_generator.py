@@ -0,0 +1,420 @@
+"""
+Seeded, vectorized synthetic flight inventory generator
+
+Streams flights in column batches so large schedules can be loaded into the
+in-memory stores or SQL tables without materializing one giant list.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from app.data.airports import AIRPORTS, AIRLINE_NAMES, get_airport_info
+from app.demand import classify_demand
+from app.flight_database import Airline, Airport, Flight as SQLFlight
+from app.flight_stats import adjust_stats
+from app.models import DemandLevel, Flight, PricingTier
+from app.models.database_models import Flight as FlightRecord
+
+
+TIERS = list(PricingTier)
+
+# Base fare multiplier per tier, indexed like TIERS
+TIER_FARE_MULTIPLIERS = np.array([1.0, 1.5, 2.5, 4.0])
+
+# Inclusive seat count ranges per tier, indexed like TIERS
+TIER_SEAT_LOW = np.array([150, 40, 20, 8])
+TIER_SEAT_HIGH = np.array([200, 60, 30, 16])
+
+DEMAND_LABELS = np.array([level.value for level in DemandLevel])
+
+
+@dataclass
+class FlightBatch:
+    """A chunk of generated flights stored column-wise"""
+    flight_ids: np.ndarray
+    airlines: np.ndarray
+    origins: np.ndarray
+    destinations: np.ndarray
+    departure_times: np.ndarray
+    arrival_times: np.ndarray
+    base_fares: np.ndarray
+    total_seats: np.ndarray
+    available_seats: np.ndarray
+    tiers: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.flight_ids)
+
+    def departure_hours(self) -> np.ndarray:
+        """Departure hour of day for every flight in the batch"""
+        days = self.departure_times.astype("datetime64[D]")
+        return (self.departure_times.astype("datetime64[h]") - days).astype(int)
+
+    def demand_codes(self) -> np.ndarray:
+        """Demand classification for every flight in the batch"""
+        occupancy = 1 - self.available_seats / self.total_seats
+        return classify_demand(occupancy, self.departure_hours())
+
+    def _columns(self) -> Iterator[tuple]:
+        """Yield per-flight tuples of plain Python values"""
+        return zip(
+            self.flight_ids.tolist(),
+            self.airlines.tolist(),
+            self.origins.tolist(),
+            self.destinations.tolist(),
+            self.departure_times.tolist(),
+            self.arrival_times.tolist(),
+            self.base_fares.tolist(),
+            self.total_seats.tolist(),
+            self.available_seats.tolist(),
+            [TIERS[t] for t in self.tiers.tolist()],
+        )
+
+    def to_flights(self) -> List[Flight]:
+        """Convert the batch to Flight models for the FlightDatabase"""
+        return [
+            Flight(
+                flight_id=flight_id,
+                airline=airline,
+                origin=origin,
+                destination=destination,
+                departure_time=departure,
+                arrival_time=arrival,
+                base_fare=base_fare,
+                total_seats=total,
+                available_seats=available,
+                tier=tier,
+            )
+            for (flight_id, airline, origin, destination, departure, arrival,
+                 base_fare, total, available, tier) in self._columns()
+        ]
+
+    def to_rows(self) -> List[Dict]:
+        """Convert the batch to row dicts matching the `flights` SQL table"""
+        return [
+            {
+                "flight_id": flight_id,
+                "airline": airline,
+                "origin": origin,
+                "destination": destination,
+                "departure_time": departure,
+                "arrival_time": arrival,
+                "base_fare": int(base_fare),
+                "total_seats": total,
+                "available_seats": available,
+                "tier": tier.value,
+            }
+            for (flight_id, airline, origin, destination, departure, arrival,
+                 base_fare, total, available, tier) in self._columns()
+        ]
+
+    def _priced_columns(self) -> Iterator[tuple]:
+        """Yield per-flight tuples plus current price, demand level and duration in minutes"""
+        occupancy = 1 - self.available_seats / self.total_seats
+        current_prices = np.round(self.base_fares * (1 + occupancy * 0.8), 2)
+        demand = DEMAND_LABELS[self.demand_codes()]
+        durations = (self.arrival_times - self.departure_times).astype(int)
+        return zip(self._columns(), current_prices.tolist(), demand.tolist(), durations.tolist())
+
+    def to_flight_table_rows(self, airline_ids: Dict[str, int]) -> List[Dict]:
+        """
+        Convert the batch to row dicts matching `app.flight_database.Flight`
+
+        Args:
+            airline_ids: Airline name to airline_id, for the airlines the
+                generator was built with
+        """
+        return [
+            {
+                "flight_id": flight_id,
+                "airline_id": airline_ids[airline],
+                "source_airport": origin,
+                "destination_airport": destination,
+                "departure_time": departure,
+                "arrival_time": arrival,
+                "duration": f"{minutes // 60}h {minutes % 60}m",
+                "base_fare": base_fare,
+                "current_price": price,
+                "total_seats": total,
+                "available_seats": available,
+                "tier": tier.value,
+                "demand_level": level
+            }
+            for (flight_id, airline, origin, destination, departure, arrival,
+                 base_fare, total, available, tier), price, level, minutes in self._priced_columns()
+        ]
+
+    def to_records(self) -> List[Dict]:
+        """Convert the batch to the dict shape used by `app.state.flights_data`"""
+        records = []
+        for (flight_id, airline, origin, destination, departure, arrival,
+             base_fare, total, available, tier), price, level, minutes in self._priced_columns():
+            records.append({
+                "flight_id": flight_id,
+                "airline": airline,
+                "origin": origin,
+                "destination": destination,
+                "origin_city": get_airport_info(origin)["city"],
+                "destination_city": get_airport_info(destination)["city"],
+                "departure_time": departure.strftime("%Y-%m-%d %H:%M"),
+                "arrival_time": arrival.strftime("%Y-%m-%d %H:%M"),
+                "duration": f"{minutes // 60}h {minutes % 60}m",
+                "current_price": price,
+                "base_fare": base_fare,
+                "available_seats": available,
+                "total_seats": total,
+                "tier": tier.value,
+                "demand_level": level
+            })
+        return records
+
+
+class SyntheticInventoryGenerator:
+    """
+    Generates reproducible flight schedules for scale testing
+
+    Routes are drawn once from the airport table and flown every day, so
+    N days x M routes x K departures per route yields N*M*K flights.
+    Output is deterministic for a given seed and set of arguments.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        airports: Optional[Sequence[str]] = None,
+        airlines: Optional[Sequence[str]] = None,
+        departure_hours: Tuple[int, int] = (6, 22),
+        duration_range: Tuple[int, int] = (90, 420)
+    ):
+        self.rng = np.random.default_rng(seed)
+        self.airports = np.array(list(airports) if airports else list(AIRPORTS.keys()))
+        self.airlines = np.array(list(airlines) if airlines else list(AIRLINE_NAMES.values()))
+        self.departure_hours = departure_hours
+        self.duration_range = duration_range
+
+        if len(self.airports) < 2:
+            raise ValueError("At least two airports are required to build routes")
+
+    def draw_routes(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw `count` origin/destination pairs with distinct endpoints"""
+        n = len(self.airports)
+        origins = self.rng.integers(0, n, size=count)
+        # Offset by 1..n-1 so the destination never equals the origin
+        destinations = (origins + self.rng.integers(1, n, size=count)) % n
+        return self.airports[origins], self.airports[destinations]
+
+    def iter_batches(
+        self,
+        days: int,
+        routes: int,
+        flights_per_route: int = 1,
+        batch_size: int = 10_000,
+        start_id: int = 1,
+        start_date: Optional[datetime] = None
+    ) -> Iterator[FlightBatch]:
+        """
+        Stream generated flights in batches
+
+        Args:
+            days: Number of days to schedule, starting at `start_date`
+            routes: Number of distinct routes drawn from the airport table
+            flights_per_route: Departures per route per day
+            batch_size: Maximum flights per yielded batch
+            start_id: Numeric part of the first flight ID
+            start_date: First schedule day (defaults to today)
+
+        Yields:
+            FlightBatch chunks of at most `batch_size` flights
+        """
+        route_origins, route_destinations = self.draw_routes(routes)
+        start = np.datetime64((start_date or datetime.now()).date(), "m")
+        per_day = routes * flights_per_route
+        total = days * per_day
+
+        for offset in range(0, total, batch_size):
+            index = np.arange(offset, min(offset + batch_size, total))
+            yield self._build_batch(
+                index, per_day, flights_per_route,
+                route_origins, route_destinations, start, start_id
+            )
+
+    def _build_batch(
+        self,
+        index: np.ndarray,
+        per_day: int,
+        flights_per_route: int,
+        route_origins: np.ndarray,
+        route_destinations: np.ndarray,
+        start: np.datetime64,
+        start_id: int
+    ) -> FlightBatch:
+        """Generate every column for the flights at positions `index`"""
+        size = len(index)
+        rng = self.rng
+        day = index // per_day
+        route = (index % per_day) // flights_per_route
+
+        hour = rng.integers(self.departure_hours[0], self.departure_hours[1] + 1, size=size)
+        minute = rng.choice([0, 15, 30, 45], size=size)
+        departure = start + (day * 1440 + hour * 60 + minute).astype("timedelta64[m]")
+
+        duration = rng.integers(self.duration_range[0], self.duration_range[1] + 1, size=size)
+        arrival = departure + duration.astype("timedelta64[m]")
+
+        tier = rng.integers(0, len(TIERS), size=size)
+        base_fare = np.round(duration * 0.5 * TIER_FARE_MULTIPLIERS[tier], 2)
+
+        total_seats = rng.integers(TIER_SEAT_LOW[tier], TIER_SEAT_HIGH[tier] + 1)
+        available_seats = rng.integers((total_seats * 0.3).astype(int), total_seats + 1)
+
+        ids = index + start_id
+        return FlightBatch(
+            flight_ids=np.char.add("FL", np.char.zfill(ids.astype(str), 4)),
+            airlines=self.airlines[rng.integers(0, len(self.airlines), size=size)],
+            origins=route_origins[route],
+            destinations=route_destinations[route],
+            departure_times=departure,
+            arrival_times=arrival,
+            base_fares=base_fare,
+            total_seats=total_seats,
+            available_seats=available_seats,
+            tiers=tier,
+        )
+
+
+def load_into_flight_database(database, batches: Iterable[FlightBatch]) -> int:
+    """Bulk-load batches into a FlightDatabase, returning the flight count"""
+    loaded = 0
+    for batch in batches:
+        database.add_flights(batch.to_flights(), demand_codes=batch.demand_codes())
+        loaded += len(batch)
+    return loaded
+
+
+def load_into_records(records: list, batches: Iterable[FlightBatch]) -> int:
+    """Append batches to a dict-based store such as `app.state.flights_data`"""
+    loaded = 0
+    for batch in batches:
+        records.extend(batch.to_records())
+        loaded += len(batch)
+    return loaded
+
+
+def load_into_table(connection, batches: Iterable[FlightBatch], table=None) -> int:
+    """
+    Bulk-insert batches into a SQL table with one executemany per batch
+
+    Args:
+        connection: SQLAlchemy Connection (caller owns the transaction)
+        batches: Batches from `SyntheticInventoryGenerator.iter_batches`
+        table: Target table, defaults to the `flights` table
+
+    Returns:
+        Number of rows inserted
+    """
+    target = table if table is not None else FlightRecord.__table__
+    loaded = 0
+    for batch in batches:
+        connection.execute(insert(target), batch.to_rows())
+        loaded += len(batch)
+    return loaded
+
+
+def _copy_rows(connection, table, rows: List[Dict]) -> None:
+    """Stream rows into a PostgreSQL table with COPY ... FROM STDIN (psycopg2)"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[column] for column in columns] for row in rows)
+    buffer.seek(0)
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def load_into_flight_tables(
+    connection,
+    batches: Iterable[FlightBatch],
+    airline_ids: Dict[str, int],
+    use_copy: Optional[bool] = None
+) -> int:
+    """
+    Bulk-insert batches into the `app.flight_database` flights table
+
+    Each batch is one COPY on PostgreSQL with psycopg2, otherwise one Core
+    executemany. No ORM objects are created.
+
+    Args:
+        connection: SQLAlchemy Connection (caller owns the transaction)
+        batches: Batches from `SyntheticInventoryGenerator.iter_batches`
+        airline_ids: Airline name to airline_id
+        use_copy: Force COPY on or off (defaults to on where supported)
+
+    Returns:
+        Number of rows inserted
+    """
+    if use_copy is None:
+        use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+    table = SQLFlight.__table__
+    loaded = 0
+    for batch in batches:
+        rows = batch.to_flight_table_rows(airline_ids)
+        if use_copy:
+            _copy_rows(connection, table, rows)
+        else:
+            connection.execute(insert(table), rows)
+        loaded += len(batch)
+    return loaded
+
+
+def seed_flight_database(
+    connection,
+    days: int,
+    routes: int,
+    flights_per_route: int = 1,
+    seed: Optional[int] = None,
+    batch_size: int = 10_000,
+    start_id: int = 1,
+    use_copy: Optional[bool] = None
+) -> int:
+    """
+    Generate a schedule over the airports and airlines already in the database
+
+    Airports and airlines are read once up front; flights are then streamed
+    in batches with `load_into_flight_tables`, and the /stats summary row is
+    adjusted by the batch totals in the same transaction.
+
+    Raises:
+        ValueError: If the airport or airline tables are empty
+
+    Returns:
+        Number of flights inserted
+    """
+    airports = connection.execute(select(Airport.code)).scalars().all()
+    airline_ids = dict(connection.execute(select(Airline.name, Airline.airline_id)).all())
+    if len(airports) < 2 or not airline_ids:
+        raise ValueError("Airlines or airports not found in database, run the SQL setup script first")
+
+    generator = SyntheticInventoryGenerator(seed=seed, airports=airports, airlines=list(airline_ids))
+    totals = {"total_seats": 0, "available_seats": 0}
+
+    def counted(batches: Iterable[FlightBatch]) -> Iterator[FlightBatch]:
+        for batch in batches:
+            totals["total_seats"] += int(batch.total_seats.sum())
+            totals["available_seats"] += int(batch.available_seats.sum())
+            yield batch
+
+    batches = generator.iter_batches(
+        days=days, routes=routes, flights_per_route=flights_per_route,
+        batch_size=batch_size, start_id=start_id
+    )
+    loaded = load_into_flight_tables(connection, counted(batches), airline_ids, use_copy=use_copy)
+    adjust_stats(connection, total_flights=loaded, **totals)
+    return loaded
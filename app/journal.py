@@ -0,0 +1,304 @@
+"""
+Write-ahead journal for in-memory bookings
+
+Every booking mutation is appended to a JSON-lines journal after it is
+applied to bookings_data, and the journal is replayed into the store on
+startup. Writes are group committed: a background thread fsyncs whatever has
+accumulated, waiting up to `sync_interval` seconds or until `sync_records`
+records are pending before each fsync. Records that arrive while an fsync is
+in flight share the next one, so even a zero interval batches under load.
+
+Durability modes:
+    always  fsync every record before returning (slowest, no loss window)
+    group   callers wait for the next group fsync (default)
+    async   callers return immediately; up to one sync interval can be lost
+
+Periodic snapshots of the whole store bound replay time. Replay is keyed by
+booking id, so records that are both in a snapshot and after it in the
+journal are applied idempotently.
+
+Card details are never journaled. Flight seat counts are not either, because
+flights_data is rebuilt from the airline feed on every start.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+SYNC_MODES = ("always", "group", "async")
+
+
+class BookingJournal:
+    """
+    Append-only booking journal with group commit and snapshots
+
+    Args:
+        directory: Where journal and snapshot files are kept
+        mode: One of SYNC_MODES
+        sync_interval: Extra seconds to gather records before each fsync
+        sync_records: Pending records that trigger an early fsync
+        snapshot_every: Records between automatic snapshots (0 disables)
+        snapshot_source: Returns the current bookings for a snapshot
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        mode: str = "group",
+        sync_interval: float = 0.0,
+        sync_records: int = 64,
+        snapshot_every: int = 10_000,
+        snapshot_source: Optional[Callable[[], List[dict]]] = None
+    ):
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Journal mode must be one of {SYNC_MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.sync_interval = sync_interval
+        self.sync_records = sync_records
+        self.snapshot_every = snapshot_every
+        self.snapshot_source = snapshot_source
+
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._seq = 0
+        self._durable_seq = 0
+        self._since_snapshot = 0
+        self._snapshotting = False
+        self._file = None
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+    # Files
+
+    def _journal_path(self, start_seq: int) -> str:
+        return os.path.join(self.directory, f"journal-{start_seq:012d}.log")
+
+    def _snapshot_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{seq:012d}.json")
+
+    @staticmethod
+    def _file_seq(path: str) -> int:
+        return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+    def _open_journal(self) -> None:
+        """Start a new journal file after the current sequence (io lock held)"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._journal_path(self._seq + 1), "ab")
+
+    def _write(self, lines: List[str]) -> None:
+        """Write and fsync a group of records (io lock held)"""
+        if self._file is None:
+            self._open_journal()
+        self._file.write("".join(lines).encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # Appending
+
+    def append(self, op: str, **data) -> int:
+        """
+        Journal one mutation
+
+        Returns:
+            The record's sequence number
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Journal is closed")
+            self._seq += 1
+            seq = self._seq
+            line = json.dumps({"seq": seq, "op": op, **data}, default=str) + "\n"
+            self._since_snapshot += 1
+            snapshot_due = (
+                self.snapshot_every and self.snapshot_source is not None
+                and self._since_snapshot >= self.snapshot_every and not self._snapshotting
+            )
+            if snapshot_due:
+                self._snapshotting = True
+
+            if self.mode == "always":
+                with self._io_lock:
+                    self._write([line])
+                self._durable_seq = seq
+            else:
+                self._pending.append(line)
+                self._start_flusher()
+                if len(self._pending) == 1 or len(self._pending) >= self.sync_records:
+                    self._cond.notify_all()
+                if self.mode == "group":
+                    while self._durable_seq < seq and not self._closed:
+                        self._cond.wait()
+
+        if snapshot_due:
+            threading.Thread(target=self.snapshot, name="journal-snapshot", daemon=True).start()
+        return seq
+
+    def _start_flusher(self) -> None:
+        """Start the group commit thread on first use (cond held)"""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="journal-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.sync_interval
+                while not self._closed and len(self._pending) < self.sync_records:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed and not self._pending:
+                    return
+                lines, self._pending = self._pending, []
+                last_seq = self._seq
+
+            if lines:
+                with self._io_lock:
+                    self._write(lines)
+                with self._cond:
+                    self._durable_seq = max(self._durable_seq, last_seq)
+                    self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Write and fsync everything appended so far"""
+        with self._cond:
+            lines, self._pending = self._pending, []
+            last_seq = self._seq
+            with self._io_lock:
+                if lines:
+                    self._write(lines)
+            self._durable_seq = max(self._durable_seq, last_seq)
+            self._cond.notify_all()
+
+    # Snapshots and replay
+
+    def snapshot(self) -> int:
+        """
+        Write the current store to a snapshot and drop older journal files
+
+        Returns:
+            Sequence number covered by the snapshot
+        """
+        try:
+            with self._cond:
+                # Mutations are applied before they are journaled, so a copy
+                # taken now contains every record up to the current sequence
+                bookings = [dict(b) for b in self.snapshot_source()]
+                seq = self._seq
+                lines, self._pending = self._pending, []
+                with self._io_lock:
+                    if lines:
+                        self._write(lines)
+                    self._open_journal()
+                self._durable_seq = max(self._durable_seq, seq)
+                self._since_snapshot = 0
+                self._cond.notify_all()
+
+            path = self._snapshot_path(seq)
+            with open(path + ".tmp", "w") as f:
+                json.dump({"seq": seq, "bookings": bookings}, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+
+            for old in glob.glob(os.path.join(self.directory, "snapshot-*.json")):
+                if self._file_seq(old) < seq:
+                    os.remove(old)
+            for old in glob.glob(os.path.join(self.directory, "journal-*.log")):
+                if self._file_seq(old) <= seq:
+                    os.remove(old)
+            return seq
+        finally:
+            self._snapshotting = False
+
+    def replay(self) -> List[dict]:
+        """
+        Rebuild bookings from the latest snapshot and the journal after it
+
+        A torn final record from a crash mid-write is ignored and cut off
+        the file. Otherwise records appended after restarting would follow
+        the partial line and be lost at the next replay.
+        """
+        bookings = {}
+        snapshot_seq = 0
+        snapshots = sorted(glob.glob(os.path.join(self.directory, "snapshot-*.json")), key=self._file_seq)
+        if snapshots:
+            with open(snapshots[-1]) as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot["seq"]
+            bookings = {b["booking_id"]: b for b in snapshot["bookings"]}
+
+        last_seq = snapshot_seq
+        for path in sorted(glob.glob(os.path.join(self.directory, "journal-*.log")), key=self._file_seq):
+            complete, terminated = 0, True
+            with open(path, "rb") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        break
+                    complete += len(raw)
+                    terminated = raw.endswith(b"\n")
+                    last_seq = max(last_seq, record["seq"])
+                    if record["seq"] <= snapshot_seq:
+                        continue
+                    if record["op"] == "book":
+                        for booking in record["bookings"]:
+                            bookings[booking["booking_id"]] = booking
+                    elif record["op"] == "cancel":
+                        for booking_id in record.get("booking_ids") or [record["booking_id"]]:
+                            bookings.pop(booking_id, None)
+            if complete < os.path.getsize(path) or not terminated:
+                self._trim(path, complete, terminated)
+
+        with self._cond:
+            self._seq = max(self._seq, last_seq)
+            self._durable_seq = self._seq
+            with self._io_lock:
+                self._open_journal()
+        return list(bookings.values())
+
+    @staticmethod
+    def _trim(path: str, length: int, terminated: bool) -> None:
+        """Cut a journal file back to its complete records, ending the last one with a newline"""
+        with open(path, "r+b") as f:
+            f.truncate(length)
+            if not terminated:
+                f.seek(length)
+                f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        """Flush pending records and stop the group commit thread"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+BOOKING_JOURNAL_DIR = os.getenv("BOOKING_JOURNAL_DIR")
+
+booking_journal = BookingJournal(
+    BOOKING_JOURNAL_DIR,
+    mode=os.getenv("BOOKING_JOURNAL_SYNC", "group"),
+    sync_interval=float(os.getenv("BOOKING_JOURNAL_SYNC_MS", 0)) / 1000,
+    sync_records=int(os.getenv("BOOKING_JOURNAL_SYNC_RECORDS", 64)),
+    snapshot_every=int(os.getenv("BOOKING_JOURNAL_SNAPSHOT_EVERY", 10_000))
+) if BOOKING_JOURNAL_DIR else None
@@ -0,0 +1,171 @@
+"""
+Pooled SMTP delivery
+
+Keeps a few authenticated SMTP sessions open and reuses them across
+messages, so a burst of booking emails pays the connect/STARTTLS/login
+handshake once per session instead of once per message.
+"""
+
+import os
+import smtplib
+import socket
+import threading
+import time
+from email.message import Message
+from typing import List, Optional
+
+# Errors that mean the session itself is unusable and should be replaced. Not
+# OSError: SMTPException subclasses it, and a refused recipient or rejected
+# message leaves the session fine for the next one
+SESSION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+class SMTPSessionPool:
+    """
+    Bounded pool of reusable SMTP sessions
+
+    Args:
+        host: SMTP server host
+        port: SMTP server port
+        username: Login user, also used as the sender address
+        password: Login password; login is skipped when either is empty
+        size: Maximum number of open sessions
+        idle_timeout: Seconds an unused session is kept before reconnecting
+        timeout: Socket timeout for SMTP operations
+        starttls: Upgrade connections with STARTTLS before login
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 2,
+        idle_timeout: float = 60.0,
+        timeout: float = 15.0,
+        starttls: bool = True
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.starttls = starttls
+
+        self._idle: List[tuple] = []
+        self._open = 0
+        self._available = threading.Condition()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        """Take an idle session, or open one if the pool has room"""
+        with self._available:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    server, last_used = self._idle.pop()
+                    if now - last_used <= self.idle_timeout:
+                        return server
+                    self._open -= 1
+                    self._discard(server)
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                self._available.wait()
+
+        try:
+            return self._connect()
+        except Exception:
+            self._release(None)
+            raise
+
+    def _release(self, server: Optional[smtplib.SMTP]) -> None:
+        """Return a session to the pool, or free its slot when it was dropped"""
+        with self._available:
+            if server is None:
+                self._open -= 1
+            else:
+                self._idle.append((server, time.monotonic()))
+            self._available.notify()
+
+    def send(self, message: Message) -> None:
+        """Send one message; see send_batch"""
+        error = self.send_batch([message])[0]
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send messages over a single pooled session
+
+        A dropped connection is reopened and the failed message retried once;
+        other failures are reported per message without aborting the batch.
+
+        Returns:
+            One entry per message: None when sent, otherwise the exception
+        """
+        results: List[Optional[Exception]] = []
+        server = None
+        try:
+            for message in messages:
+                for attempt in range(2):
+                    try:
+                        if server is None:
+                            server = self._acquire()
+                        server.send_message(message, from_addr=self.username or message["From"])
+                        results.append(None)
+                        break
+                    except SESSION_ERRORS as e:
+                        if server is not None:
+                            server.close()
+                            self._release(None)
+                            server = None
+                        if attempt == 1:
+                            results.append(e)
+                    except smtplib.SMTPException as e:
+                        results.append(e)
+                        break
+        finally:
+            if server is not None:
+                self._release(server)
+        return results
+
+    def close(self) -> None:
+        """Close all idle sessions"""
+        with self._available:
+            while self._idle:
+                server, _ = self._idle.pop()
+                self._open -= 1
+                self._discard(server)
+
+
+smtp_pool = SMTPSessionPool(
+    host=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+    port=int(os.getenv("SMTP_PORT", 587)),
+    username=os.getenv("SMTP_EMAIL"),
+    password=os.getenv("SMTP_PASSWORD"),
+    size=int(os.getenv("SMTP_POOL_SIZE", 2)),
+    idle_timeout=float(os.getenv("SMTP_IDLE_TIMEOUT", 60)),
+    starttls=os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+)
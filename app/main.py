@@ -1,11 +1,12 @@
 import asyncio
-from fastapi import FastAPI, HTTPException, Query, Depends, status
-from pydantic import BaseModel, EmailStr
+from fastapi import FastAPI, HTTPException, Query, Depends, status, Header, Response
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 import random
+import secrets
 import uuid
 import smtplib
 import socket
@@ -15,11 +16,7 @@ from app.user_database import get_db, User
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
 import json
-import tempfile
 import httpx
 import os
 from dotenv import load_dotenv
@@ -49,6 +46,15 @@ app.include_router(flights_router)
 
 # Import in-memory storage
 from app.state import flights_data, bookings_data
+from app.inventory import inventory, InventoryError, StaleInventoryError
+from app.idempotency import idempotency_store, fingerprint
+from app.journal import booking_journal
+from app.snapshots import state_snapshotter
+from app.quotes import quote_cache, QuoteError
+from app.notifications import notification_queue, PermanentNotificationError
+from app.mailer import smtp_pool
+from app.booking_pdf import shutdown_render_pool
+from app.ticket_cache import ticket_cache, ticket_key
 
 # Amadeus API Configuration - Load from .env
 AMADEUS_CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID")
@@ -69,6 +75,7 @@ if not AMADEUS_CLIENT_ID or not AMADEUS_CLIENT_SECRET:
 
 # Import airports and airlines data from data module
 from app.data.airports import AIRPORTS, AIRLINE_NAMES
+from app.inventory_generator import SyntheticInventoryGenerator, load_into_records
 
 def get_airline_name(code: str) -> str:
     """Convert airline code to full name"""
@@ -99,6 +106,7 @@ class BookingRequest(BaseModel):
     passenger: PassengerDetails
     payment: PaymentDetails
     seat_preference: Optional[str] = None
+    quote_id: Optional[str] = None
 
 class BookingResponse(BaseModel):
     booking_id: str
@@ -109,9 +117,26 @@ class BookingResponse(BaseModel):
     booking_status: str
     confirmation_code: str
     booking_date: str
+    seat_no: Optional[str] = None
     flight_details: Optional[dict] = None
     passenger_details: Optional[dict] = None
 
+MAX_GROUP_SIZE = int(os.getenv("MAX_GROUP_SIZE", 9))
+
+class GroupBookingRequest(BaseModel):
+    flight_id: str
+    passengers: List[PassengerDetails] = Field(..., min_length=1, max_length=MAX_GROUP_SIZE)
+    payment: PaymentDetails
+    seat_preference: Optional[str] = None
+    quote_id: Optional[str] = None
+
+class GroupBookingResponse(BaseModel):
+    group_id: str
+    flight_id: str
+    booking_status: str
+    total_amount: float
+    bookings: List[BookingResponse]
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -181,6 +206,24 @@ async def startup_event():
     print("🚀 Flight Booking API Starting...")
     print("="*60)
     
+    notification_queue.start()
+    
+    if booking_journal:
+        booking_journal.snapshot_source = lambda: list(bookings_data)
+        bookings_data.extend(booking_journal.replay())
+        print(f"📒 Restored {len(bookings_data)} bookings from the journal")
+    
+    if state_snapshotter:
+        # The journal is the record of bookings when enabled; the snapshot
+        # supplies flights, demand levels and fare history, with seat counts
+        # corrected for bookings made or cancelled since it was taken
+        restored = state_snapshotter.restore(include_bookings=booking_journal is None)
+        state_snapshotter.start()
+        if restored:
+            print(f"💾 Restored {restored['flights_data']} flights and {restored['bookings']} bookings from {restored['path']}")
+        if flights_data:
+            return
+    
     print("\n📡 Loading initial flight data...")
     
     # Load just a few popular routes for quick startup
@@ -270,6 +313,9 @@ async def startup_event():
             flights_data = []
     
     finally:
+        if booking_journal:
+            # Replayed bookings hold seats the freshly loaded flights count as free
+            inventory.apply_bookings(flights_data, bookings_data)
         flight_count = len(flights_data)
         status = "✅ Ready" if flight_count > 0 else "⚠️ Limited functionality"
         
@@ -285,6 +331,17 @@ async def startup_event():
         print("="*60)
         print("\n📚 API Documentation: http://localhost:8001/docs\n")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop notification workers; undelivered jobs stay queued on disk"""
+    notification_queue.stop()
+    if state_snapshotter:
+        state_snapshotter.stop()
+    if booking_journal:
+        booking_journal.close()
+    smtp_pool.close()
+    shutdown_render_pool()
+
 async def get_amadeus_token():
     """Get access token from Amadeus API"""
     global AMADEUS_ACCESS_TOKEN, AMADEUS_TOKEN_EXPIRES_AT
@@ -582,53 +639,16 @@ async def load_real_flight_data():
 
 async def load_fallback_flight_data(initial_only=False):
     """Load fallback flight data"""
-    global flights_data
-    
-    airlines = list(AIRLINE_NAMES.values())
-    airports = list(AIRPORTS.keys())
+    generator = SyntheticInventoryGenerator(departure_hours=(6, 23), duration_range=(90, 600))
     
-    flight_id = len(flights_data) + 1
     num_days = 1 if initial_only else 7
-    flights_per_day = 3 if initial_only else 20
+    routes_per_day = 3 if initial_only else 20
     
-    for day in range(num_days):
-        date = datetime.now() + timedelta(days=day)
-        
-        for _ in range(flights_per_day):
-            origin = random.choice(airports)
-            destination = random.choice([a for a in airports if a != origin])
-            
-            departure_hour = random.randint(6, 23)
-            departure_minute = random.choice([0, 15, 30, 45])
-            departure = date.replace(hour=departure_hour, minute=departure_minute, second=0, microsecond=0)
-            
-            duration_minutes = random.randint(90, 600)
-            arrival = departure + timedelta(minutes=duration_minutes)
-            
-            base_fare = round(duration_minutes * 0.2 + random.uniform(50, 200), 2)
-            current_price = round(base_fare * random.uniform(1.0, 1.5), 2)
-            
-            flights_data.append({
-                "flight_id": f"FL{flight_id:04d}",
-                "airline": random.choice(airlines),
-                "origin": origin,
-                "destination": destination,
-                "origin_city": get_airport_info(origin)["city"],
-                "destination_city": get_airport_info(destination)["city"],
-                "departure_time": departure.strftime("%Y-%m-%d %H:%M"),
-                "arrival_time": arrival.strftime("%Y-%m-%d %H:%M"),
-                "duration": f"{duration_minutes // 60}h {duration_minutes % 60}m",
-                "current_price": current_price,
-                "base_fare": base_fare,
-                "available_seats": random.randint(20, 200),
-                "total_seats": random.choice([150, 180, 200]),
-                "tier": random.choice(["economy", "premium", "business"]),
-                "demand_level": random.choice(["low", "medium", "high"])
-            })
-            flight_id += 1
-            
-            if initial_only and len(flights_data) >= 3:
-                return
+    load_into_records(flights_data, generator.iter_batches(
+        days=num_days,
+        routes=routes_per_day,
+        start_id=len(flights_data) + 1
+    ))
 
 def validate_payment(payment: PaymentDetails) -> bool:
     """Validate payment details"""
@@ -639,15 +659,9 @@ def validate_payment(payment: PaymentDetails) -> bool:
             return True
     return False
 
-def send_confirmation_email(email: str, booking: dict) -> bool:
-    """Send booking confirmation email via Gmail SMTP"""
-    try:
-        smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.getenv("SMTP_PORT", 587))
-        sender_email = os.getenv("SMTP_EMAIL")
-        sender_password = os.getenv("SMTP_PASSWORD")
-
-        body = f"""
+def confirmation_email_body(booking: dict) -> str:
+    """Plain-text body of the booking confirmation email"""
+    return f"""
 Dear {booking['passenger']['first_name']} {booking['passenger']['last_name']},
 
 Thank you for booking with SkyBook Airlines!
@@ -682,14 +696,37 @@ Have a great flight!
 
 Best regards,
 SkyBook Airlines Customer Service
-        """
+    """
+
+def build_confirmation_email(email: str, booking: dict, pdf: Optional[bytes] = None) -> MIMEMultipart:
+    """Build the booking confirmation message with its PDF ticket attached"""
+    msg = MIMEMultipart()
+    msg['From'] = smtp_pool.username
+    msg['To'] = email
+    msg['Subject'] = f"Flight Booking Confirmation - {booking['confirmation_code']}"
+    msg.attach(MIMEText(confirmation_email_body(booking), 'plain'))
+
+    try:
+        pdf_attachment = MIMEApplication(pdf or ticket_cache.get(booking), _subtype='pdf')
+        pdf_attachment.add_header('Content-Disposition', 'attachment', 
+                                filename=f'booking_{booking["confirmation_code"]}.pdf')
+        msg.attach(pdf_attachment)
+    except Exception as pdf_err:
+        print(f"⚠️ Error generating PDF: {pdf_err}")
+    return msg
+
+def send_confirmation_email(email: str, booking: dict) -> bool:
+    """Send booking confirmation email over a pooled SMTP session"""
+    try:
+        sender_email = os.getenv("SMTP_EMAIL")
+        sender_password = os.getenv("SMTP_PASSWORD")
 
         if not sender_email or not sender_password:
             print("\n⚠️ SMTP credentials not configured in .env file")
             print("\n📧 EMAIL CONTENT (would be sent to):")
             print(f"To: {email}")
             print(f"Subject: Flight Booking Confirmation - {booking['confirmation_code']}")
-            print(body)
+            print(confirmation_email_body(booking))
             print("="*60)
             print("\n💡 To enable email sending:")
             print("1. Add SMTP_EMAIL and SMTP_PASSWORD to your .env file")
@@ -697,44 +734,11 @@ SkyBook Airlines Customer Service
             print("3. Generate App Password at: https://myaccount.google.com/apppasswords")
             return False
 
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = email
-        msg['Subject'] = f"Flight Booking Confirmation - {booking['confirmation_code']}"
-        msg.attach(MIMEText(body, 'plain'))
-
-        try:
-            pdf_path = generate_booking_pdf(booking)
-            with open(pdf_path, 'rb') as f:
-                pdf_attachment = MIMEApplication(f.read(), _subtype='pdf')
-                pdf_attachment.add_header('Content-Disposition', 'attachment', 
-                                        filename=f'booking_{booking["confirmation_code"]}.pdf')
-                msg.attach(pdf_attachment)
-        except Exception as pdf_err:
-            print(f"⚠️ Error generating PDF: {pdf_err}")
-
-        booking_json = {k: v for k, v in booking.items() if k not in ['payment']}
-        json_attachment = MIMEApplication(
-            json.dumps(booking_json, indent=2).encode('utf-8'),
-            _subtype='json'
-        )
-        json_attachment.add_header('Content-Disposition', 'attachment', 
-                                 filename=f'booking_{booking["confirmation_code"]}.json')
+        msg = build_confirmation_email(email, booking)
 
         try:
             print(f"\n📧 Attempting to send email to {email}...")
-            server = smtplib.SMTP(smtp_server, smtp_port, timeout=15)
-            server.set_debuglevel(0)
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            
-            print(f"🔐 Logging in as {sender_email}...")
-            server.login(sender_email, sender_password)
-            
-            print(f"📤 Sending email...")
-            server.sendmail(sender_email, email, msg.as_string())
-            server.quit()
+            smtp_pool.send(msg)
             
             print(f"✅ EMAIL SUCCESSFULLY SENT TO: {email}")
             print(f"    Confirmation Code: {booking['confirmation_code']}")
@@ -764,96 +768,67 @@ def generate_confirmation_code() -> str:
     """Generate confirmation code"""
     return f"SKY{random.randint(100000, 999999)}"
 
-def generate_booking_pdf(booking: dict) -> str:
-    """Generate PDF for booking confirmation with enhanced design"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-        pdf_path = temp_file.name
-        
-    c = canvas.Canvas(pdf_path, pagesize=letter)
-    width, height = letter
-    
-    c.setFillColor(colors.navy)
-    c.rect(0, height - 150, width, 150, fill=True)
-    
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 36)
-    c.drawString(52, height - 52, "✈")
-    c.drawString(50, height - 50, "✈ SkyBook Airlines")
-    
-    c.setFont("Helvetica-Bold", 24)
-    c.drawString(50, height - 90, "Booking Confirmation")
-    
-    c.setStrokeColor(colors.white)
-    c.setLineWidth(2)
-    c.line(50, height - 110, width - 50, height - 110)
-    
-    y = height - 180
-    
-    def draw_section_header(title, y_pos):
-        c.setFillColor(colors.navy)
-        c.rect(45, y_pos - 5, width - 90, 30, fill=True)
-        c.setFillColor(colors.lightblue)
-        c.rect(45, y_pos - 5, 5, 30, fill=True)
-        c.setFillColor(colors.white)
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(60, y_pos + 5, title)
-        return y_pos - 45
-    
-    def draw_content_row(label, value, y_pos, highlight=False):
-        c.setFillColor(colors.navy if highlight else colors.black)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(60, y_pos, label)
-        c.setFont("Helvetica", 12)
-        c.drawString(200, y_pos, value)
-        return y_pos - 20
-    
-    y = draw_section_header("Booking Information", y)
-    y = draw_content_row("Booking ID:", booking['booking_id'], y)
-    y = draw_content_row("Confirmation Code:", booking['confirmation_code'], y, True)
-    y = draw_content_row("Booking Date:", booking['booking_date'], y)
-    y = y - 10
-    y = draw_content_row("Passenger:", f"{booking['passenger']['first_name']} {booking['passenger']['last_name']}", y)
-    y = draw_content_row("Email:", booking['passenger']['email'], y)
-    y = draw_content_row("Phone:", booking['passenger']['phone'], y)
-    
-    y = y - 20
-    y = draw_section_header("Flight Information", y)
-    y = draw_content_row("Flight ID:", booking['flight_id'], y)
-    y = draw_content_row("Airline:", booking.get('airline', 'N/A'), y)
-    y = draw_content_row("Route:", f"{booking['origin']} → {booking['destination']}", y)
-    y = draw_content_row("Departure:", booking['departure_time'], y)
-    y = draw_content_row("Arrival:", booking['arrival_time'], y)
-    y = draw_content_row("Duration:", booking['duration'], y)
-    y = draw_content_row("Class:", booking['tier'].upper(), y, True)
-    
-    y = y - 20
-    y = draw_section_header("Payment Information", y)
-    c.setFillColor(colors.navy)
-    c.rect(60, y - 40, 200, 30, fill=True)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(70, y - 20, f"Total Amount: ${booking['total_amount']:.2f}")
-    y = y - 60
-    y = draw_content_row("Payment Status:", "Confirmed", y, True)
-    
-    c.setFillColor(colors.navy)
-    c.rect(0, 50, width, 2, fill=True)
-    c.setFont("Helvetica", 10)
-    c.drawString(50, 30, "Thank you for choosing SkyBook Airlines!")
-    c.drawString(50, 15, f"Booking Reference: {booking['confirmation_code']}")
-    
-    c.save()
-    return pdf_path
+def group_confirmation_email_body(bookings: List[dict]) -> str:
+    """Plain-text body of the consolidated group confirmation email"""
+    lead = bookings[0]
+    passengers = "\n".join(
+        f"• {b['passenger']['first_name']} {b['passenger']['last_name']} - "
+        f"Confirmation Code: {b['confirmation_code']} (Booking ID: {b['booking_id']})"
+        for b in bookings
+    )
+    total = sum(b["total_amount"] for b in bookings)
+    return f"""
+Dear {lead['passenger']['first_name']} {lead['passenger']['last_name']},
 
-def send_cancellation_email(email: str, booking: dict) -> bool:
-    """Send booking cancellation email"""
-    try:
-        smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.getenv("SMTP_PORT", 587))
-        sender_email = os.getenv("SMTP_EMAIL")
-        sender_password = os.getenv("SMTP_PASSWORD")
+Thank you for booking with SkyBook Airlines!
+
+GROUP BOOKING CONFIRMATION
+==========================
+Group ID: {lead['group_id']}
+Flight: {lead['flight_id']}
+Passengers: {len(bookings)}
+
+{passengers}
+
+FLIGHT DETAILS
+==============
+Airline: {lead.get('airline', 'N/A')}
+Route: {lead['origin']} ({lead.get('origin_city', '')}) → {lead['destination']} ({lead.get('destination_city', '')})
+Departure: {lead['departure_time']}
+Arrival: {lead['arrival_time']}
+Duration: {lead['duration']}
+Class: {lead['tier'].upper()}
 
-        body = f"""
+PAYMENT INFORMATION
+===================
+Total Amount: ${total:.2f}
+Payment Status: Confirmed
+
+Each passenger's ticket is attached.
+
+Have a great flight!
+
+Best regards,
+SkyBook Airlines Customer Service
+    """
+
+def build_group_confirmation_email(email: str, bookings: List[dict], pdfs: List[bytes]) -> MIMEMultipart:
+    """Build one confirmation message carrying every ticket in a group"""
+    msg = MIMEMultipart()
+    msg['From'] = smtp_pool.username
+    msg['To'] = email
+    msg['Subject'] = f"Group Booking Confirmation - {len(bookings)} passengers - {bookings[0]['flight_id']}"
+    msg.attach(MIMEText(group_confirmation_email_body(bookings), 'plain'))
+    for booking, pdf in zip(bookings, pdfs):
+        pdf_attachment = MIMEApplication(pdf, _subtype='pdf')
+        pdf_attachment.add_header('Content-Disposition', 'attachment', 
+                                filename=f'booking_{booking["confirmation_code"]}.pdf')
+        msg.attach(pdf_attachment)
+    return msg
+
+def cancellation_email_body(booking: dict) -> str:
+    """Plain-text body of the cancellation email"""
+    return f"""
 Dear {booking['passenger']['first_name']} {booking['passenger']['last_name']},
 
 Your flight booking has been successfully cancelled.
@@ -873,26 +848,29 @@ Expected Processing Time: 5-7 business days
 
 Best regards,
 SkyBook Airlines Customer Service
-        """
+    """
+
+def build_cancellation_email(email: str, booking: dict) -> MIMEMultipart:
+    """Build the booking cancellation message"""
+    msg = MIMEMultipart()
+    msg['From'] = smtp_pool.username
+    msg['To'] = email
+    msg['Subject'] = f"Flight Booking Cancellation - {booking['booking_id']}"
+    msg.attach(MIMEText(cancellation_email_body(booking), 'plain'))
+    return msg
+
+def send_cancellation_email(email: str, booking: dict) -> bool:
+    """Send booking cancellation email over a pooled SMTP session"""
+    try:
+        sender_email = os.getenv("SMTP_EMAIL")
+        sender_password = os.getenv("SMTP_PASSWORD")
 
         if not sender_email or not sender_password:
             print("\n⚠️ SMTP credentials not configured")
             return False
 
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = email
-        msg['Subject'] = f"Flight Booking Cancellation - {booking['booking_id']}"
-        msg.attach(MIMEText(body, 'plain'))
-
         try:
-            server = smtplib.SMTP(smtp_server, smtp_port, timeout=15)
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, email, msg.as_string())
-            server.quit()
+            smtp_pool.send(build_cancellation_email(email, booking))
             print(f"✅ Cancellation email sent to: {email}")
             return True
         except Exception as e:
@@ -902,6 +880,74 @@ SkyBook Airlines Customer Service
         print(f"❌ Email configuration error: {e}")
         return False
 
+def smtp_configured() -> bool:
+    """Check whether SMTP credentials are available"""
+    return bool(os.getenv("SMTP_EMAIL") and os.getenv("SMTP_PASSWORD"))
+
+def deliver_confirmation_emails(jobs: List[dict]) -> List[Optional[Exception]]:
+    """Notification queue handler sending a batch of confirmations over one SMTP session"""
+    if not smtp_configured():
+        for job in jobs:
+            send_confirmation_email(job["email"], job["booking"])
+        return [PermanentNotificationError("SMTP credentials not configured")] * len(jobs)
+    try:
+        pdfs = ticket_cache.get_many([job["booking"] for job in jobs])
+    except Exception as pdf_err:
+        print(f"⚠️ Error rendering ticket PDFs: {pdf_err}")
+        pdfs = [None] * len(jobs)
+    return smtp_pool.send_batch([
+        build_confirmation_email(job["email"], job["booking"], pdf) for job, pdf in zip(jobs, pdfs)
+    ])
+
+def deliver_cancellation_emails(jobs: List[dict]) -> List[Optional[Exception]]:
+    """Notification queue handler sending a batch of cancellations over one SMTP session"""
+    if not smtp_configured():
+        return [PermanentNotificationError("SMTP credentials not configured")] * len(jobs)
+    return smtp_pool.send_batch([build_cancellation_email(job["email"], job["booking"]) for job in jobs])
+
+def deliver_group_confirmation_emails(jobs: List[dict]) -> List[Optional[Exception]]:
+    """Notification queue handler sending consolidated group confirmations"""
+    if not smtp_configured():
+        return [PermanentNotificationError("SMTP credentials not configured")] * len(jobs)
+    messages = [
+        build_group_confirmation_email(job["email"], job["bookings"], ticket_cache.get_many(job["bookings"]))
+        for job in jobs
+    ]
+    return smtp_pool.send_batch(messages)
+
+notification_queue.register_batch("booking_confirmation", deliver_confirmation_emails)
+notification_queue.register_batch("group_booking_confirmation", deliver_group_confirmation_emails, max_batch=10)
+notification_queue.register_batch("booking_cancellation", deliver_cancellation_emails)
+
+def enqueue_booking_email(kind: str, booking: dict) -> None:
+    """Queue a booking email without persisting card details"""
+    notification_queue.enqueue(kind, {
+        "email": booking["passenger"]["email"],
+        "booking": {k: v for k, v in booking.items() if k != "payment"}
+    })
+
+def enqueue_booking_emails(kind: str, bookings: List[dict]) -> None:
+    """Queue one email per booking in a single queue transaction"""
+    notification_queue.enqueue_many(kind, [
+        {"email": booking["passenger"]["email"], "booking": {k: v for k, v in booking.items() if k != "payment"}}
+        for booking in bookings
+    ])
+
+def enqueue_group_email(bookings: List[dict]) -> None:
+    """Queue one confirmation for a whole group, addressed to the first passenger"""
+    notification_queue.enqueue("group_booking_confirmation", {
+        "email": bookings[0]["passenger"]["email"],
+        "bookings": [{k: v for k, v in booking.items() if k != "payment"} for booking in bookings]
+    })
+
+def journal_mutation(op: str, **data) -> None:
+    """Append a booking change to the write-ahead journal, without card details"""
+    if not booking_journal:
+        return
+    if "bookings" in data:
+        data["bookings"] = [{k: v for k, v in b.items() if k != "payment"} for b in data["bookings"]]
+    booking_journal.append(op, **data)
+
 # API ENDPOINTS
 
 @app.post("/auth/login")
@@ -1045,27 +1091,40 @@ from app.user_database import get_db
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @app.delete("/bookings/{booking_id}")
-def cancel_booking(booking_id: str):
+def cancel_booking(booking_id: str, idempotency_key: Optional[str] = Header(None)):
     """Cancel a booking and process refund"""
+    if idempotency_key:
+        return idempotency_store.execute(
+            "cancel", idempotency_key, fingerprint(booking_id),
+            lambda: process_cancellation(booking_id)
+        )
+    return process_cancellation(booking_id)
+
+def process_cancellation(booking_id: str) -> dict:
+    """Release the seat, mark the booking cancelled and queue the email"""
     try:
-        booking = next((b for b in bookings_data if b["booking_id"] == booking_id), None)
-        if not booking:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Booking with ID {booking_id} not found"
-            )
-        if booking["booking_status"] != "confirmed":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot cancel booking with status: {booking['booking_status']}"
-            )
+        # Claim the booking atomically: a concurrent cancel of the same
+        # booking then finds it gone instead of releasing its seat again
+        with bookings_data.lock:
+            booking = bookings_data.get(booking_id)
+            if not booking:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Booking with ID {booking_id} not found"
+                )
+            if booking["booking_status"] != "confirmed":
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cannot cancel booking with status: {booking['booking_status']}"
+                )
+            booking["booking_status"] = "cancelled"
+            booking["cancellation_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            bookings_data.remove(booking)
         flight = next((f for f in flights_data if f["flight_id"] == booking["flight_id"]), None)
         if flight:
-            flight["available_seats"] += 1
-        booking["booking_status"] = "cancelled"
-        booking["cancellation_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        send_cancellation_email(booking["passenger"]["email"], booking)
-        bookings_data.remove(booking)
+            inventory.release(flight, seat_numbers=[booking["seat_no"]] if booking.get("seat_no") else ())
+        enqueue_booking_email("booking_cancellation", booking)
+        journal_mutation("cancel", booking_id=booking_id)
         return {
             "status": "success",
             "message": "Booking cancelled successfully",
@@ -1082,6 +1141,63 @@ def cancel_booking(booking_id: str):
             detail=f"Internal server error while cancelling booking: {str(e)}"
         )
 
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin key"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_API_KEY is not set)")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+@app.post("/admin/flights/{flight_id}/cancel", dependencies=[Depends(require_admin)])
+def cancel_flight_bookings(flight_id: str):
+    """
+    Cancel every confirmed booking on a disrupted flight
+
+    Seats are released in one inventory change, refunds are totalled in one
+    pass and all cancellation emails are queued in one transaction for the
+    batch sender.
+    """
+    flight = next((f for f in flights_data if f["flight_id"] == flight_id), None)
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+
+    # Claimed under the store lock, like single cancellations, so a booking
+    # cancelled concurrently by its passenger is not released twice
+    cancellation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with bookings_data.lock:
+        cancelled = [b for b in bookings_data.for_flight(flight_id) if b["booking_status"] == "confirmed"]
+        for booking in cancelled:
+            booking["booking_status"] = "cancelled"
+            booking["cancellation_date"] = cancellation_date
+        booking_ids = [b["booking_id"] for b in cancelled]
+        bookings_data.remove_many(booking_ids)
+    if not cancelled:
+        return {
+            "status": "success", "flight_id": flight_id, "cancelled_bookings": 0,
+            "total_refund": 0.0, "refunds": []
+        }
+
+    inventory.release(
+        flight, seats=len(cancelled),
+        seat_numbers=[b["seat_no"] for b in cancelled if b.get("seat_no")]
+    )
+    refunds = [{"booking_id": b["booking_id"], "refund_amount": b["total_amount"]} for b in cancelled]
+
+    enqueue_booking_emails("booking_cancellation", cancelled)
+    journal_mutation("cancel", booking_ids=booking_ids)
+    print(f"🛑 Cancelled {len(cancelled)} bookings on disrupted flight {flight_id}")
+
+    return {
+        "status": "success",
+        "flight_id": flight_id,
+        "cancelled_bookings": len(cancelled),
+        "total_refund": round(sum(r["refund_amount"] for r in refunds), 2),
+        "cancellation_date": cancellation_date,
+        "refunds": refunds
+    }
+
 @app.get("/auth/user")
 async def get_user_details(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get authenticated user details for autofill"""
@@ -1094,28 +1210,25 @@ async def get_user_details(token: str = Depends(oauth2_scheme), db: Session = De
         )
     return user
 
-@app.post("/flights/book", response_model=BookingResponse)
-def book_flight(booking_request: BookingRequest):
-    """Book a flight"""
-    flight = next((f for f in flights_data if f["flight_id"] == booking_request.flight_id), None)
-    if not flight:
-        raise HTTPException(status_code=404, detail="Flight not found")
-    if flight["available_seats"] <= 0:
-        raise HTTPException(status_code=400, detail="No seats available")
-    if not validate_payment(booking_request.payment):
-        raise HTTPException(status_code=400, detail="Invalid payment details")
-    
-    booking_id = str(uuid.uuid4())
-    confirmation_code = generate_confirmation_code()
-    booking_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    booking_record = {
-        "booking_id": booking_id,
-        "flight_id": booking_request.flight_id,
-        "passenger": booking_request.passenger.dict(),
-        "payment": booking_request.payment.dict(),
-        "seat_preference": booking_request.seat_preference,
-        "total_amount": flight["current_price"],
+def create_booking_record(
+    flight: dict,
+    passenger: PassengerDetails,
+    payment: PaymentDetails,
+    seat_preference: Optional[str],
+    total_amount: float,
+    seat_no: Optional[str] = None,
+    booking_date: Optional[str] = None,
+    group_id: Optional[str] = None
+) -> dict:
+    """Build the stored booking record for one passenger"""
+    return {
+        "booking_id": str(uuid.uuid4()),
+        "flight_id": flight["flight_id"],
+        "passenger": passenger.dict(),
+        "payment": payment.dict(),
+        "seat_preference": seat_preference,
+        "seat_no": seat_no,
+        "total_amount": total_amount,
         "airline": flight.get("airline"),
         "departure_time": flight.get("departure_time"),
         "arrival_time": flight.get("arrival_time"),
@@ -1126,40 +1239,160 @@ def book_flight(booking_request: BookingRequest):
         "duration": flight.get("duration"),
         "tier": flight.get("tier"),
         "booking_status": "confirmed",
-        "confirmation_code": confirmation_code,
-        "booking_date": booking_date
+        "confirmation_code": generate_confirmation_code(),
+        "booking_date": booking_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "group_id": group_id
     }
-    
-    flight["available_seats"] -= 1
-    bookings_data.append(booking_record)
-    send_confirmation_email(booking_request.passenger.email, booking_record)
-    
+
+def to_booking_response(booking: dict) -> BookingResponse:
+    """Build the API response for a stored booking record"""
+    passenger = booking["passenger"]
     return BookingResponse(
-        booking_id=booking_id,
-        flight_id=booking_request.flight_id,
-        passenger_name=f"{booking_request.passenger.first_name} {booking_request.passenger.last_name}",
-        email=booking_request.passenger.email,
-        total_amount=flight["current_price"],
-        booking_status="confirmed",
-        confirmation_code=confirmation_code,
-        booking_date=booking_date,
+        booking_id=booking["booking_id"],
+        flight_id=booking["flight_id"],
+        passenger_name=f"{passenger['first_name']} {passenger['last_name']}",
+        email=passenger["email"],
+        total_amount=booking["total_amount"],
+        booking_status=booking["booking_status"],
+        confirmation_code=booking["confirmation_code"],
+        booking_date=booking["booking_date"],
+        seat_no=booking.get("seat_no"),
         flight_details={
-            "airline": flight.get("airline"),
-            "origin": flight.get("origin"),
-            "destination": flight.get("destination"),
-            "departure_time": flight.get("departure_time"),
-            "arrival_time": flight.get("arrival_time"),
-            "duration": flight.get("duration"),
-            "tier": flight.get("tier")
+            "airline": booking.get("airline"),
+            "origin": booking.get("origin"),
+            "destination": booking.get("destination"),
+            "departure_time": booking.get("departure_time"),
+            "arrival_time": booking.get("arrival_time"),
+            "duration": booking.get("duration"),
+            "tier": booking.get("tier")
         },
         passenger_details={
-            "first_name": booking_request.passenger.first_name,
-            "last_name": booking_request.passenger.last_name,
-            "phone": booking_request.passenger.phone,
-            "passport_number": booking_request.passenger.passport_number
+            "first_name": passenger["first_name"],
+            "last_name": passenger["last_name"],
+            "phone": passenger["phone"],
+            "passport_number": passenger.get("passport_number")
         }
     )
 
+@app.post("/flights/book", response_model=BookingResponse)
+def book_flight(booking_request: BookingRequest, idempotency_key: Optional[str] = Header(None)):
+    """Book a flight"""
+    if idempotency_key:
+        return idempotency_store.execute(
+            "book", idempotency_key, fingerprint(booking_request.model_dump_json()),
+            lambda: create_booking(booking_request)
+        )
+    return create_booking(booking_request)
+
+def create_booking(booking_request: BookingRequest) -> BookingResponse:
+    """Reserve a seat, store the booking and queue the confirmation"""
+    flight = next((f for f in flights_data if f["flight_id"] == booking_request.flight_id), None)
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+    if flight["available_seats"] <= 0:
+        raise HTTPException(status_code=400, detail="No seats available")
+    if not validate_payment(booking_request.payment):
+        raise HTTPException(status_code=400, detail="Invalid payment details")
+    
+    # Honor the quoted price when one is supplied, otherwise charge the current price
+    total_amount = flight["current_price"]
+    quote = expected_version = None
+    if booking_request.quote_id:
+        try:
+            quote = quote_cache.redeem(booking_request.quote_id, flight["flight_id"])
+        except QuoteError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        total_amount = quote.price
+        expected_version = quote.inventory_version
+    
+    try:
+        seat_no, = inventory.reserve_seats(
+            flight, preference=booking_request.seat_preference, expected_version=expected_version
+        )
+    except InventoryError as e:
+        # Nothing was booked, so the quote can be used again
+        if quote is not None:
+            quote_cache.restore(booking_request.quote_id, quote)
+        status_code = 409 if isinstance(e, StaleInventoryError) else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+    
+    booking_record = create_booking_record(
+        flight, booking_request.passenger, booking_request.payment,
+        booking_request.seat_preference, total_amount, seat_no=seat_no
+    )
+    bookings_data.append(booking_record)
+    journal_mutation("book", bookings=[booking_record])
+    enqueue_booking_email("booking_confirmation", booking_record)
+    
+    return to_booking_response(booking_record)
+
+@app.post("/flights/book/group", response_model=GroupBookingResponse)
+def book_group(booking_request: GroupBookingRequest, idempotency_key: Optional[str] = Header(None)):
+    """Book seats for several passengers on one flight, all or nothing"""
+    if idempotency_key:
+        return idempotency_store.execute(
+            "book_group", idempotency_key, fingerprint(booking_request.model_dump_json()),
+            lambda: create_group_booking(booking_request)
+        )
+    return create_group_booking(booking_request)
+
+def create_group_booking(booking_request: GroupBookingRequest) -> GroupBookingResponse:
+    """Reserve every seat in one operation, store the bookings and queue one email"""
+    flight = next((f for f in flights_data if f["flight_id"] == booking_request.flight_id), None)
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+    seats = len(booking_request.passengers)
+    if flight["available_seats"] < seats:
+        raise HTTPException(status_code=400, detail=f"Only {flight['available_seats']} seats available")
+    if not validate_payment(booking_request.payment):
+        raise HTTPException(status_code=400, detail="Invalid payment details")
+    
+    # The quoted price is per seat
+    price = flight["current_price"]
+    quote = expected_version = None
+    if booking_request.quote_id:
+        try:
+            quote = quote_cache.redeem(booking_request.quote_id, flight["flight_id"])
+        except QuoteError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        price = quote.price
+        expected_version = quote.inventory_version
+    
+    # One reservation for the whole group, so it either gets every seat or none,
+    # seated side by side where the cabin allows
+    try:
+        seat_numbers = inventory.reserve_seats(
+            flight, count=seats, preference=booking_request.seat_preference,
+            expected_version=expected_version
+        )
+    except InventoryError as e:
+        # Nothing was booked, so the quote can be used again
+        if quote is not None:
+            quote_cache.restore(booking_request.quote_id, quote)
+        status_code = 409 if isinstance(e, StaleInventoryError) else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+    
+    group_id = str(uuid.uuid4())
+    booking_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    records = [
+        create_booking_record(
+            flight, passenger, booking_request.payment, booking_request.seat_preference,
+            price, seat_no=seat_no, booking_date=booking_date, group_id=group_id
+        )
+        for passenger, seat_no in zip(booking_request.passengers, seat_numbers)
+    ]
+    bookings_data.extend(records)
+    journal_mutation("book", bookings=records)
+    enqueue_group_email(records)
+    
+    return GroupBookingResponse(
+        group_id=group_id,
+        flight_id=flight["flight_id"],
+        booking_status="confirmed",
+        total_amount=round(price * seats, 2),
+        bookings=[to_booking_response(record) for record in records]
+    )
+
 @app.get("/flights/{flight_id}")
 def get_flight(flight_id: str):
     """Get flight details"""
@@ -1221,6 +1454,32 @@ def get_bookings_by_email(email: str):
             detail=f"Internal server error while retrieving bookings: {str(e)}"
         )
 
+@app.get("/bookings/{booking_id}/ticket.pdf")
+async def get_booking_ticket(
+    booking_id: str,
+    if_none_match: Optional[str] = Header(None),
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Download the ticket PDF, rendered on first request and cached by content"""
+    current_user = await get_current_user(token, db)
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    booking = bookings_data.get(booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail=f"Booking with ID {booking_id} not found")
+    if booking["passenger"]["email"] != current_user["email"]:
+        raise HTTPException(status_code=403, detail="You do not have permission to view this booking")
+
+    etag = f'"{ticket_key(booking)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'inline; filename="booking_{booking["confirmation_code"]}.pdf"'
+    content = await asyncio.to_thread(ticket_cache.get, booking)
+    return Response(content=content, media_type="application/pdf", headers=headers)
+
 @app.get("/bookings/{booking_id}")
 async def get_booking(booking_id: str, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get booking details"""
@@ -1234,7 +1493,7 @@ async def get_booking(booking_id: str, token: str = Depends(oauth2_scheme), db:
         print(f"\n🔍 Looking up booking: {booking_id}")
         if not booking_id:
             raise HTTPException(status_code=400, detail="Booking ID is required")
-        booking = next((b for b in bookings_data if b["booking_id"] == booking_id), None)
+        booking = bookings_data.get(booking_id)
         if not booking:
             print(f"❌ Booking not found: {booking_id}")
             raise HTTPException(
@@ -1296,4 +1555,9 @@ def get_statistics():
         "total_bookings": len(bookings_data),
         "confirmed_bookings": confirmed_bookings,
         "total_revenue": f"${total_revenue:.2f}"
-    }
\ No newline at end of file
+    }
+
+@app.get("/notifications/stats")
+def get_notification_statistics():
+    """Get notification queue depth, delivery counts and send latency"""
+    return notification_queue.stats()
\ No newline at end of file
@@ -0,0 +1,14 @@
+-- Route/date index for flight search and indexes on foreign keys.
+-- Without these, search_flights scans the whole flights table and
+-- bookings lookups by flight or passenger scan all bookings.
+
+CREATE INDEX IF NOT EXISTS ix_flights_route_departure
+    ON flights (source_airport, destination_airport, departure_time);
+
+CREATE INDEX IF NOT EXISTS ix_flights_airline_id ON flights (airline_id);
+
+CREATE INDEX IF NOT EXISTS ix_flights_destination_airport ON flights (destination_airport);
+
+CREATE INDEX IF NOT EXISTS ix_bookings_flight_id ON bookings (flight_id);
+
+CREATE INDEX IF NOT EXISTS ix_bookings_passenger_id ON bookings (passenger_id);
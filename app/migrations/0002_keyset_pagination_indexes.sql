@@ -0,0 +1,9 @@
+-- Indexes matching the keyset pagination orders of GET /flights and
+-- GET /bookings, so each page seeks to the previous page's last row
+-- instead of sorting the whole table.
+
+CREATE INDEX IF NOT EXISTS ix_flights_price_id ON flights (current_price, flight_id);
+
+CREATE INDEX IF NOT EXISTS ix_flights_departure_id ON flights (departure_time, flight_id);
+
+CREATE INDEX IF NOT EXISTS ix_bookings_date_id ON bookings (booking_date, booking_id);
@@ -0,0 +1,13 @@
+-- One live booking per flight seat. Concurrent bookings used to be able to
+-- get the same seat. Those duplicates keep their booking but lose the seat
+-- number (all but the earliest booking id), so the unique index can be built.
+
+UPDATE bookings SET seat_no = NULL
+WHERE status != 'Cancelled' AND seat_no IS NOT NULL AND booking_id NOT IN (
+    SELECT MIN(booking_id) FROM bookings
+    WHERE status != 'Cancelled' AND seat_no IS NOT NULL
+    GROUP BY flight_id, seat_no
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_bookings_flight_seat
+    ON bookings (flight_id, seat_no) WHERE status != 'Cancelled';
@@ -0,0 +1,285 @@
+"""
+Durable background notification queue
+
+Booking endpoints enqueue notification jobs instead of talking to SMTP on
+the request thread. Jobs are stored in a small SQLite file so they survive
+restarts, and a pool of worker threads delivers them with exponential
+backoff between attempts.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class PermanentNotificationError(Exception):
+    """Raised by handlers for failures that retrying cannot fix"""
+
+
+class NotificationQueue:
+    """
+    SQLite-backed job queue with a worker pool
+
+    Args:
+        path: SQLite file holding pending jobs
+        workers: Number of delivery threads
+        max_attempts: Attempts before a job is marked failed
+        backoff_base: Seconds before the first retry, doubled on each retry
+        max_backoff: Upper bound for the retry delay in seconds
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        max_backoff: float = 300.0
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self._handlers: Dict[str, Tuple[Callable[[List[dict]], List[Optional[Exception]]], int]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        self._in_flight = 0
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._latencies = deque(maxlen=1000)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the job store on first use (lock held)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notification_jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " run_at REAL NOT NULL,"
+                " status TEXT NOT NULL DEFAULT 'pending',"
+                " last_error TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_notification_jobs_due ON notification_jobs (status, run_at)"
+            )
+            # Jobs that were mid-delivery when the process died are retried
+            self._conn.execute("UPDATE notification_jobs SET status = 'pending' WHERE status = 'running'")
+        return self._conn
+
+    def register(self, kind: str, handler: Callable[[dict], None]) -> None:
+        """
+        Register the delivery function for a job kind
+
+        Handlers raise to signal failure; PermanentNotificationError skips
+        the remaining retries.
+        """
+        def run_one(jobs: List[dict]) -> List[Optional[Exception]]:
+            try:
+                handler(jobs[0])
+                return [None]
+            except Exception as e:
+                return [e]
+
+        self._handlers[kind] = (run_one, 1)
+
+    def register_batch(
+        self,
+        kind: str,
+        handler: Callable[[List[dict]], List[Optional[Exception]]],
+        max_batch: int = 50
+    ) -> None:
+        """
+        Register a handler that delivers up to `max_batch` due jobs per call
+
+        The handler returns one entry per job: None when delivered, otherwise
+        the exception for that job.
+        """
+        self._handlers[kind] = (handler, max_batch)
+
+    def enqueue(self, kind: str, payload: dict) -> int:
+        """Persist a job and wake a worker, returning the job id"""
+        with self._wakeup:
+            cursor = self._connection().execute(
+                "INSERT INTO notification_jobs (kind, payload, run_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(payload), time.time())
+            )
+            self._wakeup.notify()
+            return cursor.lastrowid
+
+    def enqueue_many(self, kind: str, payloads: List[dict]) -> int:
+        """Persist several jobs of one kind in a single transaction, returning the count"""
+        if not payloads:
+            return 0
+        now = time.time()
+        with self._wakeup:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO notification_jobs (kind, payload, run_at) VALUES (?, ?, ?)",
+                    [(kind, json.dumps(payload), now) for payload in payloads]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._wakeup.notify_all()
+        return len(payloads)
+
+    def start(self) -> None:
+        """Start the worker pool"""
+        with self._lock:
+            if self._running:
+                return
+            self._connection()
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._work, name=f"notification-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"📬 Notification queue started ({self.workers} workers)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the workers; undelivered jobs stay queued for the next start"""
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _claim(self) -> Optional[Tuple[str, List[tuple]]]:
+        """Wait for due jobs and mark a batch of the same kind running"""
+        with self._wakeup:
+            while self._running:
+                conn = self._connection()
+                now = time.time()
+                row = conn.execute(
+                    "SELECT kind FROM notification_jobs "
+                    "WHERE status = 'pending' AND run_at <= ? ORDER BY run_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row:
+                    kind = row[0]
+                    max_batch = self._handlers[kind][1] if kind in self._handlers else 1
+                    jobs = conn.execute(
+                        "SELECT id, payload, attempts FROM notification_jobs "
+                        "WHERE status = 'pending' AND run_at <= ? AND kind = ? ORDER BY run_at LIMIT ?",
+                        (now, kind, max_batch)
+                    ).fetchall()
+                    conn.executemany(
+                        "UPDATE notification_jobs SET status = 'running' WHERE id = ?",
+                        [(job[0],) for job in jobs]
+                    )
+                    self._in_flight += len(jobs)
+                    return kind, jobs
+
+                next_due = conn.execute(
+                    "SELECT MIN(run_at) FROM notification_jobs WHERE status = 'pending'"
+                ).fetchone()[0]
+                self._wakeup.wait(timeout=min(max(next_due - now, 0.01), 1.0) if next_due else 1.0)
+        return None
+
+    def _work(self) -> None:
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                return
+            self._deliver(*claimed)
+
+    def _deliver(self, kind: str, jobs: List[tuple]) -> None:
+        """Run a batch through its handler and record each job's outcome"""
+        start = time.perf_counter()
+        try:
+            if kind not in self._handlers:
+                raise PermanentNotificationError(f"No handler registered for {kind}")
+            errors = self._handlers[kind][0]([json.loads(payload) for _, payload, _ in jobs])
+        except Exception as e:
+            errors = [e] * len(jobs)
+        # Batched sends share one session, so latency is amortised per message
+        elapsed = (time.perf_counter() - start) / len(jobs)
+
+        with self._wakeup:
+            for (job_id, _, attempts), error in zip(jobs, errors):
+                self._record(job_id, kind, attempts + 1, error, elapsed)
+
+    def _record(self, job_id: int, kind: str, attempts: int, error: Optional[Exception], elapsed: float) -> None:
+        """Delete, reschedule or fail a finished job (lock held)"""
+        conn = self._connection()
+        self._in_flight -= 1
+        if error is None:
+            conn.execute("DELETE FROM notification_jobs WHERE id = ?", (job_id,))
+            self._sent += 1
+            self._latencies.append(elapsed)
+        elif isinstance(error, PermanentNotificationError) or attempts >= self.max_attempts:
+            conn.execute(
+                "UPDATE notification_jobs SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, str(error), job_id)
+            )
+            self._failed += 1
+            print(f"❌ Notification {job_id} ({kind}) failed after {attempts} attempt(s): {error}")
+        else:
+            delay = min(self.backoff_base * 2 ** (attempts - 1), self.max_backoff)
+            conn.execute(
+                "UPDATE notification_jobs SET status = 'pending', attempts = ?, run_at = ?, last_error = ? "
+                "WHERE id = ?",
+                (attempts, time.time() + delay, str(error), job_id)
+            )
+            self._retries += 1
+            print(f"⚠️ Notification {job_id} ({kind}) attempt {attempts} failed, retrying in {delay:.0f}s")
+
+    def stats(self) -> dict:
+        """Queue depth, delivery counters and send latency percentiles"""
+        with self._lock:
+            depth = self._connection().execute(
+                "SELECT COUNT(*) FROM notification_jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+            latencies = sorted(self._latencies)
+            stats = {
+                "queue_depth": depth,
+                "in_flight": self._in_flight,
+                "sent": self._sent,
+                "failed": self._failed,
+                "retries": self._retries,
+                "workers": len(self._threads)
+            }
+
+        for p in (50, 95, 99):
+            key = f"send_latency_p{p}_ms"
+            stats[key] = round(latencies[min(len(latencies) - 1, len(latencies) * p // 100)] * 1000, 2) \
+                if latencies else None
+        return stats
+
+    def drain(self, timeout: float = 30.0) -> bool:
+        """Block until no jobs are pending or running, returning False on timeout"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.stats()["queue_depth"] == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+
+notification_queue = NotificationQueue(
+    path=os.getenv("NOTIFICATION_QUEUE_PATH", "notifications.db"),
+    workers=int(os.getenv("NOTIFICATION_WORKERS", 2)),
+    max_attempts=int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5)),
+    backoff_base=float(os.getenv("NOTIFICATION_BACKOFF_SECONDS", 2.0))
+)
@@ -0,0 +1,69 @@
+"""
+Keyset (cursor) pagination
+
+A page is the next `limit` rows after the last row of the previous page in
+(sort key, unique id) order. The cursor is that last row's sort key and id,
+encoded as an opaque URL-safe token. The database seeks straight to it
+through an index on the same columns, so page 1000 costs the same as page 1,
+unlike OFFSET which reads and discards every earlier row.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(value: Any, row_id: str) -> str:
+    """Opaque token for the position after (value, row_id)"""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """
+    Inverse of encode_cursor
+
+    Raises:
+        ValueError: If the token is not a cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+    except (TypeError, KeyError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, str(row_id)
+
+
+def keyset_page(statement, sort_column, id_column, limit: int, cursor: Optional[str] = None):
+    """
+    Restrict a select() to one page in (sort_column, id_column) order
+
+    Fetches one extra row so the caller can tell whether a next page exists
+    (see next_cursor).
+    """
+    if cursor is not None:
+        value, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(sort_column, id_column) > (value, row_id))
+    return statement.order_by(sort_column, id_column).limit(limit + 1)
+
+
+def next_cursor(rows: list, limit: int, key) -> Optional[str]:
+    """
+    Trim the extra row fetched by keyset_page and return the next cursor
+
+    Args:
+        rows: Rows from a keyset_page statement (trimmed in place)
+        limit: Page size
+        key: Returns (sort value, id) for a row
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor(*key(rows[-1]))
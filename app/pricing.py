@@ -1,6 +1,7 @@
 from datetime import datetime
 from app.models import Flight, DemandLevel
 from app.database import db
+from app.demand import DEMAND_LEVELS, classify_flights
 
 
 class DynamicPricingEngine:
@@ -66,7 +67,8 @@ class DynamicPricingEngine:
     @staticmethod
     def get_or_calculate_demand(flight: Flight) -> DemandLevel:
         """
-        Get existing demand level or calculate new one
+        Get the demand level classified at ingest, or calculate one for
+        flights that are not stored in the database
         
         Args:
             flight: Flight object
@@ -74,33 +76,8 @@ class DynamicPricingEngine:
         Returns:
             DemandLevel enum
         """
-        
         existing_demand = db.get_demand_level(flight.flight_id)
         if existing_demand:
             return existing_demand
         
-    
-        seat_occupancy = 1 - (flight.available_seats / flight.total_seats)
-        hour = flight.departure_time.hour
-        
-        
-        is_peak = 6 <= hour <= 9 or 17 <= hour <= 20
-        
-        
-        score = seat_occupancy
-        if is_peak:
-            score += 0.3
-        
-    
-        if score < 0.4:
-            demand = DemandLevel.LOW
-        elif score < 0.6:
-            demand = DemandLevel.MEDIUM
-        elif score < 0.8:
-            demand = DemandLevel.HIGH
-        else:
-            demand = DemandLevel.VERY_HIGH
-        
-        db.set_demand_level(flight.flight_id, demand)
-        
-        return demand
\ No newline at end of file
+        return DEMAND_LEVELS[classify_flights([flight])[0]]
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+Read-through cache for the SQL flight endpoints
+
+GET /flights/{id} and POST /flights/search keep their ready-to-serialize
+response dicts here, keyed by flight id and by (origin, destination, date).
+Entries are never deleted on writes. Every key embeds version counters: one
+per flight, one per route and day, and a global generation. A write bumps
+the counters it affects, and readers then look under the new key. Versions
+are read before the database is queried, so a result computed from data
+older than a bump is stored under the old key and never served.
+
+Backends are pluggable. MemoryCacheBackend is a per-process LRU.
+SQLiteCacheBackend is a file shared by every worker on the host, so a
+booking made in one worker invalidates the others. Any object with
+get/set/version/bump/clear can be passed in (e.g. a Redis client wrapper).
+Entries also expire after a TTL, which bounds staleness from writers that
+do not bump versions.
+
+Async endpoints use the *_async methods, which await their loader and, for
+backends doing blocking I/O (`blocking = True`, the default for custom
+backends), run the backend calls in a worker thread so the event loop never
+waits on them.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+GENERATION = "generation"
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU with per-entry expiry
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def bump(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class SQLiteCacheBackend:
+    """
+    Cache shared by all worker processes through one SQLite file
+
+    Values are stored as JSON. Expired entries are purged every
+    `purge_every` writes.
+
+    Args:
+        path: SQLite file, created on first use
+        purge_every: Writes between purges of expired entries
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, purge_every: int = 1_000):
+        self.path = path
+        self.purge_every = purge_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the cache file on first use (lock held)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            row = self._connection().execute("SELECT version FROM cache_versions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name: str) -> int:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO cache_versions (name, version) VALUES (?, 1)"
+                " ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                (name,)
+            )
+            return conn.execute("SELECT version FROM cache_versions WHERE name = ?", (name,)).fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_versions")
+
+
+class QueryCache:
+    """
+    Versioned read-through cache with per-namespace hit rates
+
+    Args:
+        backend: Storage backend (see module docstring)
+        ttl_seconds: Upper bound on how long an entry is served
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _route(origin: str, destination: str, day: date) -> str:
+        return f"route:{origin}:{destination}:{day.isoformat()}"
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(namespace, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def get_or_load(self, namespace: str, key: str, versions: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value, or load, store and return it
+
+        Args:
+            namespace: Hit rate bucket and key prefix
+            key: Entry key within the namespace
+            versions: Version counters the entry depends on
+            loader: Builds the value on a miss; None results are not cached
+        """
+        full_key = self._versioned_key(namespace, key, versions)
+        value = self.backend.get(full_key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+        value = loader()
+        if value is not None:
+            self.backend.set(full_key, value, self.ttl_seconds)
+        return value
+
+    def _versioned_key(self, namespace: str, key: str, versions: Tuple[str, ...]) -> str:
+        stamp = ".".join(str(self.backend.version(name)) for name in (GENERATION,) + versions)
+        return f"{namespace}:{key}@{stamp}"
+
+    async def _backend_call(self, fn: Callable, *args) -> Any:
+        """Call the backend, in a worker thread if it blocks"""
+        if getattr(self.backend, "blocking", True):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get_or_load_async(
+        self, namespace: str, key: str, versions: Tuple[str, ...], loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """get_or_load for async callers: `loader` is awaited, backend calls never block the loop"""
+        full_key = await self._backend_call(self._versioned_key, namespace, key, versions)
+        value = await self._backend_call(self.backend.get, full_key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+        value = await loader()
+        if value is not None:
+            await self._backend_call(self.backend.set, full_key, value, self.ttl_seconds)
+        return value
+
+    def flight(self, flight_id: str, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """Response dict for one flight"""
+        return self.get_or_load("flight", flight_id, (f"flight:{flight_id}",), loader)
+
+    def search(self, origin: str, destination: str, day: date, loader: Callable[[], list]) -> list:
+        """Unsorted response dicts for a route and departure day"""
+        route = self._route(origin, destination, day)
+        return self.get_or_load("search", route, (route,), loader)
+
+    async def search_async(self, origin: str, destination: str, day: date, loader: Callable[[], Awaitable[list]]) -> list:
+        """search() for async callers"""
+        route = self._route(origin, destination, day)
+        return await self.get_or_load_async("search", route, (route,), loader)
+
+    def invalidate_flight(self, flight_id: str, origin: str, destination: str, day: date) -> None:
+        """A flight's seats or price changed: drop it and its route's searches"""
+        self.backend.bump(f"flight:{flight_id}")
+        self.backend.bump(self._route(origin, destination, day))
+
+    async def invalidate_flight_async(self, flight_id: str, origin: str, destination: str, day: date) -> None:
+        """invalidate_flight() for async callers"""
+        await self._backend_call(self.invalidate_flight, flight_id, origin, destination, day)
+
+    def invalidate_all(self) -> None:
+        """Bulk writes (seeding, repricing runs): drop every entry"""
+        self.backend.bump(GENERATION)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {namespace: dict(c) for namespace, c in self._counts.items()}
+        for c in counts.values():
+            total = c["hits"] + c["misses"]
+            c["hit_rate"] = round(c["hits"] / total, 4) if total else 0.0
+        return {"backend": type(self.backend).__name__, "ttl_seconds": self.ttl_seconds, **counts}
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self._counts.clear()
+
+
+def make_backend(kind: str):
+    """Backend for QUERY_CACHE_BACKEND (memory or sqlite)"""
+    if kind == "memory":
+        return MemoryCacheBackend(max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 10_000)))
+    if kind == "sqlite":
+        return SQLiteCacheBackend(os.getenv("QUERY_CACHE_PATH", os.path.join("data", "query_cache.db")))
+    raise ValueError(f"Unknown query cache backend: {kind}")
+
+
+query_cache = QueryCache(
+    make_backend(os.getenv("QUERY_CACHE_BACKEND", "memory")),
+    ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", 300))
+)
@@ -0,0 +1,137 @@
+"""
+Price quote tokens
+
+Search and flight-detail responses carry a signed quote id. Booking with that
+id charges the quoted price after an O(1) cache lookup, as long as the quote
+has not expired and the flight's inventory has not changed since it was issued.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.inventory import inventory
+
+
+class QuoteError(ValueError):
+    """Raised when a quote cannot be honored"""
+
+
+@dataclass
+class Quote:
+    """A price promised to the user for one flight"""
+    flight_id: str
+    price: float
+    inventory_version: int
+    expires_at: float
+
+
+class QuoteCache:
+    """
+    Bounded TTL cache of issued quotes
+
+    Every quote shares the same TTL, so insertion order is also expiry order
+    and expired entries can be trimmed from the front in O(1) each.
+
+    Args:
+        secret: HMAC key used to sign quote ids
+        ttl_seconds: How long a quote stays valid
+        max_size: Maximum number of live quotes kept
+    """
+
+    def __init__(self, secret: bytes, ttl_seconds: float = 900, max_size: int = 100_000):
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._quotes: "OrderedDict[str, Quote]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sign(self, nonce: str) -> str:
+        return hmac.new(self.secret, nonce.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def issue(self, flight: dict) -> dict:
+        """
+        Quote the current price of a flight
+
+        Returns:
+            Dict with `quote_id` and `quote_expires_at` to merge into a response
+        """
+        nonce = secrets.token_urlsafe(12)
+        now = time.time()
+        quote = Quote(
+            flight_id=flight["flight_id"],
+            price=flight["current_price"],
+            inventory_version=inventory.version(flight["flight_id"]),
+            expires_at=now + self.ttl_seconds
+        )
+
+        with self._lock:
+            self._evict(now)
+            self._quotes[nonce] = quote
+
+        return {
+            "quote_id": f"{nonce}.{self._sign(nonce)}",
+            "quote_expires_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(quote.expires_at))
+        }
+
+    def redeem(self, quote_id: str, flight_id: str) -> Quote:
+        """
+        Validate and consume a quote for booking
+
+        Raises:
+            QuoteError: If the quote is forged, unknown, expired, for another
+                flight, or the flight's inventory changed since it was issued
+        """
+        nonce, _, signature = quote_id.partition(".")
+        if not hmac.compare_digest(signature.encode("utf-8"), self._sign(nonce).encode("ascii")):
+            raise QuoteError("Invalid price quote")
+
+        with self._lock:
+            quote = self._quotes.get(nonce)
+            if quote is None or quote.expires_at < time.time():
+                raise QuoteError("Price quote has expired, please search again")
+            if quote.flight_id != flight_id:
+                raise QuoteError("Price quote does not match this flight")
+            if quote.inventory_version != inventory.version(flight_id):
+                del self._quotes[nonce]
+                raise QuoteError("Seat availability changed since this price was quoted, please search again")
+            del self._quotes[nonce]
+
+        return quote
+
+    def restore(self, quote_id: str, quote: Quote) -> None:
+        """
+        Put back a redeemed quote whose booking failed, so it can be retried
+
+        It goes to the back of the expiry order; redeem still checks its
+        expiry and inventory version as usual.
+        """
+        nonce = quote_id.partition(".")[0]
+        now = time.time()
+        with self._lock:
+            if quote.expires_at >= now:
+                self._evict(now)
+                self._quotes[nonce] = quote
+
+    def _evict(self, now: float) -> None:
+        """Drop expired quotes and enforce the size bound (lock held)"""
+        while self._quotes:
+            nonce, oldest = next(iter(self._quotes.items()))
+            if oldest.expires_at >= now and len(self._quotes) < self.max_size:
+                break
+            del self._quotes[nonce]
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
+quote_cache = QuoteCache(
+    secret=(os.getenv("QUOTE_SECRET") or secrets.token_hex(32)).encode("utf-8"),
+    ttl_seconds=float(os.getenv("QUOTE_TTL_SECONDS", 900))
+)
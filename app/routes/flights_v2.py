@@ -7,6 +7,7 @@ from app.models import FlightResponse, SearchParams, SortBy
 from app.data.airports import get_airport_info, AIRPORTS, AIRLINE_NAMES
 from app.state import flights_data
 from app.amadeus_client import amadeus_client
+from app.quotes import quote_cache
 
 router = APIRouter(prefix="/flights", tags=["Flights"])
 
@@ -182,7 +183,7 @@ async def search_flights(search_request: SearchParams):
                 return 0
         matching.sort(key=get_duration_minutes)
     
-    return matching
+    return [{**flight, **quote_cache.issue(flight)} for flight in matching]
 
 @router.get("/{flight_id}")
 def get_flight(flight_id: str):
@@ -190,7 +191,7 @@ def get_flight(flight_id: str):
     flight = next((f for f in flights_data if f["flight_id"] == flight_id), None)
     if not flight:
         raise HTTPException(status_code=404, detail="Flight not found")
-    return flight
+    return {**flight, **quote_cache.issue(flight)}
 
 @router.get("")
 def get_all_flights(
@@ -0,0 +1,209 @@
+"""
+Bitmap seat maps
+
+A flight's free seats are a single integer bitmap, one bit per seat in row
+order. Cabin layouts are shared by every flight with the same tier and size,
+and carry precomputed masks for window, aisle and middle seats and for the
+positions where a group of N fits side by side. Allocation is then a couple
+of bitwise ANDs plus a lowest-set-bit lookup, independent of how many seats
+are already taken.
+"""
+
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seat letters per block, left to right; aisles sit between blocks
+CABIN_BLOCKS = {
+    "economy": ("ABC", "DEF"),
+    "premium": ("AC", "DF"),
+    "business": ("A", "DG", "K"),
+}
+
+SEAT_PREFERENCES = ("window", "aisle", "middle", "together")
+
+
+@dataclass
+class CabinLayout:
+    """Seat arrangement and preference masks for one tier and cabin size"""
+    tier: str
+    total_seats: int
+    blocks: Tuple[str, ...]
+    letters: str
+    rows: int
+    masks: Dict[str, int]
+    all_seats: int
+    _group_starts: Dict[int, int] = field(default_factory=dict, repr=False)
+
+    @property
+    def seats_per_row(self) -> int:
+        return len(self.letters)
+
+    def label(self, index: int) -> str:
+        row, col = divmod(index, self.seats_per_row)
+        return f"{row + 1}{self.letters[col]}"
+
+    def find(self, label: str) -> Optional[int]:
+        """Index of a seat label, or None if the label is not on this layout"""
+        row, letter = label[:-1], label[-1:].upper()
+        if not row.isdigit() or not letter or letter not in self.letters:
+            return None
+        index = (int(row) - 1) * self.seats_per_row + self.letters.index(letter)
+        return index if 0 <= index < self.total_seats else None
+
+    def index(self, label: str) -> int:
+        index = self.find(label)
+        if index is None:
+            raise ValueError(f"Seat {label} is not on this aircraft")
+        return index
+
+    def group_starts(self, size: int) -> int:
+        """Mask of seats that start `size` adjacent seats within one block"""
+        if size not in self._group_starts:
+            mask = 0
+            col = 0
+            for block in self.blocks:
+                for start in range(col, col + len(block) - size + 1):
+                    for row in range(self.rows):
+                        index = row * self.seats_per_row + start
+                        if index + size <= self.total_seats:
+                            mask |= 1 << index
+                col += len(block)
+            self._group_starts[size] = mask
+        return self._group_starts[size]
+
+
+@lru_cache(maxsize=None)
+def cabin_layout(tier: str, total_seats: int) -> CabinLayout:
+    """Build (once) the layout shared by all flights of this tier and size"""
+    blocks = CABIN_BLOCKS.get(tier, CABIN_BLOCKS["economy"])
+    letters = "".join(blocks)
+    rows = -(-total_seats // len(letters))
+
+    kinds = []
+    for b, block in enumerate(blocks):
+        for i in range(len(block)):
+            edge_left, edge_right = i == 0, i == len(block) - 1
+            if (b == 0 and edge_left) or (b == len(blocks) - 1 and edge_right):
+                kinds.append("window")
+            elif edge_left or edge_right:
+                kinds.append("aisle")
+            else:
+                kinds.append("middle")
+
+    masks = {"window": 0, "aisle": 0, "middle": 0}
+    for index in range(total_seats):
+        masks[kinds[index % len(letters)]] |= 1 << index
+
+    return CabinLayout(
+        tier=tier,
+        total_seats=total_seats,
+        blocks=blocks,
+        letters=letters,
+        rows=rows,
+        masks=masks,
+        all_seats=(1 << total_seats) - 1
+    )
+
+
+def _lowest(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+class SeatMap:
+    """
+    Free/taken state of every seat on one flight
+
+    Args:
+        layout: Shared cabin layout
+        free: Bitmap of free seats (defaults to all free)
+    """
+
+    __slots__ = ("layout", "free")
+
+    def __init__(self, layout: CabinLayout, free: Optional[int] = None):
+        self.layout = layout
+        self.free = layout.all_seats if free is None else free
+
+    @classmethod
+    def for_flight(
+        cls,
+        flight_id: str,
+        tier: str,
+        total_seats: int,
+        available_seats: int,
+        taken: Iterable[str] = ()
+    ) -> "SeatMap":
+        """
+        Build a seat map matching a flight's current availability
+
+        Seats in `taken` are marked first; if the flight reports fewer free
+        seats than that leaves, the difference is filled with seats chosen
+        deterministically from the flight id. Labels not on this layout
+        (random seat numbers from before seat maps) are skipped, and are
+        covered by that fill instead.
+        """
+        seat_map = cls(cabin_layout(tier, total_seats))
+        for label in taken:
+            index = seat_map.layout.find(label)
+            if index is not None:
+                seat_map.free &= ~(1 << index)
+
+        extra = seat_map.available - max(0, available_seats)
+        if extra > 0:
+            free_indexes = [i for i in range(total_seats) if seat_map.free >> i & 1]
+            for index in random.Random(flight_id).sample(free_indexes, extra):
+                seat_map.free &= ~(1 << index)
+        return seat_map
+
+    @property
+    def available(self) -> int:
+        return bin(self.free).count("1")
+
+    def allocate(self, preference: Optional[str] = None) -> Optional[str]:
+        """Take the first free seat matching the preference, else any free seat"""
+        preferred = self.free & self.layout.masks.get((preference or "").lower(), 0)
+        candidates = preferred or self.free
+        if not candidates:
+            return None
+        index = _lowest(candidates)
+        self.free &= ~(1 << index)
+        return self.layout.label(index)
+
+    def allocate_group(self, size: int, preference: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Take `size` seats, side by side when possible
+
+        Groups too large for one block, or with no adjacent run left, are
+        seated in the first free seats. Returns None if not enough seats are
+        free, leaving the map unchanged.
+        """
+        if self.available < size:
+            return None
+        if size == 1:
+            return [self.allocate(preference)]
+
+        run = self.free
+        for offset in range(1, size):
+            run &= self.free >> offset
+        starts = run & self.layout.group_starts(size)
+        if starts:
+            first = _lowest(starts)
+            indexes = range(first, first + size)
+        else:
+            indexes, free = [], self.free
+            for _ in range(size):
+                index = _lowest(free)
+                indexes.append(index)
+                free &= ~(1 << index)
+
+        for index in indexes:
+            self.free &= ~(1 << index)
+        return [self.layout.label(index) for index in indexes]
+
+    def release(self, label: str) -> None:
+        """Return a seat to the pool (labels not on this layout are ignored)"""
+        index = self.layout.find(label)
+        if index is not None:
+            self.free |= 1 << index
@@ -1,10 +1,12 @@
 import random
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
-from app.models import Flight, PricingTier, DemandLevel
+from app.models import Flight, DemandLevel
 from app.database import db
 from app.pricing import DynamicPricingEngine
+from app.inventory_generator import SyntheticInventoryGenerator
+from app.inventory import inventory, SoldOutError
 
 
 class AirlineAPISimulator:
@@ -31,98 +33,28 @@ class AirlineAPISimulator:
     ]
     
     @staticmethod
-    def generate_flights(days_ahead: int = 30) -> List[Flight]:
+    def generate_flights(days_ahead: int = 30, seed: int | None = None) -> List[Flight]:
         """
         Generate flights for the next N days
         
         Args:
             days_ahead: Number of days to generate flights for
+            seed: Optional seed for a reproducible schedule
             
         Returns:
             List of Flight objects
         """
-        flights = []
-        flight_count = 0
+        generator = SyntheticInventoryGenerator(
+            seed=seed,
+            airports=AirlineAPISimulator.airports,
+            airlines=AirlineAPISimulator.airlines
+        )
         
-        for day in range(days_ahead):
-            date = datetime.now() + timedelta(days=day)
-            
-
-            daily_flights = random.randint(15, 25)
-            
-            for _ in range(daily_flights):
-                origin = random.choice(AirlineAPISimulator.airports)
-                destination = random.choice(
-                    [a for a in AirlineAPISimulator.airports if a != origin]
-                )
-                
-            
-                departure_hour = random.randint(6, 22)
-                departure_minute = random.choice([0, 15, 30, 45])
-                departure_time = date.replace(
-                    hour=departure_hour,
-                    minute=departure_minute,
-                    second=0,
-                    microsecond=0
-                )
-                
-            
-                duration = random.randint(90, 420)
-                arrival_time = departure_time + timedelta(minutes=duration)
-                
-            
-                tier = random.choice(list(PricingTier))
-                
-            
-                base_fare = AirlineAPISimulator._calculate_base_fare(duration, tier)
-                
-                
-                total_seats = AirlineAPISimulator._get_seats_for_tier(tier)
-                available_seats = random.randint(
-                    int(total_seats * 0.3),
-                    total_seats
-                )
-                
-                flight_count += 1
-                flights.append(Flight(
-                    flight_id=f"FL{flight_count:04d}",
-                    airline=random.choice(AirlineAPISimulator.airlines),
-                    origin=origin,
-                    destination=destination,
-                    departure_time=departure_time,
-                    arrival_time=arrival_time,
-                    base_fare=base_fare,
-                    total_seats=total_seats,
-                    available_seats=available_seats,
-                    tier=tier
-                ))
+        flights = []
+        for batch in generator.iter_batches(days=days_ahead, routes=20):
+            flights.extend(batch.to_flights())
         
         return flights
-    
-    @staticmethod
-    def _calculate_base_fare(duration: int, tier: PricingTier) -> float:
-        """Calculate base fare based on duration and tier"""
-        base = duration * 0.5  
-        
-        multipliers = {
-            PricingTier.ECONOMY: 1.0,
-            PricingTier.PREMIUM: 1.5,
-            PricingTier.BUSINESS: 2.5,
-            PricingTier.FIRST: 4.0
-        }
-        
-        return round(base * multipliers[tier], 2)
-    
-    @staticmethod
-    def _get_seats_for_tier(tier: PricingTier) -> int:
-        """Get number of seats for tier"""
-        seats = {
-            PricingTier.ECONOMY: random.randint(150, 200),
-            PricingTier.PREMIUM: random.randint(40, 60),
-            PricingTier.BUSINESS: random.randint(20, 30),
-            PricingTier.FIRST: random.randint(8, 16)
-        }
-        return seats[tier]
 
 
 class DemandSimulator:
@@ -146,42 +78,60 @@ class DemandSimulator:
         while True:
             await asyncio.sleep(interval)
             
-            flights = db.get_all_flights()
-            bookings_made = 0
-            demand_changes = 0
+            bookings_made, demand_changes = DemandSimulator.tick()
             
-            for flight in flights:
+            if bookings_made > 0 or demand_changes > 0:
+                print(f"📊 Simulation cycle: {bookings_made} bookings, "
+                      f"{demand_changes} demand changes")
     
-                if flight.departure_time < datetime.now():
-                    continue
-                
+    @staticmethod
+    def tick() -> tuple[int, int]:
+        """
+        Run a single simulation cycle over all flights
         
-                if random.random() < 0.2 and flight.available_seats > 0:
-                    seats_to_book = random.randint(1, min(5, flight.available_seats))
-                    old_seats = flight.available_seats
-                    flight.available_seats -= seats_to_book
-                    bookings_made += 1
-                    
-                    
-                    demand = DynamicPricingEngine.get_or_calculate_demand(flight)
-                    price = DynamicPricingEngine.calculate_price(flight, demand)
-                    
-                    db.add_fare_history(flight.flight_id, {
-                        "timestamp": datetime.now().isoformat(),
-                        "price": price,
-                        "available_seats": flight.available_seats,
-                        "demand_level": demand.value
-                    })
-                
+        Returns:
+            Tuple of (bookings made, demand changes)
+        """
+        now = datetime.now()
+        booked = []
+        shocked = []
+        
+        for flight in db.get_all_flights():
+            if flight.departure_time < now:
+                continue
             
-                if random.random() < 0.1:
-                    old_demand = db.get_demand_level(flight.flight_id)
-                    new_demand = random.choice(list(DemandLevel))
-                    db.set_demand_level(flight.flight_id, new_demand)
-                    
-                    if old_demand != new_demand:
-                        demand_changes += 1
+            if random.random() < 0.2 and flight.available_seats > 0:
+                seats_to_book = random.randint(1, min(5, flight.available_seats))
+                try:
+                    inventory.reserve(flight, seats_to_book)
+                    booked.append(flight)
+                except SoldOutError:
+                    pass
             
-            if bookings_made > 0 or demand_changes > 0:
-                print(f"📊 Simulation cycle: {bookings_made} bookings, "
-                      f"{demand_changes} demand changes")
\ No newline at end of file
+            if random.random() < 0.1:
+                shocked.append(flight.flight_id)
+        
+        # Reclassify every booked flight in one bulk pass before pricing
+        db.recompute_demand(flight.flight_id for flight in booked)
+        
+        for flight in booked:
+            demand = DynamicPricingEngine.get_or_calculate_demand(flight)
+            price = DynamicPricingEngine.calculate_price(flight, demand)
+            
+            db.add_fare_history(flight.flight_id, {
+                "timestamp": datetime.now().isoformat(),
+                "price": price,
+                "available_seats": flight.available_seats,
+                "demand_level": demand.value
+            })
+        
+        demand_changes = 0
+        for flight_id in shocked:
+            old_demand = db.get_demand_level(flight_id)
+            new_demand = random.choice(list(DemandLevel))
+            db.set_demand_level(flight_id, new_demand)
+            
+            if old_demand != new_demand:
+                demand_changes += 1
+        
+        return len(booked), demand_changes
\ No newline at end of file
@@ -0,0 +1,403 @@
+"""
+Binary snapshots of the in-memory flight state
+
+The FlightDatabase (flights, demand levels, fare history) and the
+flights_data / bookings_data lists are written to a single columnar file, so
+a restart restores them instead of regenerating flights, re-fetching from
+upstream and losing demand levels.
+
+File layout (little endian), in the style of the fare history log:
+    b"SNP1" | uint32 header length | JSON header | 8-byte aligned columns
+
+Each section is a list of records stored column by column: numbers and
+datetimes as fixed-width arrays, strings dictionary encoded (one code per
+row, each distinct string once in the header) and anything else as JSON.
+Restoring is a handful of array reads plus one pass building the records.
+
+Snapshots are taken on a background thread: every flight and booking record
+is copied atomically, then encoded and written to a temporary file that is
+fsynced and renamed into place, so requests keep running and a crash never
+leaves a partial snapshot behind. Card details are never written, as in the
+booking journal.
+"""
+
+import glob
+import json
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.database import FlightDatabase, db
+from app.inventory import SeatInventory, inventory
+from app.models import Flight, PricingTier
+from app.state import bookings_data, flights_data
+
+MAGIC = b"SNP1"
+VERSION = 1
+
+# Never persisted (card details, see app/journal.py)
+PRIVATE_BOOKING_FIELDS = ("payment",)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# Columns
+
+def _column_kind(values: list) -> str:
+    kinds = set(map(type, values))
+    if kinds <= {bool}:
+        return "bool"
+    if kinds <= {int} and (not values or -2 ** 63 <= min(values) and max(values) < 2 ** 63):
+        return "int"
+    if kinds <= {float}:
+        return "float"
+    if kinds <= {str, type(None)}:
+        return "str"
+    if kinds <= {datetime} and all(value.tzinfo is None for value in values):
+        return "datetime"
+    return "json"
+
+
+def _encode_column(values: list) -> Tuple[dict, bytes]:
+    """Encode one column, returning its header entry and data"""
+    if any(issubclass(kind, Enum) for kind in set(map(type, values))):
+        values = [value.value if isinstance(value, Enum) else value for value in values]
+    kind = _column_kind(values)
+    if kind == "bool":
+        return {"kind": kind}, np.array(values, dtype="u1").tobytes()
+    if kind == "int":
+        return {"kind": kind}, np.array(values, dtype="<i8").tobytes()
+    if kind == "float":
+        return {"kind": kind}, np.array(values, dtype="<f8").tobytes()
+    if kind == "datetime":
+        return {"kind": kind}, np.array(values, dtype="datetime64[us]").astype("<i8").tobytes()
+    if kind == "str":
+        distinct = list(dict.fromkeys(values))
+        codes = {value: code for code, value in enumerate(distinct)}
+        dtype = "u1" if len(codes) <= 0xFF else "<u2" if len(codes) <= 0xFFFF else "<u4"
+        column = np.fromiter(map(codes.__getitem__, values), dtype=dtype, count=len(values))
+        return {"kind": kind, "dtype": dtype, "values": distinct}, column.tobytes()
+    return {"kind": kind}, json.dumps(values, default=str).encode("utf-8")
+
+
+def _decode_column(spec: dict, data: memoryview, count: int) -> list:
+    kind = spec["kind"]
+    if kind == "bool":
+        return np.frombuffer(data, dtype="u1", count=count).astype(bool).tolist()
+    if kind == "int":
+        return np.frombuffer(data, dtype="<i8", count=count).tolist()
+    if kind == "float":
+        return np.frombuffer(data, dtype="<f8", count=count).tolist()
+    if kind == "datetime":
+        return np.frombuffer(data, dtype="<i8", count=count).astype("datetime64[us]").tolist()
+    if kind == "str":
+        values = np.empty(len(spec["values"]), dtype=object)
+        values[:] = spec["values"]
+        return values[np.frombuffer(data, dtype=spec["dtype"], count=count)].tolist()
+    return json.loads(bytes(data))
+
+
+def _encode_records(records: List[dict], chunks: List[bytes], offset: int) -> Tuple[dict, int]:
+    """Append a section's columns to `chunks`, returning its header and the new offset"""
+    keys = list(dict.fromkeys(chain.from_iterable(records)))
+    # Records missing a key (usually none) get None for it, and are listed
+    # in the column header so decoding deletes it again
+    partial = [i for i, record in enumerate(records) if len(record) != len(keys)]
+    columns = []
+    for key in keys:
+        if partial:
+            values = [record.get(key) for record in records]
+        else:
+            values = list(map(itemgetter(key), records))
+        spec, data = _encode_column(values)
+        missing = [i for i in partial if key not in records[i]]
+        if missing:
+            spec["missing"] = missing
+        spec.update(name=key, offset=offset, length=len(data))
+        columns.append(spec)
+        chunks.append(data + b"\0" * (_align(len(data)) - len(data)))
+        offset += _align(len(data))
+    return {"count": len(records), "columns": columns}, offset
+
+
+def _decode_records(section: dict, body: memoryview) -> List[dict]:
+    count = section["count"]
+    columns = section["columns"]
+    if not columns:
+        return [{} for _ in range(count)]
+    values = [
+        _decode_column(spec, body[spec["offset"]:spec["offset"] + spec["length"]], count)
+        for spec in columns
+    ]
+    keys = [str(spec["name"]) for spec in columns]
+    records = [dict(zip(keys, row)) for row in zip(*values)]
+    for spec in columns:
+        for i in spec.get("missing", ()):
+            del records[i][spec["name"]]
+    return records
+
+
+# Files
+
+def write_snapshot(path: str, sections: Dict[str, List[dict]], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Atomically write record sections and raw arrays to `path`
+
+    The file is written under a temporary name, fsynced and renamed, so
+    readers only ever see complete snapshots.
+    """
+    chunks: List[bytes] = []
+    offset = 0
+    header = {"version": VERSION, "created_at": time.time(), "sections": {}, "arrays": {}}
+    for name, records in sections.items():
+        header["sections"][name], offset = _encode_records(records, chunks, offset)
+    for name, array in arrays.items():
+        data = np.ascontiguousarray(array).tobytes()
+        header["arrays"][name] = {"dtype": array.dtype.str, "offset": offset, "length": len(data)}
+        chunks.append(data + b"\0" * (_align(len(data)) - len(data)))
+        offset += _align(len(data))
+
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(encoded)) + encoded
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[dict, Dict[str, List[dict]], Dict[str, np.ndarray]]:
+    """
+    Read a snapshot written by write_snapshot
+
+    Returns:
+        (header, record sections, arrays)
+
+    Raises:
+        ValueError: If the file is not a complete snapshot
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:4] != MAGIC or len(raw) < 8:
+        raise ValueError(f"{path} is not a state snapshot")
+    (header_length,) = struct.unpack_from("<I", raw, 4)
+    header = json.loads(raw[8:8 + header_length])
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('version')}")
+    body = memoryview(raw)[_align(8 + header_length):]
+    sections = {name: _decode_records(section, body) for name, section in header["sections"].items()}
+    arrays = {
+        name: np.frombuffer(body[spec["offset"]:spec["offset"] + spec["length"]], dtype=spec["dtype"]).copy()
+        for name, spec in header["arrays"].items()
+    }
+    return header, sections, arrays
+
+
+def _restore_flights(records: List[dict]) -> List[Flight]:
+    """
+    Rebuild Flight models from snapshot records without revalidating them
+
+    The records were dumped from validated models, so model_construct is
+    enough; only the tier enum needs converting back.
+    """
+    tiers = {tier.value: tier for tier in PricingTier}
+    flights = []
+    for record in records:
+        record["tier"] = tiers[record["tier"]]
+        flights.append(Flight.model_construct(**record))
+    return flights
+
+
+class StateSnapshotter:
+    """
+    Periodic background snapshots of the in-memory flight state
+
+    Args:
+        directory: Where snapshot files are kept
+        flight_db: FlightDatabase to snapshot and restore
+        flights: The flights_data list
+        bookings: The bookings_data store
+        interval: Seconds between automatic snapshots (0 disables them)
+        keep: Snapshot files kept; older ones are deleted
+        max_age: Snapshots older than this many seconds are not restored
+        seat_inventory: Inventory whose seat counts are corrected when
+            bookings are restored from the journal instead of the snapshot
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        flight_db: FlightDatabase,
+        flights: list,
+        bookings: list,
+        interval: float = 300.0,
+        keep: int = 2,
+        max_age: float = 86_400.0,
+        seat_inventory: Optional[SeatInventory] = None
+    ):
+        self.directory = directory
+        self.flight_db = flight_db
+        self.flights = flights
+        self.bookings = bookings
+        self.interval = interval
+        self.keep = keep
+        self.max_age = max_age
+        self.seat_inventory = seat_inventory
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_snapshot: Optional[dict] = None
+
+    # Taking snapshots
+
+    def capture(self) -> Tuple[Dict[str, List[dict]], Dict[str, np.ndarray]]:
+        """
+        Copy the current state; each record is copied atomically under the GIL
+
+        Bookings are copied before flights_data. Seats are taken before a
+        booking is stored and released after it is removed, so a booking
+        racing with the copy can only leave a seat unsold, never oversold.
+        """
+        flight_models = list(self.flight_db.flights)
+        demand = self.flight_db.demand_codes[:len(flight_models)].copy()
+        fare_history = [
+            {"flight_id": flight_id, **entry}
+            for flight_id, entries in list(self.flight_db.fare_history.items())
+            for entry in list(entries)
+        ]
+        bookings = [
+            {key: value for key, value in booking.items() if key not in PRIVATE_BOOKING_FIELDS}
+            for booking in list(self.bookings)
+        ]
+        sections = {
+            "flights": [dict(flight.__dict__) for flight in flight_models],
+            "fare_history": fare_history,
+            "flights_data": [dict(flight) for flight in list(self.flights)],
+            "bookings": bookings,
+        }
+        return sections, {"demand": demand}
+
+    def snapshot(self) -> str:
+        """Capture and write a snapshot now, returning its path"""
+        with self._lock:
+            started = time.perf_counter()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"state-{time.time_ns():020d}.snap")
+            sections, arrays = self.capture()
+            write_snapshot(path, sections, arrays)
+            for old in self._snapshot_files()[:-self.keep]:
+                os.remove(old)
+            self.last_snapshot = {
+                "path": path,
+                "flights": len(sections["flights"]),
+                "flights_data": len(sections["flights_data"]),
+                "bookings": len(sections["bookings"]),
+                "bytes": os.path.getsize(path),
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            return path
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"⚠️ State snapshot failed: {e}")
+
+    def start(self) -> None:
+        """Take snapshots every `interval` seconds on a background thread"""
+        if self.interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="state-snapshotter", daemon=True)
+            self._thread.start()
+
+    def stop(self, final_snapshot: bool = True) -> None:
+        """Stop periodic snapshots, optionally writing one last snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        if final_snapshot:
+            self.snapshot()
+
+    # Restoring
+
+    def _snapshot_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "state-*.snap")))
+
+    def latest(self) -> Optional[str]:
+        """Path of the newest snapshot, if any"""
+        files = self._snapshot_files()
+        return files[-1] if files else None
+
+    def restore(self, include_bookings: bool = True) -> Optional[dict]:
+        """
+        Load the newest readable snapshot into the state objects
+
+        Args:
+            include_bookings: Also restore bookings_data (skip when the
+                booking journal already replayed them)
+
+        Returns:
+            Counts of restored records, or None if no usable snapshot exists
+        """
+        for path in reversed(self._snapshot_files()):
+            try:
+                header, sections, arrays = read_snapshot(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Skipping unreadable snapshot {path}: {e}")
+                continue
+            if time.time() - header["created_at"] > self.max_age:
+                return None
+
+            fare_history = defaultdict(list)
+            for entry in sections["fare_history"]:
+                fare_history[entry.pop("flight_id")].append(entry)
+            self.flight_db.load_state(_restore_flights(sections["flights"]), arrays["demand"], fare_history)
+
+            self.flights[:] = sections["flights_data"]
+            if include_bookings:
+                self.bookings.clear()
+                self.bookings.extend(sections["bookings"])
+            elif self.seat_inventory is not None:
+                # Seat counts reflect the snapshot's bookings; take or return
+                # seats for bookings made or cancelled since then
+                self.seat_inventory.apply_bookings(self.flights, self.bookings, counted=sections["bookings"])
+            return {
+                "path": path,
+                "flights": len(sections["flights"]),
+                "flights_data": len(sections["flights_data"]),
+                "bookings": len(sections["bookings"]) if include_bookings else 0
+            }
+        return None
+
+
+STATE_SNAPSHOT_DIR = os.getenv("STATE_SNAPSHOT_DIR")
+
+state_snapshotter = StateSnapshotter(
+    STATE_SNAPSHOT_DIR,
+    db,
+    flights_data,
+    bookings_data,
+    interval=float(os.getenv("STATE_SNAPSHOT_INTERVAL_SECONDS", 300)),
+    keep=int(os.getenv("STATE_SNAPSHOT_KEEP", 2)),
+    max_age=float(os.getenv("STATE_SNAPSHOT_MAX_AGE_HOURS", 24)) * 3600,
+    seat_inventory=inventory
+) if STATE_SNAPSHOT_DIR else None
@@ -2,6 +2,118 @@
 Global application state
 """
 
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class BookingStore(list):
+    """
+    The bookings list, indexed by booking id and by flight
+
+    Behaves like a plain list for existing callers; every mutation keeps the
+    indexes in step so lookups by id or flight never scan the whole list.
+    Mutations hold `lock`, so concurrent requests cannot leave the list and
+    its indexes disagreeing; hold it yourself to check and change a booking
+    atomically.
+    """
+
+    def __init__(self, bookings: Iterable[dict] = ()):
+        super().__init__()
+        self.lock = threading.RLock()
+        self._by_id: Dict[str, dict] = {}
+        self._by_flight: Dict[str, Dict[str, dict]] = {}
+        self.extend(bookings)
+
+    def _index(self, booking: dict) -> None:
+        self._by_id[booking["booking_id"]] = booking
+        self._by_flight.setdefault(booking["flight_id"], {})[booking["booking_id"]] = booking
+
+    def _unindex(self, booking: dict) -> None:
+        self._by_id.pop(booking["booking_id"], None)
+        on_flight = self._by_flight.get(booking["flight_id"])
+        if on_flight is not None:
+            on_flight.pop(booking["booking_id"], None)
+            if not on_flight:
+                del self._by_flight[booking["flight_id"]]
+
+    def _reindex(self) -> None:
+        self._by_id.clear()
+        self._by_flight.clear()
+        for booking in self:
+            self._index(booking)
+
+    # Lookups
+
+    def get(self, booking_id: str) -> Optional[dict]:
+        """Booking with this id, or None"""
+        return self._by_id.get(booking_id)
+
+    def for_flight(self, flight_id: str) -> List[dict]:
+        """All bookings on a flight, in booking order"""
+        with self.lock:
+            return list(self._by_flight.get(flight_id, {}).values())
+
+    # List mutations
+
+    def append(self, booking: dict) -> None:
+        with self.lock:
+            super().append(booking)
+            self._index(booking)
+
+    def extend(self, bookings: Iterable[dict]) -> None:
+        bookings = list(bookings)
+        with self.lock:
+            super().extend(bookings)
+            for booking in bookings:
+                self._index(booking)
+
+    def __iadd__(self, bookings: Iterable[dict]) -> "BookingStore":
+        self.extend(bookings)
+        return self
+
+    def insert(self, index: int, booking: dict) -> None:
+        with self.lock:
+            super().insert(index, booking)
+            self._index(booking)
+
+    def remove(self, booking: dict) -> None:
+        with self.lock:
+            super().remove(booking)
+            self._unindex(booking)
+
+    def pop(self, index: int = -1) -> dict:
+        with self.lock:
+            booking = super().pop(index)
+            self._unindex(booking)
+            return booking
+
+    def clear(self) -> None:
+        with self.lock:
+            super().clear()
+            self._by_id.clear()
+            self._by_flight.clear()
+
+    def __setitem__(self, index, value) -> None:
+        with self.lock:
+            super().__setitem__(index, value)
+            self._reindex()
+
+    def __delitem__(self, index) -> None:
+        with self.lock:
+            super().__delitem__(index)
+            self._reindex()
+
+    def remove_many(self, booking_ids: Iterable[str]) -> List[dict]:
+        """Remove several bookings in one pass over the list, returning them"""
+        doomed = set(booking_ids)
+        with self.lock:
+            removed = [booking for booking in self if booking["booking_id"] in doomed]
+            super().__setitem__(slice(None), [booking for booking in self if booking["booking_id"] not in doomed])
+            for booking in removed:
+                self._unindex(booking)
+            return removed
+
+
 # In-memory storage
 flights_data = []
-bookings_data = []
\ No newline at end of file
+bookings_data = BookingStore()
@@ -0,0 +1,147 @@
+"""
+Content-addressed ticket PDF cache
+
+Tickets are rendered on first request and stored on local disk under a hash
+of the fields printed on them, so an unchanged booking is never rendered
+twice and the hash doubles as the HTTP ETag. The cache is bounded by total
+size and evicts least recently used tickets first.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.booking_pdf import render_booking_pdfs
+
+# Bump when the ticket layout changes so cached PDFs are not reused
+TICKET_TEMPLATE_VERSION = 1
+
+PRINTABLE_FIELDS = [
+    "booking_id", "confirmation_code", "booking_date", "flight_id", "airline", "origin",
+    "destination", "departure_time", "arrival_time", "duration", "tier", "total_amount"
+]
+PRINTABLE_PASSENGER_FIELDS = ["first_name", "last_name", "email", "phone"]
+
+
+def ticket_key(booking: dict) -> str:
+    """Hash the fields that appear on the ticket"""
+    printable = {field: booking.get(field) for field in PRINTABLE_FIELDS}
+    printable["passenger"] = {field: booking["passenger"].get(field) for field in PRINTABLE_PASSENGER_FIELDS}
+    printable["template"] = TICKET_TEMPLATE_VERSION
+    encoded = json.dumps(printable, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class TicketCache:
+    """
+    Size-bounded LRU of rendered tickets on local disk
+
+    Args:
+        directory: Where ticket files are stored, created on first write
+        max_bytes: Total size kept before least recently used tickets are evicted
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _load_index(self) -> None:
+        """Pick up tickets left by a previous run, oldest first (lock held)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.isdir(self.directory):
+            return
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pdf"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Return a cached ticket and mark it recently used"""
+        with self._lock:
+            self._load_index()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+            return None
+
+    def store(self, key: str, pdf: bytes) -> None:
+        """Write a ticket atomically and evict old ones past the size bound"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, self._path(key))
+
+        evicted = []
+        with self._lock:
+            self._load_index()
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(pdf)
+            self._total += len(pdf)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, booking: dict) -> bytes:
+        """Return the ticket for a booking, rendering it on a miss"""
+        return self.get_many([booking])[0]
+
+    def get_many(self, bookings: List[dict]) -> List[bytes]:
+        """Return tickets for several bookings, rendering all misses in one batch"""
+        keys = [ticket_key(booking) for booking in bookings]
+        pdfs = [self.load(key) for key in keys]
+        missing = [i for i, pdf in enumerate(pdfs) if pdf is None]
+        if missing:
+            for i, pdf in zip(missing, render_booking_pdfs([bookings[i] for i in missing])):
+                self.store(keys[i], pdf)
+                pdfs[i] = pdf
+        return pdfs
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            return {
+                "tickets": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+ticket_cache = TicketCache(
+    directory=os.getenv("TICKET_CACHE_DIR", os.path.join("data", "tickets")),
+    max_bytes=int(os.getenv("TICKET_CACHE_MAX_MB", 64)) * 1024 * 1024
+)
@@ -1,16 +1,17 @@
 """SQLite database for user management"""
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
+from app.db_engine import SAMPLE_DATABASE_PRAGMAS, create_db_engine
+
 # Database configuration
 SQLALCHEMY_DATABASE_URL = "sqlite:///./skybook.db"
-# Add connect_args to make SQLite work with multiple threads
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Pragmas and a pool sized for the threadpool; WAL only when SQLITE_JOURNAL_MODE
+# is set, as this sample file is committed (see app/db_engine.py)
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, pragmas=SAMPLE_DATABASE_PRAGMAS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
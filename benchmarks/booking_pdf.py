@@ -0,0 +1,69 @@
+"""
+Booking PDF rendering benchmarks
+
+Measures PDFs per second rendered in-process and across the render process
+pool, and checks that rendering leaves no files behind in the temp directory.
+
+    python -m benchmarks.booking_pdf run --sizes 100 1000
+"""
+
+import os
+import tempfile
+
+from app.booking_pdf import render_booking_pdf, render_booking_pdfs, shutdown_render_pool
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [100, 1_000]
+
+
+def make_booking(i: int) -> dict:
+    return {
+        "booking_id": f"00000000-0000-0000-0000-{i:012d}",
+        "confirmation_code": f"SKY{i % 1_000_000:06d}",
+        "booking_date": "2025-01-01 10:00:00",
+        "passenger": {"first_name": "Ada", "last_name": f"Lovelace{i}", "email": f"p{i}@example.com", "phone": "555"},
+        "flight_id": f"FL{i:04d}",
+        "airline": "SkyBook Air",
+        "origin": "JFK",
+        "destination": "LAX",
+        "departure_time": "2025-02-01 08:00",
+        "arrival_time": "2025-02-01 11:30",
+        "duration": "5h 30m",
+        "tier": "economy",
+        "total_amount": 199.0 + i
+    }
+
+
+def run(sizes):
+    results = {
+        "render_booking_pdf": {},
+        "render_booking_pdfs_pool": {},
+    }
+    temp_dir = tempfile.gettempdir()
+
+    for size in sizes:
+        print(f"\n📊 Rendering {size:,} PDFs...")
+        bookings = [make_booking(i) for i in range(size)]
+        before = set(os.listdir(temp_dir))
+
+        results["render_booking_pdf"][str(size)] = measure(
+            lambda: [render_booking_pdf(b) for b in bookings], size
+        )
+        # Warm the pool so worker start-up is not part of the timing
+        render_booking_pdfs(bookings[:2])
+        results["render_booking_pdfs_pool"][str(size)] = measure(
+            lambda: render_booking_pdfs(bookings), size
+        )
+
+        leaked = len(set(os.listdir(temp_dir)) - before)
+        for suite in results.values():
+            suite[str(size)]["temp_files_leaked"] = leaked
+        if leaked:
+            print(f"❌ {leaked} temp file(s) left behind")
+
+    shutdown_render_pool()
+    return results
+
+
+if __name__ == "__main__":
+    main("booking_pdf", run, DEFAULT_SIZES)
@@ -0,0 +1,137 @@
+"""
+Shared helpers for benchmark scripts
+
+Every benchmark module exposes a `run(sizes)` function returning
+{benchmark name: {size: measurement}} and hands it to `main()`, which
+provides the `run` and `compare` commands:
+
+    python -m benchmarks.pricing run --sizes 1000 10000 --output results.json
+    python -m benchmarks.pricing compare results.json baseline.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], object], operations: int, repeat: int = 3, setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Time `fn` and report the best of `repeat` runs
+
+    Args:
+        fn: Callable performing `operations` units of work
+        operations: Units of work per call, used for the throughput figure
+        repeat: Number of timed runs
+        setup: Optional untimed callable run before every timed run
+
+    Returns:
+        Dict with `seconds`, `operations` and `per_second`
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": round(best, 6),
+        "operations": operations,
+        "per_second": round(operations / best, 2) if best > 0 else None
+    }
+
+
+def percentiles(samples: List[float], points=(50, 99)) -> Dict[str, float]:
+    """Return latency percentiles in milliseconds"""
+    ordered = sorted(samples)
+    return {
+        f"p{p}_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+        for p in points
+    }
+
+
+def save_results(path: str, suite: str, results: dict) -> None:
+    """Write results with enough metadata to tell runs apart"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "suite": suite,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results
+        }, f, indent=2)
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    Compare throughput of matching benchmark/size pairs
+
+    Returns:
+        One row per pair with the throughput ratio and a regression flag
+    """
+    rows = []
+    for name, sizes in current["results"].items():
+        for size, measurement in sizes.items():
+            reference = baseline["results"].get(name, {}).get(size)
+            if not reference or not reference.get("per_second") or not measurement.get("per_second"):
+                continue
+            ratio = measurement["per_second"] / reference["per_second"]
+            rows.append({
+                "benchmark": name,
+                "size": size,
+                "baseline": reference["per_second"],
+                "current": measurement["per_second"],
+                "ratio": round(ratio, 3),
+                "regression": ratio < 1 - threshold
+            })
+    return rows
+
+
+def main(suite: str, run: Callable[[List[int]], dict], default_sizes: List[int]) -> None:
+    """Command line entry point shared by benchmark modules"""
+    parser = argparse.ArgumentParser(description=f"{suite} benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write a JSON results file")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    run_parser.add_argument("--output", default=f"benchmarks/results/{suite}.json")
+
+    compare_parser = commands.add_parser("compare", help="Flag throughput regressions against a baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Allowed throughput drop before flagging, as a fraction")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.sizes)
+        save_results(args.output, suite, results)
+        for name, sizes in results.items():
+            for size, measurement in sizes.items():
+                print(f"{name:<32} {size:>10} {json.dumps(measurement)}")
+        print(f"\n✅ Results written to {args.output}")
+        return
+
+    with open(args.results) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows = compare_results(current, baseline, args.threshold)
+    for row in rows:
+        flag = "❌ REGRESSION" if row["regression"] else "✅"
+        print(f"{row['benchmark']:<32} {row['size']:>10} {row['baseline']:>14} -> {row['current']:>14} "
+              f"x{row['ratio']:<6} {flag}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("\n✅ No regressions")
@@ -0,0 +1,104 @@
+"""
+Sync vs async engine load test for the SQL API (database_config.py)
+
+Each mode runs in a fresh process, because the engine is chosen when the
+app is imported. Requests are driven in-process through httpx's ASGI
+transport at CONCURRENCY in flight: 70% searches, 20% stats and 10%
+bookings against a temporary SQLite database, where async mode currently
+comes out slower (see the note in database_config.py).
+
+    python -m benchmarks.db_load run --sizes 2000 10000
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+
+from benchmarks.common import main, percentiles
+
+DEFAULT_SIZES = [2_000, 10_000]
+CONCURRENCY = 64
+AIRPORT_CODES = ["JFK", "LAX", "ORD", "ATL", "DFW", "SFO", "SEA", "MIA"]
+
+
+def _measure(mode: str, size: int, directory: str) -> dict:
+    """Run `size` requests against a freshly imported app (in a spawned process)"""
+    os.environ["FLIGHT_DATABASE_URL"] = f"sqlite:///{os.path.join(directory, f'{mode}.db')}"
+    os.environ["FLIGHT_DATABASE_ASYNC"] = "true" if mode == "async" else "false"
+    os.environ["FLIGHT_SEED_DAYS"] = "30"
+    os.environ["FLIGHT_SEED_ROUTES"] = "200"
+
+    import httpx
+    import database_config
+    from app.flight_database import Airline, Airport, SessionLocal
+
+    with SessionLocal() as db:
+        db.add(Airline(airline_id=1, name="Load Test Air"))
+        db.add_all(Airport(code=code, name=code) for code in AIRPORT_CODES)
+        db.commit()
+
+    rng = random.Random(11)
+    today = datetime.now().date()
+
+    def request(client, i):
+        roll = rng.random()
+        if roll < 0.7:
+            origin, destination = rng.sample(AIRPORT_CODES, 2)
+            day = (today + timedelta(days=rng.randrange(30))).isoformat()
+            return client.post("/flights/search", json={"origin": origin, "destination": destination, "date": day})
+        if roll < 0.9:
+            return client.get("/stats")
+        return client.post("/bookings", json={
+            "flight_id": f"FL{rng.randint(1, 6000):04d}", "passenger_name": f"Load {i}",
+            "passenger_email": f"load{i}@example.com", "passenger_phone": "555"
+        })
+
+    async def drive():
+        await database_config.startup_event()
+        # Count unhandled server errors (SQLite lock timeouts) instead of aborting
+        transport = httpx.ASGITransport(app=database_config.app, raise_app_exceptions=False)
+        samples, errors = [], 0
+        queue = iter(range(size))
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            async def worker():
+                nonlocal errors
+                for i in queue:
+                    began = time.perf_counter()
+                    response = await request(client, i)
+                    samples.append(time.perf_counter() - began)
+                    errors += response.status_code >= 500
+
+            began = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - began
+
+        return {
+            "seconds": round(elapsed, 6),
+            "operations": size,
+            "per_second": round(size / elapsed, 2),
+            **percentiles(samples),
+            "server_errors": errors
+        }
+
+    return asyncio.run(drive())
+
+
+def run(sizes):
+    results = {"db_api_sync": {}, "db_api_async": {}}
+    for size in sizes:
+        for mode in ("sync", "async"):
+            print(f"\n📊 {size:,} requests, {CONCURRENCY} concurrent, {mode} engine...")
+            with tempfile.TemporaryDirectory(prefix="db-load-") as directory:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    results[f"db_api_{mode}"][str(size)] = pool.submit(_measure, mode, size, directory).result()
+    return results
+
+
+if __name__ == "__main__":
+    main("db_load", run, DEFAULT_SIZES)
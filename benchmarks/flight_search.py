@@ -0,0 +1,134 @@
+"""
+SQL flight search benchmarks
+
+Seeds the flights table, then times the search_flights query for random
+routes and days before and after the 0001 index migration, printing the
+query plan for each. Runs on a temporary SQLite file, and also on
+PostgreSQL when BENCHMARK_POSTGRES_URL points at a scratch database.
+
+    python -m benchmarks.flight_search run --sizes 100000 1000000
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.flight_database import Airline, Airport, Base, Flight, apply_migrations, search_flights_query
+from benchmarks.common import main, percentiles
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+QUERIES = 500
+CHUNK = 50_000
+DAYS = 90
+AIRPORT_CODES = [f"A{i:02d}" for i in range(50)]
+AIRLINE_COUNT = 20
+SECONDARY_INDEXES = [
+    "ix_flights_route_departure", "ix_flights_airline_id", "ix_flights_destination_airport",
+    "ix_bookings_flight_id", "ix_bookings_passenger_id"
+]
+
+
+def seed(engine, size: int, start: date) -> None:
+    """Create the schema without secondary indexes and insert `size` flights"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for name in SECONDARY_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(Airline.__table__.insert(), [
+            {"airline_id": i, "name": f"Airline {i}", "code": f"L{i:02d}"} for i in range(1, AIRLINE_COUNT + 1)
+        ])
+        conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in AIRPORT_CODES])
+
+        for offset in range(0, size, CHUNK):
+            rows = []
+            for i in range(offset, min(size, offset + CHUNK)):
+                origin, destination = rng.sample(AIRPORT_CODES, 2)
+                departure = datetime.combine(start, datetime.min.time()) + timedelta(minutes=rng.randrange(DAYS * 1440))
+                rows.append({
+                    "flight_id": f"FL{i:07d}", "airline_id": rng.randint(1, AIRLINE_COUNT),
+                    "source_airport": origin, "destination_airport": destination,
+                    "departure_time": departure, "arrival_time": departure + timedelta(hours=3),
+                    "duration": "3h 0m", "base_fare": 100.0, "current_price": 120.0,
+                    "total_seats": 200, "available_seats": 100, "tier": "economy", "demand_level": "medium"
+                })
+            conn.execute(Flight.__table__.insert(), rows)
+
+
+def explain(engine, query) -> str:
+    """Query plan of an ORM query on this backend"""
+    compiled = query.statement.compile(engine)
+    if engine.dialect.name == "sqlite":
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+        return "; ".join(row[-1] for row in rows)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).fetchall()
+    return "; ".join(row[0].strip() for row in rows)
+
+
+def time_searches(engine, start: date) -> dict:
+    rng = random.Random(7)
+    samples = []
+    with Session(engine) as db:
+        for _ in range(QUERIES):
+            origin, destination = rng.sample(AIRPORT_CODES, 2)
+            day = start + timedelta(days=rng.randrange(DAYS))
+            began = time.perf_counter()
+            search_flights_query(db, origin, destination, day).all()
+            samples.append(time.perf_counter() - began)
+        plan = explain(engine, search_flights_query(db, "A00", "A01", start))
+    total = sum(samples)
+    return {
+        "seconds": round(total, 6),
+        "operations": QUERIES,
+        "per_second": round(QUERIES / total, 2),
+        **percentiles(samples),
+        "plan": plan
+    }
+
+
+def backends():
+    """(name, url) pairs to benchmark"""
+    directory = tempfile.mkdtemp(prefix="flight-search-")
+    yield "sqlite", f"sqlite:///{os.path.join(directory, 'flights.db')}"
+    if os.getenv("BENCHMARK_POSTGRES_URL"):
+        yield "postgresql", os.getenv("BENCHMARK_POSTGRES_URL")
+
+
+def run(sizes):
+    results = {}
+    start = date.today()
+
+    for name, url in backends():
+        engine = create_engine(url)
+        for size in sizes:
+            print(f"\n📊 Seeding {size:,} flights into {name}...")
+            seed(engine, size, start)
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+            before = time_searches(engine, start)
+
+            apply_migrations(engine)
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+            after = time_searches(engine, start)
+
+            results.setdefault(f"search_{name}_before_indexes", {})[str(size)] = before
+            results.setdefault(f"search_{name}_after_indexes", {})[str(size)] = after
+            print(f"🔍 before: {before['plan']}")
+            print(f"🔍 after:  {after['plan']}")
+        engine.dispose()
+
+    return results
+
+
+if __name__ == "__main__":
+    main("flight_search", run, DEFAULT_SIZES)
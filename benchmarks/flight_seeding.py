@@ -0,0 +1,88 @@
+"""
+SQL flight seeding benchmarks
+
+Compares the old per-row ORM `db.add()` seeding with streamed Core
+executemany batches on a temporary SQLite file, plus COPY on PostgreSQL when
+BENCHMARK_POSTGRES_URL points at a scratch database. The ORM path is only
+run up to ORM_MAX_ROWS because it is the slow baseline.
+
+    python -m benchmarks.flight_seeding run --sizes 100000 1000000
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.flight_database import Airline, Airport, Base, Flight
+from app.inventory_generator import SyntheticInventoryGenerator, seed_flight_database
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+ORM_MAX_ROWS = 100_000
+ROUTES = 1_000
+AIRPORT_CODES = [f"A{i:02d}" for i in range(50)]
+AIRLINES = [f"Airline {i}" for i in range(1, 21)]
+
+
+def reset(engine) -> None:
+    """Recreate the schema with airports and airlines"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Airline.__table__.insert(), [
+            {"airline_id": i, "name": name} for i, name in enumerate(AIRLINES, start=1)
+        ])
+        conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in AIRPORT_CODES])
+
+
+def seed_with_orm(engine, size: int) -> None:
+    """The previous startup path: one ORM object and db.add() per flight, one commit"""
+    airline_ids = {name: i for i, name in enumerate(AIRLINES, start=1)}
+    generator = SyntheticInventoryGenerator(seed=1, airports=AIRPORT_CODES, airlines=AIRLINES)
+    with Session(engine) as db:
+        for batch in generator.iter_batches(days=size // ROUTES, routes=ROUTES):
+            for row in batch.to_flight_table_rows(airline_ids):
+                db.add(Flight(**row))
+        db.commit()
+
+
+def seed_in_bulk(engine, size: int, use_copy=None) -> None:
+    with engine.begin() as conn:
+        seed_flight_database(conn, days=size // ROUTES, routes=ROUTES, seed=1, use_copy=use_copy)
+
+
+def backends():
+    """(name, url) pairs to benchmark"""
+    directory = tempfile.mkdtemp(prefix="flight-seeding-")
+    yield "sqlite", f"sqlite:///{os.path.join(directory, 'flights.db')}"
+    if os.getenv("BENCHMARK_POSTGRES_URL"):
+        yield "postgresql", os.getenv("BENCHMARK_POSTGRES_URL")
+
+
+def run(sizes):
+    results = {}
+
+    for name, url in backends():
+        engine = create_engine(url)
+        for size in sizes:
+            print(f"\n📊 Seeding {size:,} flights into {name}...")
+            if size <= ORM_MAX_ROWS:
+                results.setdefault(f"seed_{name}_orm_add", {})[str(size)] = measure(
+                    lambda: seed_with_orm(engine, size), size, repeat=1, setup=lambda: reset(engine)
+                )
+            results.setdefault(f"seed_{name}_executemany", {})[str(size)] = measure(
+                lambda: seed_in_bulk(engine, size, use_copy=False), size, repeat=1, setup=lambda: reset(engine)
+            )
+            if name == "postgresql":
+                results.setdefault("seed_postgresql_copy", {})[str(size)] = measure(
+                    lambda: seed_in_bulk(engine, size, use_copy=True), size, repeat=1, setup=lambda: reset(engine)
+                )
+        engine.dispose()
+
+    return results
+
+
+if __name__ == "__main__":
+    main("flight_seeding", run, DEFAULT_SIZES)
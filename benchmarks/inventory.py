@@ -0,0 +1,59 @@
+"""
+Seat inventory contention benchmarks
+
+Reserves seats from several threads, either spread across many flights or
+all on one flight, to show that striped locks keep unrelated flights from
+contending.
+
+    python -m benchmarks.inventory run --sizes 10000 100000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.inventory import SeatInventory
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [10_000, 100_000]
+THREADS = 8
+
+
+def make_flights(count: int, seats: int) -> list:
+    return [
+        {"flight_id": f"BM{i:06d}", "available_seats": seats, "total_seats": seats}
+        for i in range(count)
+    ]
+
+
+def run(sizes):
+    results = {
+        "reserve_many_flights": {},
+        "reserve_one_flight": {},
+    }
+
+    for size in sizes:
+        print(f"\n📊 Reserving {size:,} seats on {THREADS} threads...")
+        per_thread = size // THREADS
+
+        for name, flight_count in (("reserve_many_flights", THREADS * 64), ("reserve_one_flight", 1)):
+            state = {}
+
+            def setup():
+                state["inventory"] = SeatInventory()
+                state["flights"] = make_flights(flight_count, size)
+
+            def work(t):
+                seats, flights = state["inventory"], state["flights"]
+                for i in range(per_thread):
+                    seats.reserve(flights[(t * 64 + i) % flight_count])
+
+            def reserve_all():
+                with ThreadPoolExecutor(max_workers=THREADS) as pool:
+                    list(pool.map(work, range(THREADS)))
+
+            results[name][str(size)] = measure(reserve_all, per_thread * THREADS, setup=setup)
+
+    return results
+
+
+if __name__ == "__main__":
+    main("inventory", run, DEFAULT_SIZES)
@@ -0,0 +1,62 @@
+"""
+Booking journal durability benchmarks
+
+Appends bookings from several threads under each durability mode to show
+what group commit buys over an fsync per record.
+
+    python -m benchmarks.journal run --sizes 1000 10000
+"""
+
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app.journal import BookingJournal, SYNC_MODES
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [1_000, 10_000]
+THREADS = 16
+
+
+def make_booking(i: int) -> dict:
+    return {
+        "booking_id": f"00000000-0000-0000-0000-{i:012d}",
+        "flight_id": f"FL{i % 500:04d}",
+        "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": f"p{i}@example.com", "phone": "555"},
+        "total_amount": 199.0,
+        "booking_status": "confirmed",
+        "confirmation_code": f"SKY{i % 1_000_000:06d}",
+        "booking_date": "2025-01-01 10:00:00"
+    }
+
+
+def run(sizes):
+    results = {f"journal_{mode}": {} for mode in SYNC_MODES}
+
+    for size in sizes:
+        print(f"\n📊 Journaling {size:,} bookings on {THREADS} threads...")
+        bookings = [make_booking(i) for i in range(size)]
+
+        for mode in SYNC_MODES:
+            state = {}
+
+            def setup():
+                state["dir"] = tempfile.mkdtemp(prefix="journal-bench-")
+                state["journal"] = BookingJournal(state["dir"], mode=mode)
+
+            def append_all():
+                journal = state["journal"]
+                with ThreadPoolExecutor(max_workers=THREADS) as pool:
+                    list(pool.map(lambda b: journal.append("book", bookings=[b]), bookings))
+                journal.close()
+                shutil.rmtree(state["dir"])
+
+            # fsync per record is slow, so only time it once
+            repeat = 1 if mode == "always" else 3
+            results[f"journal_{mode}"][str(size)] = measure(append_all, size, repeat=repeat, setup=setup)
+
+    return results
+
+
+if __name__ == "__main__":
+    main("journal", run, DEFAULT_SIZES)
@@ -0,0 +1,68 @@
+"""
+Email delivery benchmarks
+
+Sends messages to a local SMTP stand-in, comparing a fresh connection per
+message (the old behaviour) with pooled sessions and batched delivery.
+
+    python -m benchmarks.notifications run --sizes 100 1000
+"""
+
+import smtplib
+from email.mime.text import MIMEText
+
+from app.mailer import SMTPSessionPool
+from benchmarks.common import main, measure
+from benchmarks.smtp_server import LocalSMTPServer
+
+DEFAULT_SIZES = [100, 1_000]
+BATCH_SIZE = 50
+
+
+def make_message(i: int) -> MIMEText:
+    msg = MIMEText(f"Booking {i} confirmed", "plain")
+    msg["From"] = "bench@example.com"
+    msg["To"] = f"passenger{i}@example.com"
+    msg["Subject"] = f"Flight Booking Confirmation - SKY{i:06d}"
+    return msg
+
+
+def run(sizes):
+    results = {
+        "smtp_connection_per_message": {},
+        "smtp_pooled_send": {},
+        "smtp_pooled_batch": {},
+    }
+
+    with LocalSMTPServer() as server:
+        for size in sizes:
+            messages = [make_message(i) for i in range(size)]
+            print(f"\n📊 Sending {size:,} messages...")
+
+            def per_message():
+                for msg in messages:
+                    conn = smtplib.SMTP(server.host, server.port, timeout=15)
+                    conn.ehlo()
+                    conn.login("bench@example.com", "secret")
+                    conn.send_message(msg)
+                    conn.quit()
+
+            pool = SMTPSessionPool(server.host, server.port, "bench@example.com", "secret", starttls=False)
+
+            def pooled():
+                for msg in messages:
+                    pool.send(msg)
+
+            def batched():
+                for i in range(0, size, BATCH_SIZE):
+                    pool.send_batch(messages[i:i + BATCH_SIZE])
+
+            results["smtp_connection_per_message"][str(size)] = measure(per_message, size)
+            results["smtp_pooled_send"][str(size)] = measure(pooled, size)
+            results["smtp_pooled_batch"][str(size)] = measure(batched, size)
+            pool.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    main("notifications", run, DEFAULT_SIZES)
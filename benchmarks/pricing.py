@@ -0,0 +1,73 @@
+"""
+Pricing engine and simulator benchmarks
+
+Measures DynamicPricingEngine.calculate_price, get_or_calculate_demand,
+AirlineAPISimulator.generate_flights and one DemandSimulator tick.
+
+    python -m benchmarks.pricing run --sizes 1000 10000 100000 1000000
+"""
+
+import random
+
+from app.database import db
+from app.pricing import DynamicPricingEngine
+from app.simulator import AirlineAPISimulator, DemandSimulator
+from app.inventory_generator import SyntheticInventoryGenerator, load_into_flight_database
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Routes used when seeding; days are derived from the requested size
+ROUTES = 1_000
+
+
+def seed_database(size: int) -> int:
+    """Replace the flight store with about `size` generated flights"""
+    db.clear()
+    generator = SyntheticInventoryGenerator(seed=size)
+    routes = min(ROUTES, size)
+    return load_into_flight_database(db, generator.iter_batches(days=max(1, size // routes), routes=routes))
+
+
+def run(sizes):
+    results = {
+        "calculate_price": {},
+        "get_or_calculate_demand": {},
+        "generate_flights": {},
+        "demand_simulator_tick": {},
+    }
+
+    for size in sizes:
+        repeat = 3 if size <= 100_000 else 1
+        print(f"\n📊 Benchmarking {size:,} flights...")
+        count = seed_database(size)
+        flights = db.get_all_flights()
+        demands = [DynamicPricingEngine.get_or_calculate_demand(f) for f in flights]
+
+        results["calculate_price"][str(size)] = measure(
+            lambda: [DynamicPricingEngine.calculate_price(f, d) for f, d in zip(flights, demands)],
+            count, repeat
+        )
+        results["get_or_calculate_demand"][str(size)] = measure(
+            lambda: [DynamicPricingEngine.get_or_calculate_demand(f) for f in flights],
+            count, repeat
+        )
+
+        # generate_flights schedules 20 routes per day
+        days = max(1, size // 20)
+        results["generate_flights"][str(size)] = measure(
+            lambda: AirlineAPISimulator.generate_flights(days_ahead=days, seed=1),
+            days * 20, repeat
+        )
+
+        random.seed(size)
+        results["demand_simulator_tick"][str(size)] = measure(
+            DemandSimulator.tick, count, repeat
+        )
+
+    db.clear()
+    return results
+
+
+if __name__ == "__main__":
+    main("pricing", run, DEFAULT_SIZES)
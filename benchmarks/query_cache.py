@@ -0,0 +1,100 @@
+"""
+Query cache benchmarks for the SQL flight endpoints
+
+Drives GET /flights/{id} and POST /flights/search in-process (TestClient)
+with a skewed mix of popular flights and routes, plus 5% bookings that
+invalidate what they touch. The same request stream runs without the cache
+(an LRU of size 0), with the in-process backend and with the shared SQLite
+backend, against a temporary SQLite database seeded by database_config.
+
+    python -m benchmarks.query_cache run --sizes 5000 20000
+"""
+
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.common import main, percentiles
+
+DEFAULT_SIZES = [5_000, 20_000]
+AIRPORT_CODES = ["JFK", "LAX", "ORD", "ATL", "DFW", "SFO", "SEA", "MIA"]
+MODES = ("uncached", "memory", "sqlite")
+
+
+def _measure(sizes, directory: str) -> dict:
+    """Run every mode and size in one freshly imported app (in a spawned process)"""
+    os.environ["FLIGHT_DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'flights.db')}"
+    os.environ["FLIGHT_SEED_DAYS"] = "30"
+    os.environ["FLIGHT_SEED_ROUTES"] = "56"
+
+    from fastapi.testclient import TestClient
+
+    import database_config
+    from app.flight_database import Airline, Airport, SessionLocal
+    from app.query_cache import MemoryCacheBackend, SQLiteCacheBackend
+
+    with SessionLocal() as db:
+        db.add(Airline(airline_id=1, name="Cache Test Air"))
+        db.add_all(Airport(code=code, name=code) for code in AIRPORT_CODES)
+        db.commit()
+
+    backends = {
+        "uncached": lambda: MemoryCacheBackend(max_entries=0),
+        "memory": lambda: MemoryCacheBackend(),
+        "sqlite": lambda: SQLiteCacheBackend(os.path.join(directory, "query_cache.db")),
+    }
+    results = {f"query_cache_{mode}": {} for mode in MODES}
+
+    with TestClient(database_config.app) as client:
+        flights = client.get("/flights", params={"limit": 500}).json()
+        for size in sizes:
+            for mode in MODES:
+                print(f"\n📊 {size:,} requests, {mode}...")
+                database_config.query_cache.backend = backends[mode]()
+                database_config.query_cache.clear()
+                rng = random.Random(3)
+                samples = []
+                began = time.perf_counter()
+                for i in range(size):
+                    # Popular flights first: a few flights take most of the traffic
+                    flight = flights[min(int(rng.paretovariate(1.2)) - 1, len(flights) - 1)]
+                    roll = rng.random()
+                    started = time.perf_counter()
+                    if roll < 0.5:
+                        client.get(f"/flights/{flight['flight_id']}")
+                    elif roll < 0.95:
+                        client.post("/flights/search", json={
+                            "origin": flight["origin"], "destination": flight["destination"],
+                            "date": flight["departure_time"][:10]
+                        })
+                    else:
+                        client.post("/bookings", json={
+                            "flight_id": flight["flight_id"], "passenger_name": f"Cache {i}",
+                            "passenger_email": f"cache{mode}{size}{i}@example.com", "passenger_phone": "555"
+                        })
+                    samples.append(time.perf_counter() - started)
+                elapsed = time.perf_counter() - began
+
+                stats = database_config.query_cache.stats()
+                results[f"query_cache_{mode}"][str(size)] = {
+                    "seconds": round(elapsed, 6),
+                    "operations": size,
+                    "per_second": round(size / elapsed, 2),
+                    **percentiles(samples),
+                    "flight_hit_rate": stats.get("flight", {}).get("hit_rate", 0.0),
+                    "search_hit_rate": stats.get("search", {}).get("hit_rate", 0.0)
+                }
+    return results
+
+
+def run(sizes):
+    with tempfile.TemporaryDirectory(prefix="query-cache-") as directory:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            return pool.submit(_measure, sizes, directory).result()
+
+
+if __name__ == "__main__":
+    main("query_cache", run, DEFAULT_SIZES)
@@ -0,0 +1,74 @@
+"""
+Seat map benchmarks
+
+Fills flights seat by seat with rotating preferences, seats groups of four
+side by side, and measures the memory each flight's seat map holds once the
+shared cabin layouts are built.
+
+    python -m benchmarks.seat_map run --sizes 1000 10000
+"""
+
+import tracemalloc
+
+from app.seat_map import SeatMap, cabin_layout
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [1_000, 10_000]
+SEATS = 180
+PREFERENCES = ["window", "aisle", "middle", None]
+
+
+def make_maps(count: int) -> list:
+    layout = cabin_layout("economy", SEATS)
+    return [SeatMap(layout) for _ in range(count)]
+
+
+def bytes_per_flight(count: int) -> float:
+    """Memory held by `count` seat maps, per flight, with a third of the seats taken"""
+    cabin_layout("economy", SEATS)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    maps = make_maps(count)
+    for seat_map in maps:
+        for i in range(SEATS // 3):
+            seat_map.allocate(PREFERENCES[i % len(PREFERENCES)])
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+
+def run(sizes):
+    results = {
+        "allocate_seat": {},
+        "allocate_group_of_4": {},
+    }
+
+    for size in sizes:
+        print(f"\n📊 Filling {size:,} flights of {SEATS} seats...")
+        state = {}
+
+        def setup():
+            state["maps"] = make_maps(size)
+
+        def fill_singles():
+            for seat_map in state["maps"]:
+                for i in range(SEATS):
+                    seat_map.allocate(PREFERENCES[i % len(PREFERENCES)])
+
+        def fill_groups():
+            for seat_map in state["maps"]:
+                for _ in range(SEATS // 4):
+                    seat_map.allocate_group(4)
+
+        results["allocate_seat"][str(size)] = measure(fill_singles, size * SEATS, setup=setup)
+        results["allocate_group_of_4"][str(size)] = measure(fill_groups, size * (SEATS // 4), setup=setup)
+
+        per_flight = bytes_per_flight(size)
+        results["allocate_seat"][str(size)]["bytes_per_flight"] = round(per_flight, 1)
+        print(f"🧠 {per_flight:.0f} bytes per flight")
+
+    return results
+
+
+if __name__ == "__main__":
+    main("seat_map", run, DEFAULT_SIZES)
@@ -0,0 +1,99 @@
+"""
+Local SMTP stand-in for throughput tests
+
+A minimal threaded SMTP server that accepts any login and keeps received
+messages in memory. It speaks just enough of the protocol for smtplib
+(EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT) and counts
+connections so tests can check session reuse. Recipients added to
+`refused` are rejected at RCPT.
+
+    with LocalSMTPServer() as server:
+        pool = SMTPSessionPool(server.host, server.port, "user", "pass", starttls=False)
+"""
+
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self) -> None:
+        server = self.server.owner
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stand-in ready")
+        data = None
+
+        for raw in self.rfile:
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+
+            if data is not None:
+                if line == ".":
+                    with server.lock:
+                        server.messages.append("\r\n".join(data))
+                    data = None
+                    self.reply("250 OK")
+                else:
+                    data.append(line[1:] if line.startswith("..") else line)
+                continue
+
+            command = line[:4].upper()
+            if command == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif command == "HELO":
+                self.reply("250 localhost")
+            elif command == "AUTH":
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                data = []
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            elif command == "RCPT" and line.partition(":")[2].strip(" <>") in server.refused:
+                self.reply("550 No such user")
+            elif command in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """
+    In-process SMTP server bound to an ephemeral localhost port
+
+    Attributes:
+        messages: Raw message data received, in arrival order
+        connections: Number of client connections accepted
+        refused: Recipient addresses to reject
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.owner = self
+        self.host, self.port = self._server.server_address
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.refused = set()
+
+    def start(self) -> "LocalSMTPServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalSMTPServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
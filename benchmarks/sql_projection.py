@@ -0,0 +1,74 @@
+"""
+ORM vs Core projection benchmarks for the SQL read paths
+
+Reads `size` flights with their airline name and builds the response dicts
+two ways: the old path (Flight ORM objects plus strftime) and the
+projection used by database_config.py (flight_rows_statement() row tuples).
+Runs on a temporary SQLite file seeded by seed_flight_database.
+
+    python -m benchmarks.sql_projection run --sizes 1000 10000
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.flight_database import Airline, Airport, Base, Flight, flight_response, flight_rows_statement
+from app.inventory_generator import seed_flight_database
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [1_000, 10_000]
+AIRPORT_CODES = [f"A{i:02d}" for i in range(20)]
+
+
+def orm_rows(db: Session, size: int) -> list:
+    """The read path before projections: hydrate Flight objects, then copy fields"""
+    flights = db.query(Flight, Airline.name).join(Airline, Flight.airline_id == Airline.airline_id).limit(size).all()
+    return [
+        {
+            "flight_id": flight.flight_id,
+            "airline": airline_name,
+            "origin": flight.source_airport,
+            "destination": flight.destination_airport,
+            "departure_time": flight.departure_time.strftime("%Y-%m-%d %H:%M"),
+            "arrival_time": flight.arrival_time.strftime("%Y-%m-%d %H:%M"),
+            "duration": flight.duration,
+            "current_price": flight.current_price,
+            "base_fare": flight.base_fare,
+            "available_seats": flight.available_seats,
+            "total_seats": flight.total_seats,
+            "tier": flight.tier,
+            "demand_level": flight.demand_level
+        }
+        for flight, airline_name in flights
+    ]
+
+
+def projection_rows(db: Session, size: int) -> list:
+    return [flight_response(row) for row in db.execute(flight_rows_statement().limit(size))]
+
+
+def run(sizes):
+    results = {"flight_rows_orm": {}, "flight_rows_projection": {}}
+    with tempfile.TemporaryDirectory(prefix="sql-projection-") as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'flights.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(Airline.__table__.insert(), [{"airline_id": 1, "name": "Projection Air"}])
+            conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in AIRPORT_CODES])
+            seed_flight_database(conn, days=-(-max(sizes) // 380), routes=380, seed=9)
+
+        for size in sizes:
+            print(f"\n📊 {size:,} flight rows...")
+            for name, read in (("flight_rows_orm", orm_rows), ("flight_rows_projection", projection_rows)):
+                with Session(engine) as db:
+                    assert len(read(db, size)) == size
+                    results[name][str(size)] = measure(lambda: read(db, size), operations=size, repeat=5, setup=db.expunge_all)
+        engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    main("sql_projection", run, DEFAULT_SIZES)
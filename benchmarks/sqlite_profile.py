@@ -0,0 +1,97 @@
+"""
+Concurrent logins and registrations against the users database
+
+Compares the previous engine setup (rollback journal, default 5 + 10 pool)
+with the create_db_engine() profile (WAL, pragmas, pool sized for the
+threadpool). THREADS workers run the same queries as /auth/login and
+/auth/register: 80% look a user up by email, 20% check the email and insert
+a new user. Password hashing is left out; it costs the same in both setups
+and would hide the database difference.
+
+    python -m benchmarks.sqlite_profile run --sizes 2000 10000
+"""
+
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError, TimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from app.db_engine import create_db_engine
+from app.user_database import Base, User
+from benchmarks.common import main, percentiles
+
+DEFAULT_SIZES = [2_000, 10_000]
+THREADS = 40
+SEED_USERS = 1_000
+
+
+def _engines(path: str) -> dict:
+    url = f"sqlite:///{path}"
+    return {
+        "default": lambda: create_engine(url, connect_args={"check_same_thread": False}),
+        "tuned": lambda: create_db_engine(url),
+    }
+
+
+def _measure(make_engine, size: int) -> dict:
+    engine = make_engine()
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with SessionLocal() as db:
+        db.add_all(User(email=f"user{i}@example.com", first_name="Load", last_name="Test", password_hash="x") for i in range(SEED_USERS))
+        db.commit()
+
+    rng = random.Random(5)
+    plan = [rng.random() < 0.8 for _ in range(size)]
+
+    def request(i):
+        began = time.perf_counter()
+        db = SessionLocal()
+        try:
+            if plan[i]:
+                db.query(User).filter(User.email == f"user{rng.randrange(SEED_USERS)}@example.com").first()
+            else:
+                email = f"new{i}@example.com"
+                if db.query(User).filter(User.email == email).first() is None:
+                    db.add(User(email=email, first_name="New", last_name="User", password_hash="x"))
+                    db.commit()
+            return time.perf_counter() - began, False
+        except (OperationalError, TimeoutError):
+            db.rollback()
+            return time.perf_counter() - began, True
+        finally:
+            db.close()
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        outcomes = list(pool.map(request, range(size)))
+    elapsed = time.perf_counter() - began
+    engine.dispose()
+
+    return {
+        "seconds": round(elapsed, 6),
+        "operations": size,
+        "per_second": round(size / elapsed, 2),
+        **percentiles([latency for latency, _ in outcomes]),
+        "errors": sum(failed for _, failed in outcomes)
+    }
+
+
+def run(sizes):
+    results = {"users_db_default": {}, "users_db_tuned": {}}
+    for size in sizes:
+        for mode in ("default", "tuned"):
+            print(f"\n📊 {size:,} logins/registrations, {THREADS} threads, {mode} engine...")
+            with tempfile.TemporaryDirectory(prefix="sqlite-profile-") as directory:
+                make_engine = _engines(os.path.join(directory, "users.db"))[mode]
+                results[f"users_db_{mode}"][str(size)] = _measure(make_engine, size)
+    return results
+
+
+if __name__ == "__main__":
+    main("sqlite_profile", run, DEFAULT_SIZES)
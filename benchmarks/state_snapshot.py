@@ -0,0 +1,80 @@
+"""
+In-memory state snapshot benchmarks
+
+Fills a FlightDatabase with `size` flights (demand levels and two fare
+history entries each), matching flights_data entries and size / 10
+bookings, then times writing a snapshot and restoring it into empty state,
+as a restart would.
+
+    python -m benchmarks.state_snapshot run --sizes 10000 100000
+"""
+
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from app.database import FlightDatabase
+from app.models import Flight, PricingTier
+from app.snapshots import StateSnapshotter
+from app.state import BookingStore
+from benchmarks.common import main, measure
+
+DEFAULT_SIZES = [10_000, 100_000]
+AIRPORT_CODES = [f"A{i:02d}" for i in range(50)]
+
+
+def make_state(size: int):
+    rng = random.Random(7)
+    flight_db = FlightDatabase()
+    flights, flights_data = [], []
+    start = datetime(2030, 1, 1)
+    for i in range(size):
+        origin, destination = rng.sample(AIRPORT_CODES, 2)
+        departure = start + timedelta(minutes=rng.randrange(90 * 1440))
+        flight = Flight(
+            flight_id=f"FL{i:07d}", airline=f"Airline {i % 20}", origin=origin, destination=destination,
+            departure_time=departure, arrival_time=departure + timedelta(hours=3),
+            base_fare=100.0 + i % 300, total_seats=200, available_seats=rng.randint(0, 200),
+            tier=rng.choice(list(PricingTier))
+        )
+        flights.append(flight)
+        flights_data.append({
+            **flight.model_dump(mode="json"), "airline_code": f"L{i % 20:02d}", "origin_city": origin,
+            "destination_city": destination, "duration": "3h 0m",
+            "current_price": flight.base_fare * 1.2, "demand_level": "medium"
+        })
+    flight_db.add_flights(flights)
+    for flight in flights:
+        for minutes in (0, 60):
+            flight_db.fare_history[flight.flight_id].append({
+                "timestamp": (start + timedelta(minutes=minutes)).isoformat(),
+                "price": flight.base_fare, "available_seats": flight.available_seats, "demand_level": "medium"
+            })
+    bookings = BookingStore(
+        {
+            "booking_id": f"B{i:08d}", "flight_id": f"FL{i * 10:07d}", "passenger_name": f"Passenger {i}",
+            "total_amount": 199.0, "booking_status": "confirmed", "payment": {"card_number": "4111111111111111"}
+        }
+        for i in range(size // 10)
+    )
+    return flight_db, flights_data, bookings
+
+
+def run(sizes):
+    results = {"state_snapshot_write": {}, "state_snapshot_restore": {}}
+    for size in sizes:
+        print(f"\n📊 Snapshotting {size:,} flights...")
+        with tempfile.TemporaryDirectory(prefix="state-snapshot-") as directory:
+            snapshotter = StateSnapshotter(directory, *make_state(size), keep=1)
+            results["state_snapshot_write"][str(size)] = measure(snapshotter.snapshot, operations=size)
+            print(f"   {os.path.getsize(snapshotter.latest()) / 1e6:.1f} MB")
+
+            restored = StateSnapshotter(directory, FlightDatabase(), [], BookingStore())
+            results["state_snapshot_restore"][str(size)] = measure(restored.restore, operations=size)
+            assert len(restored.flight_db.flights) == size
+    return results
+
+
+if __name__ == "__main__":
+    main("state_snapshot", run, DEFAULT_SIZES)
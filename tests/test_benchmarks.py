@@ -0,0 +1,26 @@
+"""
+Tests for benchmark result comparison
+"""
+
+from benchmarks.common import compare_results, measure
+
+
+def make_results(per_second: float) -> dict:
+    """Helper to build a results document"""
+    return {"results": {"calculate_price": {"1000": {"per_second": per_second}}}}
+
+
+def test_measure_reports_throughput():
+    """Test that measure reports a positive rate"""
+    result = measure(lambda: sum(range(1000)), operations=1000, repeat=2)
+    assert result["operations"] == 1000
+    assert result["per_second"] > 0
+
+
+def test_compare_flags_regressions():
+    """Test that drops beyond the threshold are flagged"""
+    baseline = make_results(1000.0)
+
+    assert not compare_results(make_results(950.0), baseline, threshold=0.1)[0]["regression"]
+    assert compare_results(make_results(850.0), baseline, threshold=0.1)[0]["regression"]
+    assert compare_results({"results": {"other": {"1": {"per_second": 1}}}}, baseline, 0.1) == []
@@ -0,0 +1,71 @@
+"""
+Tests for booking PDF rendering
+"""
+
+import os
+import tempfile
+
+from reportlab import rl_config
+
+import app.booking_pdf as booking_pdf
+from app.booking_pdf import render_booking_pdf, render_booking_pdfs, shutdown_render_pool
+from benchmarks.booking_pdf import make_booking
+
+
+def test_renders_pdf_in_memory_without_temp_files(tmp_path, monkeypatch):
+    """Test that rendering returns PDF bytes and writes nothing to disk"""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    pdf = render_booking_pdf(make_booking(1))
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert os.listdir(tmp_path) == []
+
+
+def test_each_render_has_its_own_values(monkeypatch):
+    """Test that the cached chrome does not carry values between bookings"""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    monkeypatch.setattr(rl_config, "pageCompression", 0)
+
+    first = render_booking_pdf(make_booking(1))
+    second = render_booking_pdf(make_booking(2))
+    assert b"Ada Lovelace1" in first
+    assert b"Lovelace2" in second and b"Lovelace1" not in second
+    assert b"Booking Information" in first and b"Booking Information" in second
+    assert render_booking_pdf(make_booking(1)) == first
+
+
+def test_cached_chrome_matches_drawing_it(monkeypatch):
+    """Test that replaying the cached chrome gives byte-identical PDFs to drawing it"""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    for compression in (0, 1):
+        monkeypatch.setattr(rl_config, "pageCompression", compression)
+        for i in range(3):
+            booking = make_booking(i)
+            assert render_booking_pdf(booking) == render_booking_pdf(booking, cached_chrome=False)
+
+
+def test_missing_canvas_internals_fall_back_to_drawing(monkeypatch):
+    """Test that a ReportLab without the replayed internals still renders the same PDF"""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    expected = render_booking_pdf(make_booking(1), cached_chrome=False)
+
+    def missing():
+        raise AttributeError("_code")
+
+    monkeypatch.setattr(booking_pdf, "_chrome", missing)
+    assert render_booking_pdf(make_booking(1)) == expected
+
+
+def test_process_pool_renders_batches(monkeypatch):
+    """Test that batches rendered in the process pool match in-process renders"""
+    monkeypatch.setattr(booking_pdf, "PDF_RENDER_WORKERS", 2)
+    bookings = [make_booking(i) for i in range(4)]
+    try:
+        pdfs = render_booking_pdfs(bookings)
+    finally:
+        shutdown_render_pool()
+
+    assert len(pdfs) == 4
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    assert [len(pdf) for pdf in pdfs] == [len(render_booking_pdf(b)) for b in bookings]
@@ -0,0 +1,104 @@
+"""
+Tests for bookings through the SQL API (database_config.py)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.db_engine import create_db_engine
+from app.flight_database import Airline, Airport, Base, Booking, Flight, Passenger, apply_migrations
+from app.flight_stats import aggregate_stats, read_stats
+from database_config import BookingRequest, get_or_create_passenger, insert_booking
+
+
+def make_engine(tmp_path, total_seats=40):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'bookings.db'}", pool_size=16, max_overflow=0)
+    Base.metadata.create_all(engine)
+    apply_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(Airline.__table__.insert(), [{"airline_id": 1, "name": "Test Air"}])
+        conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in ("JFK", "LAX")])
+        conn.execute(Flight.__table__.insert(), [{
+            "flight_id": "FL0001", "airline_id": 1, "source_airport": "JFK", "destination_airport": "LAX",
+            "departure_time": datetime(2030, 1, 1, 9), "arrival_time": datetime(2030, 1, 1, 15),
+            "base_fare": 100, "current_price": 120, "total_seats": total_seats,
+            "available_seats": total_seats, "tier": "economy"
+        }])
+    return engine
+
+
+def book(engine, i: int, preference=None) -> dict:
+    request = BookingRequest(
+        flight_id="FL0001", passenger_name=f"Passenger {i}", passenger_email=f"p{i % 5}@example.com",
+        passenger_phone="555", seat_preference=preference
+    )
+    with Session(engine) as db:
+        result, _ = insert_booking(db, request, f"BK{i:04d}")
+    return result
+
+
+def test_concurrent_bookings_get_distinct_seats(tmp_path):
+    """Test that concurrent bookings of one flight each take a different seat and one seat count"""
+    engine = make_engine(tmp_path)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: book(engine, i), range(40)))
+
+    assert len({result["seat_no"] for result in results}) == 40
+    with pytest.raises(HTTPException) as sold_out:
+        book(engine, 40)
+    assert sold_out.value.status_code == 400
+
+    with Session(engine) as db:
+        assert db.get(Flight, "FL0001").available_seats == 0
+        assert db.scalar(select(func.count()).select_from(Booking)) == 40
+        assert db.scalar(select(func.count()).select_from(Passenger)) == 5
+
+
+def test_stats_match_flights_after_concurrent_bookings(tmp_path):
+    """Test that the /stats counters and the flights table agree after racing bookings"""
+    engine = make_engine(tmp_path)
+    with engine.begin() as conn:
+        read_stats(conn)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: book(engine, i), range(30)))
+
+    with engine.begin() as conn:
+        stats = read_stats(conn)
+        assert stats == aggregate_stats(conn)
+    assert stats["available_seats"] == 10 and stats["total_bookings"] == 30
+
+
+def test_seat_preference_and_stored_map(tmp_path):
+    """Test that preferences are honored and later bookings continue from the stored seat map"""
+    engine = make_engine(tmp_path)
+    assert book(engine, 0, "aisle")["seat_no"] == "1C"
+    assert book(engine, 1, "window")["seat_no"] == "1A"
+    assert book(engine, 2)["seat_no"] == "1B"
+
+
+def test_passenger_created_concurrently_is_reused(tmp_path):
+    """Test that losing the race to insert a new passenger's email picks up the other row"""
+    engine = make_engine(tmp_path)
+    request = BookingRequest(
+        flight_id="FL0001", passenger_name="Ada", passenger_email="ada@example.com", passenger_phone="555"
+    )
+
+    with Session(engine) as db:
+        @event.listens_for(db, "before_flush", once=True)
+        def other_request_inserts_first(session, flush_context, instances):
+            with engine.begin() as conn:
+                conn.execute(Passenger.__table__.insert(), [{"name": "Ada", "email": "ada@example.com"}])
+
+        passenger = get_or_create_passenger(db, request)
+        assert passenger.passenger_id is not None
+        db.commit()
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Passenger)) == 1
@@ -0,0 +1,39 @@
+"""
+Tests for the SQL engine factory
+"""
+
+from sqlalchemy import text
+
+from app.db_engine import SAMPLE_DATABASE_PRAGMAS, create_db_engine
+
+
+def test_sqlite_engine_applies_production_profile(tmp_path):
+    """Test that every connection gets WAL and the configured pragmas, with a threadpool-sized pool"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'users.db'}", pool_size=4, max_overflow=6)
+    with engine.connect() as conn:
+        pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 5000
+        assert pragma("cache_size") == -64 * 1024
+    assert engine.pool.size() == 4
+    assert engine.pool._max_overflow == 6
+
+
+def test_sqlite_engine_profile_can_be_disabled():
+    """Test that in-memory databases work and pragmas can be skipped"""
+    engine = create_db_engine("sqlite://", pragmas={})
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+
+
+def test_sample_databases_keep_their_journal(tmp_path):
+    """Test that the committed sample databases are not switched to WAL, which rewrites their header"""
+    path = tmp_path / "sample.db"
+    engine = create_db_engine(f"sqlite:///{path}", pragmas=SAMPLE_DATABASE_PRAGMAS)
+    with engine.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        conn.execute(text("CREATE TABLE t (x)"))
+    engine.dispose()
+    assert path.read_bytes()[18:20] == b"\x01\x01"
@@ -0,0 +1,101 @@
+"""
+Tests for the on-disk fare history log
+"""
+
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from app.database import FlightDatabase
+from app.fare_log import FareHistoryLog
+
+
+def make_entry(minutes: int, price: float, seats: int = 100, demand: str = "medium") -> dict:
+    """Helper to build a fare history entry"""
+    return {
+        "timestamp": (datetime(2030, 1, 1) + timedelta(minutes=minutes)).isoformat(),
+        "price": price,
+        "available_seats": seats,
+        "demand_level": demand
+    }
+
+
+@pytest.fixture
+def log(tmp_path):
+    fare_log = FareHistoryLog(str(tmp_path), flush_interval=60, compact_threshold=100)
+    yield fare_log
+    fare_log.close()
+
+
+def test_history_survives_reopen(tmp_path, log):
+    """Test that flushed entries are reloaded by a new log instance"""
+    entries = [make_entry(i, 199.99 + i, 100 - i, "high") for i in range(5)]
+    for entry in entries:
+        log.append("FL0001", entry)
+    log.append("FL0002", make_entry(0, 50.0))
+    log.close()
+
+    reopened = FareHistoryLog(str(tmp_path), flush_interval=60)
+    try:
+        assert reopened.load("FL0001") == entries
+        assert len(reopened.load("FL0002")) == 1
+        assert reopened.load("FL9999") == []
+    finally:
+        reopened.close()
+
+
+def test_buffered_entries_are_visible(log):
+    """Test that unflushed entries are included in loads"""
+    log.append("FL0001", make_entry(0, 120.0))
+    assert log.load("FL0001") == [make_entry(0, 120.0)]
+
+
+def test_compaction_preserves_order(tmp_path, log):
+    """Test that compaction merges segments into one sorted file"""
+    expected = {"FL0001": [], "FL0002": []}
+    for batch in range(4):
+        for flight_id in expected:
+            entry = make_entry(batch, 100.0 + batch, demand="very_high")
+            log.append(flight_id, entry)
+            expected[flight_id].append(entry)
+        log.flush()
+
+    log.compact()
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["compacted-00000004.fhl"]
+
+    log.append("FL0001", make_entry(10, 300.0))
+    log.flush()
+    log.compact()
+    assert log.load("FL0001") == expected["FL0001"] + [make_entry(10, 300.0)]
+    assert log.load("FL0002") == expected["FL0002"]
+
+
+def test_background_compaction_triggers(tmp_path):
+    """Test that reaching the segment threshold compacts automatically"""
+    fare_log = FareHistoryLog(str(tmp_path), flush_interval=60, compact_threshold=3)
+    for i in range(3):
+        fare_log.append("FL0001", make_entry(i, 100.0))
+        fare_log.flush()
+    fare_log.close()
+
+    assert [f for f in os.listdir(tmp_path) if f.startswith("segment-")] == []
+    reopened = FareHistoryLog(str(tmp_path), flush_interval=60)
+    try:
+        assert len(reopened.load("FL0001")) == 3
+    finally:
+        reopened.close()
+
+
+def test_flight_database_restores_history(tmp_path):
+    """Test that FlightDatabase reloads fare history after a restart"""
+    database = FlightDatabase(fare_log=FareHistoryLog(str(tmp_path), flush_interval=60))
+    database.add_fare_history("FL0001", make_entry(0, 150.0))
+    database.fare_log.close()
+
+    restarted = FlightDatabase(fare_log=FareHistoryLog(str(tmp_path), flush_interval=60))
+    restarted.add_fare_history("FL0001", make_entry(5, 175.0))
+    try:
+        assert [e["price"] for e in restarted.get_fare_history("FL0001")] == [150.0, 175.0]
+    finally:
+        restarted.fare_log.close()
@@ -0,0 +1,120 @@
+"""
+Tests for bulk cancellation of a disrupted flight
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.inventory import inventory
+from app.state import BookingStore, flights_data, bookings_data
+
+client = TestClient(app)
+
+
+def make_booking(i: int, flight_id: str) -> dict:
+    """Helper to build a stored booking record"""
+    return {
+        "booking_id": f"{flight_id}-{i:04d}", "flight_id": flight_id, "booking_status": "confirmed",
+        "passenger": {"first_name": f"Passenger{i}", "last_name": "Smith", "email": f"p{i}@example.com"},
+        "total_amount": 150.0, "seat_no": None, "origin": "JFK", "destination": "LAX",
+        "departure_time": "2030-01-01 10:00"
+    }
+
+
+@pytest.fixture
+def disrupted(monkeypatch):
+    """Seed a full 300-seat flight plus one booking on another flight"""
+    queued = []
+    monkeypatch.setattr(main, "ADMIN_API_KEY", "secret")
+    monkeypatch.setattr(main.notification_queue, "enqueue_many", lambda kind, payloads: queued.append((kind, payloads)))
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    for flight_id, seats in (("DX0001", 0), ("DX0002", 299)):
+        flights_data.append({
+            "flight_id": flight_id, "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+            "departure_time": "2030-01-01 10:00", "current_price": 150.0, "available_seats": seats,
+            "total_seats": 300, "tier": "economy"
+        })
+    bookings_data.extend(make_booking(i, "DX0001") for i in range(300))
+    bookings_data.append(make_booking(0, "DX0002"))
+    yield queued
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+
+
+def test_cancel_flight_releases_refunds_and_notifies_in_bulk(disrupted):
+    """Test that every booking on the flight is cancelled with one batch of emails"""
+    start = time.perf_counter()
+    response = client.post("/admin/flights/DX0001/cancel", headers={"X-Admin-Key": "secret"})
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["cancelled_bookings"] == 300
+    assert data["total_refund"] == 45000.0
+    assert flights_data[0]["available_seats"] == 300
+    assert [b["booking_id"] for b in bookings_data] == ["DX0002-0000"]
+    assert bookings_data.for_flight("DX0001") == []
+    assert len(disrupted) == 1
+    assert disrupted[0][0] == "booking_cancellation" and len(disrupted[0][1]) == 300
+    assert elapsed < 1.0
+
+    # Nothing left to cancel the second time
+    assert client.post("/admin/flights/DX0001/cancel", headers={"X-Admin-Key": "secret"}).json()["cancelled_bookings"] == 0
+
+
+def test_cancel_flight_requires_admin_key(disrupted, monkeypatch):
+    """Test that the admin endpoint rejects missing or wrong keys and is off when unset"""
+    assert client.post("/admin/flights/DX0001/cancel").status_code == 403
+    assert client.post("/admin/flights/DX0001/cancel", headers={"X-Admin-Key": "wrong"}).status_code == 403
+    monkeypatch.setattr(main, "ADMIN_API_KEY", None)
+    assert client.post("/admin/flights/DX0001/cancel", headers={"X-Admin-Key": "secret"}).status_code == 403
+    assert len(bookings_data) == 301
+
+
+def test_booking_store_keeps_indexes_in_step():
+    """Test that list mutations are reflected in the id and flight indexes"""
+    store = BookingStore([make_booking(i, "A") for i in range(3)])
+    store.append(make_booking(0, "B"))
+    store.remove(store.get("A-0001"))
+    assert [b["booking_id"] for b in store.for_flight("A")] == ["A-0000", "A-0002"]
+
+    store[:] = [b for b in store if b["flight_id"] == "B"]
+    assert store.get("A-0000") is None and store.for_flight("A") == []
+    assert store.get("B-0000") is store[0]
+
+    store.clear()
+    assert store.get("B-0000") is None and len(store) == 0
+
+
+def test_booking_store_concurrent_appends_and_bulk_removes():
+    """Test that appends racing with remove_many are never lost from the list"""
+    store = BookingStore()
+
+    def append(worker: int) -> None:
+        for i in range(2_000):
+            store.append(make_booking(i, f"W{worker}"))
+
+    def remove() -> None:
+        for i in range(200):
+            store.remove_many([f"W0-{j:04d}" for j in range(i * 10, i * 10 + 10)])
+
+    threads = [threading.Thread(target=append, args=(w,)) for w in range(3)] + [threading.Thread(target=remove)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    listed = {b["booking_id"] for b in store}
+    assert len(listed) == len(store)
+    assert all(store.get(booking_id) is not None for booking_id in listed)
+    assert sum(len(store.for_flight(f"W{w}")) for w in range(3)) == len(store)
+    assert len(store.for_flight("W1")) == 2_000
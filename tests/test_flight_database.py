@@ -0,0 +1,135 @@
+"""
+Tests for the SQL flight database schema and migrations
+"""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.flight_database import (
+    Airline, Airport, Base, Booking, Flight, apply_migrations, async_database_url, flight_response, flight_rows_statement,
+    search_flights_query, search_flights_statement
+)
+
+
+def test_migration_adds_search_and_foreign_key_indexes(tmp_path):
+    """Test that a database created without indexes gets them from the migration, idempotently"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for name in ("ix_flights_route_departure", "ix_flights_airline_id", "ix_bookings_flight_id"):
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    apply_migrations(engine)
+    apply_migrations(engine)
+
+    flight_indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("flights")}
+    booking_indexes = {ix["name"] for ix in inspect(engine).get_indexes("bookings")}
+    assert flight_indexes["ix_flights_route_departure"] == ["source_airport", "destination_airport", "departure_time"]
+    assert "ix_flights_airline_id" in flight_indexes
+    assert {"ix_bookings_flight_id", "ix_bookings_passenger_id"} <= booking_indexes
+
+
+def test_search_query_uses_route_index(tmp_path):
+    """Test that the search query filters by route and day through the composite index"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([Airline(airline_id=1, name="Test Air"), Airport(code="JFK", name="JFK"), Airport(code="LAX", name="LAX")])
+        for i, departure in enumerate([datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 23, 59), datetime(2030, 1, 2, 0)]):
+            db.add(Flight(
+                flight_id=f"FL{i}", airline_id=1, source_airport="JFK", destination_airport="LAX",
+                departure_time=departure, arrival_time=departure, base_fare=100, current_price=100,
+                total_seats=200, available_seats=200, tier="economy"
+            ))
+        db.commit()
+
+        query = search_flights_query(db, "JFK", "LAX", date(2030, 1, 1))
+        assert sorted(flight.flight_id for flight, _ in query.all()) == ["FL0", "FL1"]
+
+        compiled = query.statement.compile(engine)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        with engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params))
+    assert "USING INDEX ix_flights_route_departure" in plan
+
+
+def test_async_search_matches_sync(tmp_path):
+    """Test that the search statement returns the same flights through the async driver"""
+    pytest.importorskip("aiosqlite")
+    url = f"sqlite:///{tmp_path / 'flights.db'}"
+    assert async_database_url(url).startswith("sqlite+aiosqlite://")
+    assert async_database_url("postgresql://u:p@db/flights") == "postgresql+asyncpg://u:p@db/flights"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([Airline(airline_id=1, name="Test Air"), Airport(code="JFK", name="JFK"), Airport(code="LAX", name="LAX")])
+        db.add(Flight(
+            flight_id="FL0", airline_id=1, source_airport="JFK", destination_airport="LAX",
+            departure_time=datetime(2030, 1, 1, 9), arrival_time=datetime(2030, 1, 1, 15), base_fare=100,
+            current_price=100, total_seats=200, available_seats=200, tier="economy"
+        ))
+        db.commit()
+
+    async def search():
+        async_engine = create_async_engine(async_database_url(url))
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(search_flights_statement("JFK", "LAX", date(2030, 1, 1)))).all()
+        await async_engine.dispose()
+        return [(row.flight_id, row.name) for row in rows]
+
+    assert asyncio.run(search()) == [("FL0", "Test Air")]
+
+
+def test_projection_rows_match_orm_fields(tmp_path):
+    """Test that the Core projection builds the same response as the mapped Flight object"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([Airline(airline_id=1, name="Test Air"), Airport(code="JFK", name="JFK"), Airport(code="LAX", name="LAX")])
+        db.add(Flight(
+            flight_id="FL0", airline_id=1, source_airport="JFK", destination_airport="LAX",
+            departure_time=datetime(2030, 1, 1, 9, 5, 30), arrival_time=datetime(2030, 1, 1, 15, 40),
+            duration="6h 34m", base_fare=100, current_price=120.5, total_seats=200, available_seats=150,
+            tier="economy", demand_level="medium"
+        ))
+        db.commit()
+
+        flight = db.get(Flight, "FL0")
+        row = db.execute(flight_rows_statement()).one()
+        assert flight_response(row) == {
+            "flight_id": "FL0", "airline": "Test Air", "origin": "JFK", "destination": "LAX",
+            "departure_time": flight.departure_time.strftime("%Y-%m-%d %H:%M"),
+            "arrival_time": flight.arrival_time.strftime("%Y-%m-%d %H:%M"),
+            "duration": "6h 34m", "current_price": 120.5, "base_fare": 100, "available_seats": 150,
+            "total_seats": 200, "tier": "economy", "demand_level": "medium"
+        }
+
+
+def test_migration_clears_duplicate_seats_before_unique_index(tmp_path):
+    """Test that seats double-booked by older versions are cleared so the unique seat index can be built"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ux_bookings_flight_seat"))
+        conn.execute(Booking.__table__.insert(), [
+            {"booking_id": booking_id, "flight_id": "FL0", "passenger_id": 1, "seat_no": "1A", "status": status}
+            for booking_id, status in (("BK1", "Confirmed"), ("BK2", "Confirmed"), ("BK3", "Cancelled"))
+        ])
+
+    apply_migrations(engine)
+    apply_migrations(engine)
+
+    with engine.begin() as conn:
+        seats = dict(conn.execute(select(Booking.booking_id, Booking.seat_no)).all())
+        assert seats == {"BK1": "1A", "BK2": None, "BK3": "1A"}
+        with pytest.raises(IntegrityError):
+            conn.execute(Booking.__table__.insert(), [
+                {"booking_id": "BK4", "flight_id": "FL0", "passenger_id": 1, "seat_no": "1A", "status": "Confirmed"}
+            ])
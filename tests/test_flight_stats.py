@@ -0,0 +1,53 @@
+"""
+Tests for the SQL /stats summary table
+"""
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from app.flight_database import Airline, Airport, Base, Booking, Flight
+from app.flight_stats import adjust_stats, aggregate_stats, read_stats
+from app.inventory_generator import seed_flight_database
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Airline.__table__.insert(), [{"airline_id": 1, "name": "Test Air"}])
+        conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in ("JFK", "LAX", "ORD")])
+    return engine
+
+
+def test_read_builds_summary_from_one_aggregate(tmp_path):
+    """Test that a missing summary row is rebuilt from the tables and then read back"""
+    engine = make_engine(tmp_path)
+    with engine.begin() as conn:
+        seed_flight_database(conn, days=2, routes=5, seed=3)
+        expected = aggregate_stats(conn)
+        assert read_stats(conn) == expected
+        assert read_stats(conn) == expected
+    assert expected["total_flights"] == 10 and expected["airports"] == 3 and expected["airlines"] == 1
+    assert expected["total_seats"] >= expected["available_seats"] > 0
+
+
+def test_seeding_and_bookings_keep_summary_in_step(tmp_path):
+    """Test that incremental adjustments match a full recount"""
+    engine = make_engine(tmp_path)
+    with engine.begin() as conn:
+        read_stats(conn)
+        seed_flight_database(conn, days=3, routes=4, seed=1)
+        seed_flight_database(conn, days=1, routes=4, seed=2, start_id=100)
+
+    with Session(engine) as db:
+        flight = db.query(Flight).first()
+        db.add(Booking(booking_id="BK0001", flight_id=flight.flight_id, passenger_id=1))
+        db.execute(
+            update(Flight).where(Flight.flight_id == flight.flight_id).values(available_seats=Flight.available_seats - 1)
+        )
+        adjust_stats(db, total_bookings=1, available_seats=-1)
+        db.commit()
+
+    with engine.begin() as conn:
+        assert read_stats(conn) == aggregate_stats(conn)
+        assert read_stats(conn)["total_bookings"] == 1
@@ -0,0 +1,85 @@
+"""
+Tests for group bookings
+"""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.inventory import inventory
+from app.state import flights_data, bookings_data
+
+client = TestClient(app)
+
+
+def group_payload(passengers: int, flight_id: str = "GB0001") -> dict:
+    """Helper to build a group booking request body"""
+    return {
+        "flight_id": flight_id,
+        "passengers": [
+            {"first_name": f"Passenger{i}", "last_name": "Smith", "email": f"p{i}@example.com", "phone": "555"}
+            for i in range(passengers)
+        ],
+        "payment": {
+            "card_number": "4111111111111111", "card_holder_name": "Pat Smith",
+            "expiry_month": 12, "expiry_year": datetime.now().year + 2,
+            "cvv": "123", "billing_address": "1 Main St"
+        }
+    }
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Seed a flight with four seats and capture queued notifications"""
+    jobs = []
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: jobs.append((kind, payload)))
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    year = datetime.now().year + 1
+    flights_data.append({
+        "flight_id": "GB0001", "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 120.0, "base_fare": 100.0, "available_seats": 4,
+        "total_seats": 150, "tier": "economy", "demand_level": "medium"
+    })
+    yield jobs
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+
+
+def test_group_booking_books_everyone_with_one_notification(queued):
+    """Test that a group gets one booking per passenger and one email"""
+    response = client.post("/flights/book/group", json=group_payload(3))
+    assert response.status_code == 200
+
+    data = response.json()
+    assert len(data["bookings"]) == 3
+    assert data["total_amount"] == 360.0
+    assert flights_data[0]["available_seats"] == 1
+    assert {b["group_id"] for b in bookings_data} == {data["group_id"]}
+
+    assert len(queued) == 1
+    kind, payload = queued[0]
+    assert kind == "group_booking_confirmation"
+    assert payload["email"] == "p0@example.com"
+    assert len(payload["bookings"]) == 3
+    assert all("payment" not in b for b in payload["bookings"])
+
+
+def test_group_booking_is_all_or_nothing(queued):
+    """Test that a group larger than the remaining seats books nobody"""
+    response = client.post("/flights/book/group", json=group_payload(5))
+    assert response.status_code == 400
+    assert flights_data[0]["available_seats"] == 4
+    assert bookings_data == []
+    assert queued == []
+
+
+def test_group_size_is_validated(queued):
+    """Test empty and oversized groups are rejected"""
+    assert client.post("/flights/book/group", json=group_payload(0)).status_code == 422
+    assert client.post("/flights/book/group", json=group_payload(main.MAX_GROUP_SIZE + 1)).status_code == 422
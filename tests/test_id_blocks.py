@@ -0,0 +1,39 @@
+"""
+Tests for block-allocated booking ids
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+
+from app.flight_database import Base, Booking
+from app.id_blocks import BlockIdAllocator
+
+
+def test_workers_never_hand_out_the_same_id(tmp_path):
+    """Test that allocators sharing a database draw disjoint blocks under concurrency"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ids.db'}")
+    Base.metadata.create_all(engine)
+    workers = [BlockIdAllocator(engine, "booking", prefix="BK", block_size=50) for _ in range(3)]
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        ids = list(pool.map(lambda i: workers[i % 3].next_id(), range(3000)))
+
+    assert len(set(ids)) == 3000
+    # One round trip per block, not per id
+    assert sum(worker.blocks_reserved for worker in workers) <= 3000 // 50 + 3
+
+
+def test_new_sequence_continues_after_existing_ids(tmp_path):
+    """Test that the first block starts past the highest numeric id already stored"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ids.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Booking.__table__.insert(), [
+            {"booking_id": booking_id, "flight_id": "FL0001", "passenger_id": 1}
+            for booking_id in ("BK0009", "BK10000", "LEGACY-1")
+        ])
+
+    allocator = BlockIdAllocator(engine, "booking", prefix="BK", block_size=2, seed_column=Booking.booking_id)
+    assert [allocator.next_id() for _ in range(3)] == ["BK10001", "BK10002", "BK10003"]
+    assert BlockIdAllocator(engine, "booking", prefix="BK", block_size=2).next_id() == "BK10005"
@@ -0,0 +1,115 @@
+"""
+Tests for idempotent booking and cancellation
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.idempotency import IdempotencyStore, idempotency_store
+from app.inventory import inventory
+from app.state import flights_data, bookings_data
+
+client = TestClient(app)
+
+
+def booking_payload(email: str = "ada@example.com") -> dict:
+    """Helper to build a booking request body"""
+    return {
+        "flight_id": "ID0001",
+        "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": email, "phone": "555"},
+        "payment": {
+            "card_number": "4111111111111111", "card_holder_name": "Ada Lovelace",
+            "expiry_month": 12, "expiry_year": datetime.now().year + 2,
+            "cvv": "123", "billing_address": "1 Main St"
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def queued(monkeypatch):
+    """Seed one flight and capture queued notifications"""
+    jobs = []
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: jobs.append(kind))
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    idempotency_store.clear()
+    year = datetime.now().year + 1
+    flights_data.append({
+        "flight_id": "ID0001", "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 250.0, "base_fare": 200.0, "available_seats": 10,
+        "total_seats": 150, "tier": "economy", "demand_level": "medium"
+    })
+    yield jobs
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    idempotency_store.clear()
+
+
+def test_retried_booking_returns_original_result(queued):
+    """Test that a retry with the same key books only once"""
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/flights/book", json=booking_payload(), headers=headers)
+    second = client.post("/flights/book", json=booking_payload(), headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert flights_data[0]["available_seats"] == 9
+    assert len(bookings_data) == 1
+    assert queued == ["booking_confirmation"]
+
+
+def test_key_reuse_with_different_body_is_rejected():
+    """Test that a key cannot be replayed for another request"""
+    headers = {"Idempotency-Key": "retry-2"}
+    assert client.post("/flights/book", json=booking_payload(), headers=headers).status_code == 200
+    response = client.post("/flights/book", json=booking_payload("other@example.com"), headers=headers)
+    assert response.status_code == 422
+
+
+def test_concurrent_retries_book_once(queued):
+    """Test that retries racing the original request wait for its result"""
+    headers = {"Idempotency-Key": "retry-3"}
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        responses = list(pool.map(
+            lambda _: client.post("/flights/book", json=booking_payload(), headers=headers), range(10)
+        ))
+
+    assert {r.json()["booking_id"] for r in responses} == {bookings_data[0]["booking_id"]}
+    assert flights_data[0]["available_seats"] == 9
+    assert len(queued) == 1
+
+
+def test_retried_cancellation_returns_original_result(queued):
+    """Test that a repeated cancellation replays instead of returning 404"""
+    booking_id = client.post("/flights/book", json=booking_payload()).json()["booking_id"]
+    headers = {"Idempotency-Key": "cancel-1"}
+
+    first = client.delete(f"/bookings/{booking_id}", headers=headers)
+    second = client.delete(f"/bookings/{booking_id}", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert flights_data[0]["available_seats"] == 10
+    assert queued.count("booking_cancellation") == 1
+
+
+def test_store_is_bounded_and_skips_server_errors():
+    """Test the size bound and that 5xx outcomes are not replayed"""
+    store = IdempotencyStore(max_size=3)
+    for i in range(10):
+        store.execute("book", f"key-{i}", "fp", lambda: i)
+    assert len(store) == 3
+
+    def fail():
+        raise HTTPException(status_code=500, detail="boom")
+
+    with pytest.raises(HTTPException):
+        store.execute("book", "flaky", "fp", fail)
+    assert store.execute("book", "flaky", "fp", lambda: "ok") == "ok"
@@ -0,0 +1,177 @@
+"""
+Tests for concurrent seat inventory
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.inventory import FLIGHT_DB, SeatInventory, SoldOutError, StaleInventoryError, inventory
+from app.models import Flight, PricingTier
+from app.state import flights_data, bookings_data
+
+client = TestClient(app)
+
+
+def make_flight(flight_id: str, seats: int) -> dict:
+    """Helper to build a flights_data record"""
+    year = datetime.now().year + 1
+    return {
+        "flight_id": flight_id, "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 250.0, "base_fare": 200.0,
+        "available_seats": seats, "total_seats": seats, "tier": "economy", "demand_level": "medium"
+    }
+
+
+def test_parallel_reservations_never_oversell():
+    """Test that hundreds of threads racing for seats sell exactly the capacity"""
+    seats = SeatInventory(stripes=8)
+    flights = [make_flight(f"ST{i:03d}", 25) for i in range(20)]
+    sold = []
+    barrier = threading.Barrier(400)
+
+    def book(i):
+        flight = flights[i % len(flights)]
+        barrier.wait()
+        for _ in range(5):
+            try:
+                seats.reserve(flight)
+                sold.append(flight["flight_id"])
+            except SoldOutError:
+                pass
+
+    with ThreadPoolExecutor(max_workers=400) as pool:
+        list(pool.map(book, range(400)))
+
+    assert len(sold) == 20 * 25
+    assert all(f["available_seats"] == 0 for f in flights)
+    assert all(seats.version(f["flight_id"]) == 25 for f in flights)
+
+
+def test_release_is_capped_and_versions_compare():
+    """Test capacity capping and compare-and-swap reservations"""
+    seats = SeatInventory()
+    flight = make_flight("ST900", 2)
+
+    seats.release(flight)
+    assert flight["available_seats"] == 2
+
+    version = seats.reserve(flight)
+    with pytest.raises(StaleInventoryError):
+        seats.reserve(flight, expected_version=version - 1)
+    seats.reserve(flight, expected_version=version)
+    with pytest.raises(SoldOutError):
+        seats.reserve(flight)
+
+
+def test_restored_bookings_take_seats():
+    """Test that journal-replayed bookings reduce availability of freshly loaded flights"""
+    seats = SeatInventory()
+    flights = [make_flight("ST700", 3), make_flight("ST701", 3)]
+    bookings = [
+        {"booking_id": f"R{i}", "flight_id": "ST700", "booking_status": "confirmed"} for i in range(5)
+    ] + [{"booking_id": "R9", "flight_id": "ST701", "booking_status": "cancelled"}]
+
+    version = seats.version("ST700")
+    seats.apply_bookings(flights, bookings)
+    assert [f["available_seats"] for f in flights] == [0, 3]
+    assert seats.version("ST700") == version + 1
+
+
+def test_concurrent_booking_requests_do_not_oversell(monkeypatch):
+    """Test the booking endpoint under parallel requests for one flight"""
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: 0)
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    flights_data.append(make_flight("ST500", 5))
+    payload = {
+        "flight_id": "ST500",
+        "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "phone": "555"},
+        "payment": {
+            "card_number": "4111111111111111", "card_holder_name": "Ada Lovelace",
+            "expiry_month": 12, "expiry_year": datetime.now().year + 2, "cvv": "123", "billing_address": "1 Main St"
+        }
+    }
+
+    try:
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            statuses = list(pool.map(lambda _: client.post("/flights/book", json=payload).status_code, range(40)))
+        assert statuses.count(200) == 5
+        assert flights_data[0]["available_seats"] == 0
+        assert len(bookings_data) == 5
+    finally:
+        flights_data.clear()
+        bookings_data.clear()
+        inventory.clear()
+
+
+def test_concurrent_cancellations_release_the_seat_once(monkeypatch):
+    """Test that parallel DELETEs of one booking cancel it once and free one seat"""
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: 0)
+    release = inventory.release
+
+    def slow_release(*args, **kwargs):
+        # Widen the window between the status check and the release
+        time.sleep(0.05)
+        return release(*args, **kwargs)
+
+    monkeypatch.setattr(inventory, "release", slow_release)
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    flights_data.append(make_flight("ST600", 5))
+    flights_data[0]["available_seats"] = 3
+    bookings_data.append({
+        "booking_id": "CX1", "flight_id": "ST600", "booking_status": "confirmed", "seat_no": None,
+        "total_amount": 250.0, "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+    })
+
+    try:
+        barrier = threading.Barrier(20)
+
+        def cancel(_):
+            barrier.wait()
+            return client.delete("/bookings/CX1").status_code
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            statuses = list(pool.map(cancel, range(20)))
+        assert statuses.count(200) == 1
+        assert statuses.count(404) == 19
+        assert flights_data[0]["available_seats"] == 4
+        assert len(bookings_data) == 0
+    finally:
+        flights_data.clear()
+        bookings_data.clear()
+        inventory.clear()
+
+
+def test_unnumbered_reservations_keep_seat_map_and_stores_apart():
+    """Test that reserve() takes seats from the seat map, and same-id flights in the two stores are separate"""
+    seats = SeatInventory()
+    flight = make_flight("FL0001", 12)
+    assert seats.reserve_seats(flight) == ["1A"]
+
+    seats.reserve(flight, 3)
+    seats.release(flight, 2)
+    assert seats.seat_map(flight).available == flight["available_seats"] == 10
+
+    departure = datetime(datetime.now().year + 1, 1, 1, 10)
+    model = Flight(
+        flight_id="FL0001", airline="Other Air", origin="ORD", destination="SFO", departure_time=departure,
+        arrival_time=departure + timedelta(hours=4), base_fare=99.0, total_seats=6, available_seats=6,
+        tier=PricingTier.ECONOMY
+    )
+    dict_version = seats.version("FL0001")
+    seats.reserve(model, 2)
+    assert seats.version("FL0001") == dict_version
+    assert seats.version("FL0001", FLIGHT_DB) == 1
+    assert seats.seat_map(model).available == 4
+    assert seats.seat_map(flight).available == 10
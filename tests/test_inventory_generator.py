@@ -0,0 +1,101 @@
+"""
+Tests for the synthetic inventory generator
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, select, func
+
+from app.data.airports import AIRPORTS
+from app.database import FlightDatabase
+from app.flight_database import Airline, Airport, Base as FlightTableBase, Flight as SQLFlight
+from app.inventory_generator import (
+    SyntheticInventoryGenerator, load_into_flight_database, load_into_records, load_into_table,
+    seed_flight_database
+)
+from app.models.database_models import Base as RecordBase, Flight as FlightRecord
+
+
+START = datetime(2030, 1, 1)
+
+
+def generate(seed=42, **kwargs):
+    """Helper to flatten a seeded run into Flight models"""
+    generator = SyntheticInventoryGenerator(seed=seed)
+    params = {"days": 3, "routes": 10, "start_date": START, **kwargs}
+    return [f for batch in generator.iter_batches(**params) for f in batch.to_flights()]
+
+
+def test_same_seed_is_reproducible():
+    """Test that a seed fully determines the schedule"""
+    assert generate(seed=7) == generate(seed=7)
+    assert generate(seed=7) != generate(seed=8)
+
+
+def test_batches_respect_batch_size():
+    """Test that batches are streamed in bounded chunks"""
+    generator = SyntheticInventoryGenerator(seed=1)
+    sizes = [len(b) for b in generator.iter_batches(days=5, routes=7, flights_per_route=3, batch_size=20)]
+
+    assert sum(sizes) == 5 * 7 * 3
+    assert max(sizes) == 20
+
+
+def test_routes_use_airport_table():
+    """Test that routes come from AIRPORTS and never loop back"""
+    flights = generate(routes=50)
+
+    assert all(f.origin in AIRPORTS and f.destination in AIRPORTS for f in flights)
+    assert all(f.origin != f.destination for f in flights)
+    assert all(0 < f.available_seats <= f.total_seats for f in flights)
+
+
+def test_flight_ids_are_sequential():
+    """Test that IDs continue from start_id"""
+    flights = generate(days=1, routes=3, start_id=41)
+    assert [f.flight_id for f in flights] == ["FL0041", "FL0042", "FL0043"]
+
+
+def test_load_into_stores():
+    """Test bulk loading into the in-memory stores"""
+    generator = SyntheticInventoryGenerator(seed=3)
+    database = FlightDatabase()
+    records = []
+
+    assert load_into_flight_database(database, generator.iter_batches(days=2, routes=5, batch_size=4)) == 10
+    assert load_into_records(records, generator.iter_batches(days=2, routes=5, batch_size=4)) == 10
+    assert len(database.get_all_flights()) == 10
+    assert {"current_price", "duration", "demand_level", "origin_city"} <= set(records[0])
+
+
+def test_load_into_table():
+    """Test bulk loading into the flights SQL table"""
+    engine = create_engine("sqlite://")
+    RecordBase.metadata.create_all(bind=engine)
+    generator = SyntheticInventoryGenerator(seed=5)
+
+    with engine.begin() as conn:
+        loaded = load_into_table(conn, generator.iter_batches(days=4, routes=25, batch_size=30))
+        count = conn.execute(select(func.count()).select_from(FlightRecord.__table__)).scalar()
+
+    assert loaded == count == 100
+
+
+def test_seed_flight_database():
+    """Test bulk seeding over the airports and airlines already in the SQL database"""
+    engine = create_engine("sqlite://")
+    FlightTableBase.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        with pytest.raises(ValueError):
+            seed_flight_database(conn, days=1, routes=1)
+        conn.execute(Airline.__table__.insert(), [{"airline_id": 7, "name": "Test Air"}])
+        conn.execute(Airport.__table__.insert(), [{"code": "JFK", "name": "JFK"}, {"code": "LAX", "name": "LAX"}])
+
+        loaded = seed_flight_database(conn, days=3, routes=4, seed=1, batch_size=5)
+        rows = conn.execute(select(SQLFlight.__table__)).mappings().all()
+
+    assert loaded == len(rows) == 12
+    assert {row["airline_id"] for row in rows} == {7}
+    assert all(row["source_airport"] != row["destination_airport"] for row in rows)
+    assert all(row["current_price"] >= row["base_fare"] and row["duration"] for row in rows)
@@ -0,0 +1,117 @@
+"""
+Tests for the booking write-ahead journal
+"""
+
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.inventory import inventory
+from app.journal import BookingJournal
+from app.state import flights_data, bookings_data
+
+
+def make_booking(i: int) -> dict:
+    """Helper to build a minimal booking record"""
+    return {"booking_id": f"b{i}", "flight_id": "FL1", "total_amount": 100.0 + i, "booking_status": "confirmed"}
+
+
+@pytest.mark.parametrize("mode", ["always", "group", "async"])
+def test_replay_restores_bookings_and_cancellations(tmp_path, mode):
+    """Test that a new journal over the same directory rebuilds the store"""
+    journal = BookingJournal(str(tmp_path), mode=mode, sync_interval=0.001)
+    for i in range(5):
+        journal.append("book", bookings=[make_booking(i)])
+    journal.append("cancel", booking_id="b2")
+    journal.close()
+
+    restored = BookingJournal(str(tmp_path)).replay()
+    assert sorted(b["booking_id"] for b in restored) == ["b0", "b1", "b3", "b4"]
+
+
+def test_group_commit_from_many_threads(tmp_path):
+    """Test that concurrent group-committed appends are all durable"""
+    journal = BookingJournal(str(tmp_path), mode="group", sync_interval=0.002, sync_records=16)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        seqs = list(pool.map(lambda i: journal.append("book", bookings=[make_booking(i)]), range(200)))
+    journal.close()
+
+    assert sorted(seqs) == list(range(1, 201))
+    assert len(BookingJournal(str(tmp_path)).replay()) == 200
+
+
+def test_snapshot_bounds_replay_and_ignores_torn_writes(tmp_path):
+    """Test that snapshots drop old journal files and a torn last record is skipped"""
+    store = []
+    journal = BookingJournal(str(tmp_path), mode="always", snapshot_every=0, snapshot_source=lambda: list(store))
+    for i in range(10):
+        store.append(make_booking(i))
+        journal.append("book", bookings=[make_booking(i)])
+    journal.snapshot()
+    store.append(make_booking(10))
+    journal.append("book", bookings=[make_booking(10)])
+    journal.close()
+
+    journals = glob.glob(os.path.join(tmp_path, "journal-*.log"))
+    assert len(journals) == 1
+    assert len(glob.glob(os.path.join(tmp_path, "snapshot-*.json"))) == 1
+    with open(journals[0], "ab") as f:
+        f.write(b'{"seq": 12, "op": "book", "bookings": [{"booking_')
+
+    reopened = BookingJournal(str(tmp_path), mode="always")
+    assert len(reopened.replay()) == 11
+    assert reopened.append("cancel", booking_id="b0") == 12
+    reopened.close()
+
+
+def test_booking_endpoint_journals_without_card_details(tmp_path, monkeypatch):
+    """Test that bookings made through the API are replayable and omit payment"""
+    monkeypatch.setattr(main, "booking_journal", BookingJournal(str(tmp_path)))
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: 0)
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    year = datetime.now().year + 1
+    flights_data.append({
+        "flight_id": "WJ0001", "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 250.0, "base_fare": 200.0, "available_seats": 10,
+        "total_seats": 150, "tier": "economy", "demand_level": "medium"
+    })
+
+    try:
+        response = TestClient(main.app).post("/flights/book", json={
+            "flight_id": "WJ0001",
+            "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "phone": "555"},
+            "payment": {
+                "card_number": "4111111111111111", "card_holder_name": "Ada Lovelace",
+                "expiry_month": 12, "expiry_year": year + 1, "cvv": "123", "billing_address": "1 Main St"
+            }
+        })
+        assert response.status_code == 200
+        main.booking_journal.close()
+    finally:
+        flights_data.clear()
+        bookings_data.clear()
+        inventory.clear()
+
+    restored = BookingJournal(str(tmp_path)).replay()
+    assert [b["booking_id"] for b in restored] == [response.json()["booking_id"]]
+    assert "payment" not in restored[0]
+
+
+def test_restarts_after_torn_only_record_keep_later_bookings(tmp_path):
+    """Test that a torn first record is cut off, so bookings made after each restart survive the next one"""
+    with open(os.path.join(tmp_path, f"journal-{1:012d}.log"), "wb") as f:
+        f.write(b'{"seq": 1, "op": "book", "bookings": [{"booking_')
+
+    for i in range(3):
+        journal = BookingJournal(str(tmp_path), mode="always")
+        assert sorted(b["booking_id"] for b in journal.replay()) == [f"b{j}" for j in range(i)]
+        journal.append("book", bookings=[make_booking(i)])
+        journal.close()
@@ -0,0 +1,77 @@
+"""
+Tests for pooled SMTP delivery
+"""
+
+import smtplib
+import socket
+
+import pytest
+from email.mime.text import MIMEText
+
+from app.mailer import SMTPSessionPool
+from benchmarks.smtp_server import LocalSMTPServer
+
+
+def make_message(i: int) -> MIMEText:
+    """Helper to build a small email"""
+    msg = MIMEText(f"Message {i}", "plain")
+    msg["To"] = f"passenger{i}@example.com"
+    msg["Subject"] = f"Test {i}"
+    return msg
+
+
+@pytest.fixture
+def server():
+    with LocalSMTPServer() as server:
+        yield server
+
+
+def test_sessions_are_reused_across_messages(server):
+    """Test that sequential sends share one authenticated session"""
+    pool = SMTPSessionPool(server.host, server.port, "user@example.com", "secret", starttls=False)
+    for i in range(10):
+        pool.send(make_message(i))
+    assert pool.send_batch([make_message(i) for i in range(10, 20)]) == [None] * 10
+    pool.close()
+
+    assert len(server.messages) == 20
+    assert server.connections == 1
+    assert pool.connections_opened == 1
+
+
+def test_idle_sessions_are_replaced(server):
+    """Test that sessions idle past the timeout are reconnected"""
+    pool = SMTPSessionPool(server.host, server.port, starttls=False, idle_timeout=-1)
+    pool.send(make_message(1))
+    pool.send(make_message(2))
+    pool.close()
+
+    assert server.connections == 2
+    assert len(server.messages) == 2
+
+
+def test_reconnects_after_dropped_session(server):
+    """Test that a session closed by the server is reopened and the send retried"""
+    pool = SMTPSessionPool(server.host, server.port, starttls=False)
+    pool.send(make_message(1))
+    pool._idle[0][0].sock.shutdown(socket.SHUT_RDWR)
+
+    pool.send(make_message(2))
+    pool.close()
+    assert len(server.messages) == 2
+    assert pool.connections_opened == 2
+
+
+def test_refused_recipient_keeps_the_session(server):
+    """Test that per-message SMTP errors are reported without reconnecting"""
+    server.refused.update({"passenger1@example.com", "passenger3@example.com"})
+    pool = SMTPSessionPool(server.host, server.port, starttls=False)
+
+    results = pool.send_batch([make_message(i) for i in range(5)])
+    pool.close()
+
+    assert [type(error) for error in results] == [
+        type(None), smtplib.SMTPRecipientsRefused, type(None), smtplib.SMTPRecipientsRefused, type(None)
+    ]
+    assert len(server.messages) == 3
+    assert server.connections == 1
@@ -0,0 +1,119 @@
+"""
+Tests for the background notification queue
+"""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.notifications import NotificationQueue, PermanentNotificationError
+from app.state import flights_data, bookings_data
+from app.inventory import inventory
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Queue backed by a temporary job store with fast retries"""
+    queue = NotificationQueue(str(tmp_path / "jobs.db"), workers=2, max_attempts=3, backoff_base=0.01)
+    yield queue
+    queue.stop()
+
+
+def test_jobs_are_delivered_by_workers(queue):
+    """Test that enqueued jobs reach their handler and are counted"""
+    delivered = []
+    queue.register("email", delivered.append)
+    queue.start()
+
+    for i in range(5):
+        queue.enqueue("email", {"n": i})
+
+    assert queue.drain(timeout=5)
+    assert sorted(job["n"] for job in delivered) == list(range(5))
+    stats = queue.stats()
+    assert stats["sent"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["send_latency_p50_ms"] is not None
+
+
+def test_failed_jobs_are_retried_with_backoff(queue):
+    """Test that transient failures retry and permanent ones stop"""
+    attempts = {"flaky": 0, "broken": 0}
+
+    def flaky(job):
+        attempts["flaky"] += 1
+        if attempts["flaky"] < 3:
+            raise ConnectionError("SMTP unavailable")
+
+    def broken(job):
+        attempts["broken"] += 1
+        raise PermanentNotificationError("bad address")
+
+    queue.register("flaky", flaky)
+    queue.register("broken", broken)
+    queue.start()
+    queue.enqueue("flaky", {})
+    queue.enqueue("broken", {})
+
+    assert queue.drain(timeout=5)
+    stats = queue.stats()
+    assert attempts == {"flaky": 3, "broken": 1}
+    assert stats["sent"] == 1
+    assert stats["failed"] == 1
+    assert stats["retries"] == 2
+
+
+def test_pending_jobs_survive_restart(tmp_path):
+    """Test that jobs queued before a restart are delivered afterwards"""
+    path = str(tmp_path / "jobs.db")
+    NotificationQueue(path).enqueue("email", {"to": "ada@example.com"})
+
+    delivered = []
+    restarted = NotificationQueue(path)
+    restarted.register("email", delivered.append)
+    restarted.start()
+    try:
+        assert restarted.drain(timeout=5)
+    finally:
+        restarted.stop()
+    assert delivered == [{"to": "ada@example.com"}]
+
+
+def test_booking_enqueues_confirmation_without_card_details(monkeypatch):
+    """Test that booking queues the email instead of sending it inline"""
+    queued = []
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: queued.append((kind, payload)))
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    year = datetime.now().year + 1
+    flights_data.append({
+        "flight_id": "NQ0001", "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 250.0, "base_fare": 200.0, "available_seats": 10,
+        "total_seats": 150, "tier": "economy", "demand_level": "medium"
+    })
+
+    try:
+        response = client.post("/flights/book", json={
+            "flight_id": "NQ0001",
+            "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "phone": "555"},
+            "payment": {
+                "card_number": "4111111111111111", "card_holder_name": "Ada Lovelace",
+                "expiry_month": 12, "expiry_year": year + 1, "cvv": "123", "billing_address": "1 Main St"
+            }
+        })
+        assert response.status_code == 200
+        assert client.delete(f"/bookings/{response.json()['booking_id']}").status_code == 200
+    finally:
+        flights_data.clear()
+        bookings_data.clear()
+        inventory.clear()
+
+    assert [kind for kind, _ in queued] == ["booking_confirmation", "booking_cancellation"]
+    assert queued[0][1]["email"] == "ada@example.com"
+    assert "payment" not in queued[0][1]["booking"]
@@ -0,0 +1,54 @@
+"""
+Tests for keyset pagination of the SQL flight and booking lists
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from app.flight_database import Airline, Airport, Base, Flight, apply_migrations
+from app.inventory_generator import seed_flight_database
+from app.pagination import decode_cursor, encode_cursor, keyset_page, next_cursor
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(engine)
+    apply_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(Airline.__table__.insert(), [{"airline_id": 1, "name": "Test Air"}])
+        conn.execute(Airport.__table__.insert(), [{"code": code, "name": code} for code in ("JFK", "LAX", "ORD")])
+        seed_flight_database(conn, days=5, routes=6, seed=4)
+    return engine
+
+
+@pytest.mark.parametrize("column", ["current_price", "departure_time"])
+def test_pages_cover_every_flight_once_in_order(tmp_path, column):
+    """Test that following cursors walks the whole table in (sort key, id) order"""
+    engine = make_engine(tmp_path)
+    sort_column = getattr(Flight, column)
+    with engine.connect() as conn:
+        expected = conn.execute(select(Flight.flight_id).order_by(sort_column, Flight.flight_id)).scalars().all()
+
+        seen, cursor = [], None
+        while True:
+            rows = conn.execute(keyset_page(select(Flight), sort_column, Flight.flight_id, 7, cursor)).all()
+            cursor = next_cursor(rows, 7, lambda row: (getattr(row, column), row.flight_id))
+            assert len(rows) <= 7
+            seen.extend(row.flight_id for row in rows)
+            if cursor is None:
+                break
+    assert seen == expected
+
+
+def test_cursor_page_seeks_through_index(tmp_path):
+    """Test that a deep page is an index seek, and that bad cursors are rejected"""
+    engine = make_engine(tmp_path)
+    page = keyset_page(select(Flight), Flight.current_price, Flight.flight_id, 10, encode_cursor(250.0, "FL0010"))
+    compiled = page.compile(engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params))
+    assert "ix_flights_price_id" in plan and "TEMP B-TREE" not in plan
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -6,6 +6,7 @@ import pytest
 from datetime import datetime, timedelta
 from app.models import Flight, PricingTier, DemandLevel
 from app.pricing import DynamicPricingEngine
+from app.database import FlightDatabase, db
 
 
 def create_test_flight(
@@ -69,4 +70,40 @@ def test_minimum_price_enforcement():
     
     price = DynamicPricingEngine.calculate_price(flight, DemandLevel.LOW)
     
-    assert price >= flight.base_fare * 0.5
\ No newline at end of file
+    assert price >= flight.base_fare * 0.5
+
+
+def test_demand_classified_at_ingest():
+    """Test that flights get a demand level when added"""
+    database = FlightDatabase()
+    quiet = create_test_flight(available_seats=190, hours_until_departure=168)
+    quiet.departure_time = quiet.departure_time.replace(hour=12)
+    full = create_test_flight(available_seats=10)
+    full.flight_id = "TEST002"
+    database.add_flights([quiet, full])
+
+    assert database.get_demand_level("TEST001") == DemandLevel.LOW
+    assert database.get_demand_level("TEST002") == DemandLevel.VERY_HIGH
+    assert database.demand_codes.dtype.name == "uint8"
+
+
+def test_recompute_demand_after_bookings():
+    """Test bulk reclassification after seats are sold"""
+    database = FlightDatabase()
+    flight = create_test_flight(available_seats=190)
+    flight.departure_time = flight.departure_time.replace(hour=12)
+    database.add_flight(flight)
+
+    flight.available_seats = 20
+    assert database.get_demand_level(flight.flight_id) == DemandLevel.LOW
+    database.recompute_demand([flight.flight_id])
+    assert database.get_demand_level(flight.flight_id) == DemandLevel.VERY_HIGH
+
+
+def test_demand_lookup_does_not_write():
+    """Test that reading demand for an unknown flight leaves the database untouched"""
+    db.clear()
+    flight = create_test_flight()
+
+    assert DynamicPricingEngine.get_or_calculate_demand(flight) in list(DemandLevel)
+    assert db.get_demand_level(flight.flight_id) is None
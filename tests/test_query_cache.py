@@ -0,0 +1,86 @@
+"""
+Tests for the versioned read-through query cache
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.query_cache import MemoryCacheBackend, QueryCache, SQLiteCacheBackend
+
+DAY = date(2030, 1, 1)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return QueryCache(MemoryCacheBackend())
+    return QueryCache(SQLiteCacheBackend(str(tmp_path / "cache.db")))
+
+
+def test_reads_are_cached_until_a_write_bumps_the_version(cache):
+    """Test that bookings invalidate the flight and its route search, but not other routes"""
+    loads = []
+
+    def loader(value):
+        def load():
+            loads.append(value)
+            return value
+        return load
+
+    assert cache.flight("FL1", loader({"seats": 5})) == {"seats": 5}
+    assert cache.flight("FL1", loader({"seats": 0})) == {"seats": 5}
+    assert cache.search("JFK", "LAX", DAY, loader([{"seats": 5}])) == [{"seats": 5}]
+    assert cache.search("JFK", "ORD", DAY, loader([{"seats": 9}])) == [{"seats": 9}]
+
+    cache.invalidate_flight("FL1", "JFK", "LAX", DAY)
+    assert cache.flight("FL1", loader({"seats": 4})) == {"seats": 4}
+    assert cache.search("JFK", "LAX", DAY, loader([{"seats": 4}])) == [{"seats": 4}]
+    assert cache.search("JFK", "ORD", DAY, loader([])) == [{"seats": 9}]
+
+    cache.invalidate_all()
+    assert cache.search("JFK", "ORD", DAY, loader([{"seats": 8}])) == [{"seats": 8}]
+    assert len(loads) == 6
+
+    stats = cache.stats()
+    assert stats["flight"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+    assert stats["search"]["hits"] == 1 and stats["search"]["misses"] == 4
+
+
+def test_result_loaded_across_a_write_is_not_served(cache):
+    """Test that a load racing with a booking stores under the old version only"""
+    def stale_load():
+        # The booking commits and bumps while this request is still querying
+        cache.invalidate_flight("FL1", "JFK", "LAX", DAY)
+        return {"seats": 5}
+
+    assert cache.flight("FL1", stale_load) == {"seats": 5}
+    assert cache.flight("FL1", lambda: {"seats": 4}) == {"seats": 4}
+    assert cache.flight("FL1", lambda: {"seats": 3}) == {"seats": 4}
+    assert cache.stats()["flight"]["hits"] == 1
+
+
+def test_async_reads_match_sync_and_skip_the_loop_for_blocking_backends(cache, monkeypatch):
+    """Test that async search shares entries and versions with sync, and blocking backends run in threads"""
+    threads = []
+    to_thread = asyncio.to_thread
+
+    async def tracking_to_thread(fn, *args):
+        threads.append(fn)
+        return await to_thread(fn, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", tracking_to_thread)
+
+    async def load():
+        return ["FL1"]
+
+    async def scenario():
+        assert await cache.search_async("JFK", "LAX", DAY, load) == ["FL1"]
+        assert cache.search("JFK", "LAX", DAY, lambda: ["FL2"]) == ["FL1"]
+        await cache.invalidate_flight_async("FL1", "JFK", "LAX", DAY)
+        return await cache.search_async("JFK", "LAX", DAY, load)
+
+    assert asyncio.run(scenario()) == ["FL1"]
+    assert (cache.stats()["search"]["hits"], cache.stats()["search"]["misses"]) == (1, 2)
+    assert bool(threads) == cache.backend.blocking
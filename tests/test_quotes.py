@@ -0,0 +1,125 @@
+"""
+Tests for price quote tokens
+"""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.quotes import QuoteCache, QuoteError
+from app.state import flights_data, bookings_data
+from app.inventory import inventory, SoldOutError
+
+client = TestClient(app)
+
+
+def make_flight(flight_id: str = "QT0001") -> dict:
+    """Helper to build a flights_data record"""
+    return {
+        "flight_id": flight_id,
+        "airline": "Test Airlines",
+        "origin": "JFK",
+        "destination": "LAX",
+        "departure_time": f"{datetime.now().year + 1}-01-01 10:00",
+        "arrival_time": f"{datetime.now().year + 1}-01-01 15:00",
+        "duration": "5h 0m",
+        "current_price": 250.0,
+        "base_fare": 200.0,
+        "available_seats": 10,
+        "total_seats": 150,
+        "tier": "economy",
+        "demand_level": "medium"
+    }
+
+
+def booking_payload(quote_id=None, flight_id: str = "QT0001") -> dict:
+    """Helper to build a booking request body"""
+    return {
+        "flight_id": flight_id,
+        "quote_id": quote_id,
+        "passenger": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "phone": "555"},
+        "payment": {
+            "card_number": "4111111111111111", "card_holder_name": "Ada Lovelace",
+            "expiry_month": 12, "expiry_year": datetime.now().year + 2,
+            "cvv": "123", "billing_address": "1 Main St"
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def setup_state(monkeypatch):
+    """Seed one flight and keep email off the network"""
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: 0)
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+    flights_data.append(make_flight())
+    yield
+    flights_data.clear()
+    bookings_data.clear()
+    inventory.clear()
+
+
+def test_quote_is_single_use_and_signed():
+    """Test that quotes are consumed on redeem and forged ids are rejected"""
+    cache = QuoteCache(secret=b"test")
+    quote_id = cache.issue(make_flight())["quote_id"]
+
+    assert cache.redeem(quote_id, "QT0001").price == 250.0
+    with pytest.raises(QuoteError):
+        cache.redeem(quote_id, "QT0001")
+    with pytest.raises(QuoteError, match="Invalid"):
+        cache.redeem(quote_id.split(".")[0] + ".forged", "QT0001")
+
+
+def test_quote_expires_and_cache_is_bounded():
+    """Test TTL expiry and the size bound"""
+    expired = QuoteCache(secret=b"test", ttl_seconds=-1)
+    with pytest.raises(QuoteError, match="expired"):
+        expired.redeem(expired.issue(make_flight())["quote_id"], "QT0001")
+
+    bounded = QuoteCache(secret=b"test", max_size=3)
+    for _ in range(10):
+        bounded.issue(make_flight())
+    assert len(bounded) == 3
+
+
+def test_booking_honors_quoted_price():
+    """Test that booking charges the price shown in the flight response"""
+    quote_id = client.get("/flights/QT0001").json()["quote_id"]
+    flights_data[0]["current_price"] = 999.0
+
+    response = client.post("/flights/book", json=booking_payload(quote_id))
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 250.0
+
+
+def test_stale_quote_rejected_after_inventory_change():
+    """Test that a quote is refused once seats have moved"""
+    first = client.get("/flights/QT0001").json()["quote_id"]
+    second = client.get("/flights/QT0001").json()["quote_id"]
+
+    assert client.post("/flights/book", json=booking_payload(first)).status_code == 200
+    response = client.post("/flights/book", json=booking_payload(second))
+    assert response.status_code == 409
+    assert flights_data[0]["available_seats"] == 9
+
+
+def test_failed_reservation_keeps_the_quote(monkeypatch):
+    """Test that a quote redeemed for a booking that could not get a seat can be used again"""
+    quote_id = client.get("/flights/QT0001").json()["quote_id"]
+    reserve_seats = inventory.reserve_seats
+
+    def sold_out_once(*args, **kwargs):
+        monkeypatch.setattr(inventory, "reserve_seats", reserve_seats)
+        raise SoldOutError("No seats available")
+
+    monkeypatch.setattr(inventory, "reserve_seats", sold_out_once)
+    assert client.post("/flights/book", json=booking_payload(quote_id)).status_code == 400
+
+    flights_data[0]["current_price"] = 999.0
+    response = client.post("/flights/book", json=booking_payload(quote_id))
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 250.0
@@ -0,0 +1,117 @@
+"""
+Tests for bitmap seat maps and seat assignment on booking
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.inventory import SeatInventory, inventory
+from app.seat_map import SeatMap, cabin_layout
+from app.state import flights_data, bookings_data
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    """Seed one empty economy flight into the in-memory store"""
+    monkeypatch.setattr(main.notification_queue, "enqueue", lambda kind, payload: 0)
+    year = datetime.now().year + 1
+    record = {
+        "flight_id": "SM001", "airline": "Test Airlines", "origin": "JFK", "destination": "LAX",
+        "departure_time": f"{year}-01-01 10:00", "arrival_time": f"{year}-01-01 15:00",
+        "duration": "5h 0m", "current_price": 250.0, "base_fare": 200.0,
+        "available_seats": 12, "total_seats": 12, "tier": "economy", "demand_level": "medium"
+    }
+    flights_data.append(record)
+    inventory.clear()
+    yield record
+    flights_data.remove(record)
+    bookings_data[:] = [b for b in bookings_data if b["flight_id"] != "SM001"]
+    inventory.clear()
+
+
+def passenger(i: int) -> dict:
+    return {"first_name": f"Passenger{i}", "last_name": "Smith", "email": f"p{i}@example.com", "phone": "555"}
+
+
+PAYMENT = {
+    "card_number": "4111111111111111", "card_holder_name": "Pat Smith",
+    "expiry_month": 12, "expiry_year": datetime.now().year + 2,
+    "cvv": "123", "billing_address": "1 Main St"
+}
+
+
+def test_preferences_and_release():
+    """Test that seats follow the preference, fall back when it runs out and can be reused"""
+    seat_map = SeatMap(cabin_layout("economy", 12))
+
+    assert seat_map.allocate("window") == "1A"
+    assert seat_map.allocate("aisle") == "1C"
+    assert seat_map.allocate("middle") == "1B"
+    assert seat_map.allocate("window") == "1F"
+    assert seat_map.allocate("window") == "2A"
+    assert seat_map.allocate("window") == "2F"
+    # No window seats left, so any free seat
+    assert seat_map.allocate("window") == "1D"
+
+    seat_map.release("2A")
+    assert seat_map.allocate("window") == "2A"
+    assert seat_map.available == 5
+
+
+def test_groups_sit_together_and_maps_match_availability():
+    """Test that groups get adjacent seats in one block and prefilled maps match the flight"""
+    seat_map = SeatMap(cabin_layout("economy", 12))
+    seat_map.allocate()  # 1A
+    assert seat_map.allocate_group(3) == ["1D", "1E", "1F"]
+    assert seat_map.allocate_group(2) == ["1B", "1C"]
+    assert seat_map.allocate_group(7) is None
+
+    prefilled = SeatMap.for_flight("FL1", "business", 40, 25, taken=["1A", "2K"])
+    assert prefilled.available == 25
+    assert SeatMap.for_flight("FL1", "business", 40, 25, taken=["1A", "2K"]).free == prefilled.free
+
+
+def test_legacy_seat_labels_are_skipped():
+    """Test that random seat numbers from before seat maps neither fail nor free seats"""
+    for tier in ("premium", "business"):
+        seat_map = SeatMap.for_flight("FL1", tier, 180, 170, taken=["12B", "31Z", "7", ""])
+        assert seat_map.available == 170
+        seat_map.release("12B")
+        assert seat_map.available == 170
+
+    legacy = {"flight_id": "FL2", "tier": "premium", "total_seats": 180, "available_seats": 170}
+    seat_inventory = SeatInventory()
+    seat_inventory.reserve_seats(legacy)
+    seat_inventory.release(legacy, seat_numbers=["12B"])
+    assert legacy["available_seats"] == 170
+    assert seat_inventory.seat_map(legacy).available == 169
+
+
+def test_bookings_get_distinct_seats_and_cancel_frees_them(flight):
+    """Test that bookings through the API are assigned seats which cancellation returns"""
+    seats = []
+    for i in range(3):
+        response = client.post("/flights/book", json={
+            "flight_id": "SM001", "passenger": passenger(i), "payment": PAYMENT, "seat_preference": "window"
+        })
+        assert response.status_code == 200
+        seats.append(response.json()["seat_no"])
+    assert seats == ["1A", "1F", "2A"]
+
+    group = client.post("/flights/book/group", json={
+        "flight_id": "SM001", "passengers": [passenger(i) for i in range(3, 6)], "payment": PAYMENT
+    })
+    assert group.status_code == 200
+    assert [b["seat_no"] for b in group.json()["bookings"]] == ["2D", "2E", "2F"]
+
+    booking_id = client.post("/flights/book", json={
+        "flight_id": "SM001", "passenger": passenger(9), "payment": PAYMENT, "seat_preference": "window"
+    }).json()["booking_id"]
+    assert client.delete(f"/bookings/{booking_id}").status_code == 200
+    assert inventory.seat_map(flight).available == flight["available_seats"]
@@ -0,0 +1,112 @@
+"""
+Tests for in-memory state snapshots
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from app.database import FlightDatabase
+from app.inventory import SeatInventory
+from app.models import DemandLevel, Flight, PricingTier
+from app.snapshots import StateSnapshotter, read_snapshot, write_snapshot
+from app.state import BookingStore
+
+
+def make_flight(i: int) -> Flight:
+    """Helper to build a flight"""
+    departure = datetime(2030, 1, 1, 8) + timedelta(hours=i)
+    return Flight(
+        flight_id=f"FL{i:04d}", airline="Test Air", origin="JFK", destination="LAX",
+        departure_time=departure, arrival_time=departure + timedelta(hours=5, minutes=30),
+        base_fare=199.99 + i, total_seats=180, available_seats=180 - i, tier=PricingTier.PREMIUM
+    )
+
+
+def make_state():
+    """Helper to build a populated FlightDatabase, flights_data and bookings"""
+    flight_db = FlightDatabase()
+    flight_db.add_flights([make_flight(i) for i in range(3)])
+    flight_db.set_demand_level("FL0001", DemandLevel.VERY_HIGH)
+    flight_db.add_fare_history("FL0001", {
+        "timestamp": "2030-01-01T00:00:00", "price": 250.0, "available_seats": 179, "demand_level": "high"
+    })
+    flights_data = [{"flight_id": "FL0001", "airline": "Test Air", "current_price": 250.0, "available_seats": 179}]
+    bookings = BookingStore([{
+        "booking_id": "B1", "flight_id": "FL0001", "passenger": {"first_name": "Ada"},
+        "total_amount": 250.0, "payment": {"card_number": "4111111111111111"}
+    }])
+    return flight_db, flights_data, bookings
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that flights, demand, fare history, flights_data and bookings are restored, without card data"""
+    flight_db, flights_data, bookings = make_state()
+    StateSnapshotter(str(tmp_path), flight_db, flights_data, bookings).snapshot()
+
+    restored = StateSnapshotter(str(tmp_path), FlightDatabase(), [], BookingStore())
+    assert restored.restore()["flights"] == 3
+
+    assert restored.flight_db.get_all_flights() == flight_db.get_all_flights()
+    assert restored.flight_db.get_flight_by_id("FL0002").tier is PricingTier.PREMIUM
+    assert restored.flight_db.get_flight_by_id("FL0002").model_fields_set == set(Flight.model_fields)
+    assert restored.flight_db.get_demand_level("FL0001") == DemandLevel.VERY_HIGH
+    assert restored.flight_db.get_fare_history("FL0001") == flight_db.get_fare_history("FL0001")
+    assert restored.flights == flights_data
+    assert restored.bookings.get("B1") == {
+        "booking_id": "B1", "flight_id": "FL0001", "passenger": {"first_name": "Ada"}, "total_amount": 250.0
+    }
+
+
+def test_restore_falls_back_past_unreadable_snapshot(tmp_path):
+    """Test that a corrupt newest snapshot is skipped and stale snapshots are not restored"""
+    flight_db, flights_data, bookings = make_state()
+    snapshotter = StateSnapshotter(str(tmp_path), flight_db, flights_data, bookings, keep=2)
+    snapshotter.snapshot()
+    with open(os.path.join(tmp_path, "state-99999999999999999999.snap"), "wb") as f:
+        f.write(b"SNP1\xff")
+
+    restored = StateSnapshotter(str(tmp_path), FlightDatabase(), [], BookingStore())
+    assert restored.restore()["path"] == snapshotter.last_snapshot["path"]
+    assert len(restored.flight_db.get_all_flights()) == 3
+
+    stale = StateSnapshotter(str(tmp_path), FlightDatabase(), [], BookingStore(), max_age=-1)
+    assert stale.restore() is None
+    assert stale.flight_db.get_all_flights() == []
+
+
+def test_columns_keep_types_and_missing_keys(tmp_path):
+    """Test mixed, missing and None values, and arbitrary key names, survive the columnar encoding"""
+    records = [
+        {"id": 1, "ok": True, "name": "a", "extra": [1, 2], "big": 2 ** 70},
+        {"id": 2, "ok": False, "name": None, "big": 1},
+        {"id": 3, "ok": True, "name": "a", "extra": None, "big": -1, "'}; __import__('os')#": 1},
+    ]
+    path = str(tmp_path / "records.snap")
+    write_snapshot(path, {"records": records, "empty": []}, {})
+
+    _, sections, _ = read_snapshot(path)
+    assert sections == {"records": records, "empty": []}
+
+
+def test_journal_bookings_correct_restored_seats(tmp_path):
+    """Test that bookings made or cancelled after the snapshot move seats, and seat maps skip held seats"""
+    flight_db, flights_data, bookings = make_state()
+    flights_data[0].update(tier="economy", total_seats=12, available_seats=8)
+    bookings.get("B1").update(booking_status="confirmed", seat_no="1A")
+    StateSnapshotter(str(tmp_path), flight_db, flights_data, bookings).snapshot()
+
+    # Since the snapshot, B1 was cancelled and B2, B3 were booked (replayed from the journal)
+    journal = BookingStore([
+        {"booking_id": f"B{i}", "flight_id": "FL0001", "booking_status": "confirmed", "seat_no": seat}
+        for i, seat in ((2, "1B"), (3, "1C"))
+    ])
+    seats = SeatInventory(taken_seats=lambda flight_id: [b["seat_no"] for b in journal.for_flight(flight_id)])
+    restored = StateSnapshotter(str(tmp_path), FlightDatabase(), [], journal, seat_inventory=seats)
+    restored.restore(include_bookings=False)
+
+    flight = restored.flights[0]
+    assert flight["available_seats"] == 7
+    assert [b["booking_id"] for b in journal] == ["B2", "B3"]
+    seat_map = seats.seat_map(flight)
+    assert seat_map.available == 7
+    assert seat_map.free & 0b110 == 0
@@ -0,0 +1,108 @@
+"""
+Tests for the ticket PDF cache and endpoint
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+import app.ticket_cache as ticket_module
+from app.main import app
+from app.state import bookings_data
+from app.ticket_cache import TicketCache, ticket_key
+from benchmarks.booking_pdf import make_booking
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Count renders while still producing real PDFs"""
+    calls = []
+    real = ticket_module.render_booking_pdfs
+
+    def counting(bookings):
+        calls.append(len(bookings))
+        return real(bookings)
+
+    monkeypatch.setattr(ticket_module, "render_booking_pdfs", counting)
+    return calls
+
+
+def test_key_covers_only_printable_fields():
+    """Test that the key changes with printed fields and ignores the rest"""
+    booking = make_booking(1)
+    key = ticket_key(booking)
+
+    assert ticket_key({**booking, "booking_status": "cancelled", "payment": {"cvv": "123"}}) == key
+    assert ticket_key({**booking, "total_amount": 1.0}) != key
+    assert ticket_key({**booking, "passenger": {**booking["passenger"], "phone": "999"}}) != key
+
+
+def test_cache_renders_once_and_evicts_by_size(tmp_path, renders):
+    """Test that hits skip rendering and the size bound evicts oldest tickets"""
+    cache = TicketCache(str(tmp_path), max_bytes=10_000)
+    first = cache.get(make_booking(1))
+    assert cache.get(make_booking(1)) == first
+    assert renders == [1]
+
+    for i in range(2, 6):
+        cache.get(make_booking(i))
+    assert cache.stats()["bytes"] <= 10_000
+    assert cache.load(ticket_key(make_booking(1))) is None
+    assert len(list(tmp_path.glob("*.pdf"))) == cache.stats()["tickets"]
+
+    # A fresh cache over the same directory reuses what is on disk
+    assert TicketCache(str(tmp_path)).load(ticket_key(make_booking(5))) is not None
+
+
+@pytest.fixture
+def signed_in(monkeypatch):
+    """Accept bearer tokens of the form "user:<email>" as signed-in users"""
+    async def current_user(token, db):
+        return {"email": token[len("user:"):]} if token.startswith("user:") else None
+
+    monkeypatch.setattr(main, "get_current_user", current_user)
+    return lambda email: {"Authorization": f"Bearer user:{email}"}
+
+
+def test_ticket_endpoint_supports_etag(tmp_path, monkeypatch, renders, signed_in):
+    """Test lazy rendering, caching and 304 responses"""
+    monkeypatch.setattr(main, "ticket_cache", TicketCache(str(tmp_path)))
+    booking = make_booking(7)
+    bookings_data.clear()
+    bookings_data.append(booking)
+    auth = signed_in(booking["passenger"]["email"])
+    try:
+        response = client.get(f"/bookings/{booking['booking_id']}/ticket.pdf", headers=auth)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF")
+        etag = response.headers["etag"]
+
+        assert client.get(f"/bookings/{booking['booking_id']}/ticket.pdf", headers=auth).content == response.content
+        cached = client.get(
+            f"/bookings/{booking['booking_id']}/ticket.pdf", headers={**auth, "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert renders == [1]
+
+        assert client.get("/bookings/missing/ticket.pdf", headers=auth).status_code == 404
+    finally:
+        bookings_data.clear()
+
+
+def test_ticket_endpoint_requires_the_booking_owner(tmp_path, monkeypatch, renders, signed_in):
+    """Test that tickets are not served anonymously or to other users"""
+    monkeypatch.setattr(main, "ticket_cache", TicketCache(str(tmp_path)))
+    booking = make_booking(8)
+    bookings_data.clear()
+    bookings_data.append(booking)
+    try:
+        url = f"/bookings/{booking['booking_id']}/ticket.pdf"
+        assert client.get(url).status_code == 401
+        assert client.get(url, headers={"Authorization": "Bearer bad"}).status_code == 401
+        assert client.get(url, headers=signed_in("someone@example.com")).status_code == 403
+        assert renders == []
+    finally:
+        bookings_data.clear()
@@ -0,0 +1,58 @@
+"""
+Bulk-seed the SQL flights table used by database_config.py
+
+Streams a generated schedule over the airports and airlines already in the
+database, in Core executemany batches (COPY on PostgreSQL with psycopg2):
+
+    python tools/seed_flights.py --days 365 --routes 2740
+    FLIGHT_DATABASE_URL=postgresql://... python tools/seed_flights.py --days 30 --routes 1000 --append
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Ensure project root (parent of tools/) is on sys.path so we can import project packages
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select
+
+from app.flight_database import Base, Flight, apply_migrations, engine
+from app.inventory_generator import seed_flight_database
+from app.query_cache import query_cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-seed the flights table")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--routes", type=int, default=15)
+    parser.add_argument("--flights-per-route", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--append", action="store_true", help="Keep existing flights and number new ones after them")
+    parser.add_argument("--no-copy", action="store_true", help="Use executemany even on PostgreSQL")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    apply_migrations(engine)
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Flight.__table__)).scalar()
+        if existing and not args.append:
+            print(f"❌ Database already has {existing} flights, pass --append to add more")
+            sys.exit(1)
+        inserted = seed_flight_database(
+            conn, days=args.days, routes=args.routes, flights_per_route=args.flights_per_route,
+            seed=args.seed, batch_size=args.batch_size, start_id=existing + 1,
+            use_copy=False if args.no_copy else None
+        )
+    elapsed = time.perf_counter() - start
+    # Drop cached searches in running servers sharing the cache (QUERY_CACHE_BACKEND=sqlite)
+    query_cache.invalidate_all()
+    print(f"✅ Inserted {inserted:,} flights in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()